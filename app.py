@@ -1,5 +1,6 @@
 import os
 import json
+import uuid
 import time
 import re
 import pandas as pd
@@ -23,18 +24,63 @@ st.set_page_config(
 # 새로운 모듈 임포트
 try:
     from src.crawler_wrapper import search_community
-    from src.preprocessor import filter_hate_speech
+    from src.preprocessor import filter_hate_speech_lazy, TitlePrescreen
+    from src.warmup import start_warmup, WARMUP_ENABLED
+    from src.plan_cache import get_plan_cache, plan_namespace
+    from src.crawl_budget import crawl_with_budget, crawl_and_filter, CRAWL_TARGET_POSTS, CRAWL_DEADLINE
+    from src.crawl_executor import get_crawl_executor, CrawlRejected
+    from src.context_selector import select_context, format_post_line, CONTEXT_MAX_POSTS
+    from src.answer_cache import get_answer_cache, format_age
 except ImportError as e:
     # 외부 모듈이 없을 경우, Streamlit 앱 실행을 위해 더미 함수로 대체
     def search_community(*args, **kwargs):
         # st.error(f"Crawler module missing. Cannot execute search for {target} - {keyword}")
         return pd.DataFrame({'Title': [f"Dummy Title - No Crawler"], 'PostUrl': ['#'], 'Content': ['Dummy content. Please install src modules.']})
-    def filter_hate_speech(df):
-        return df
+    def filter_hate_speech_lazy(df, limit, include_comments=False):
+        return df.head(limit), {'scored_texts': 0, 'dropped_rows': 0}
+    TitlePrescreen = None
+    WARMUP_ENABLED = False
+    def get_plan_cache():
+        return None
+    crawl_with_budget = crawl_and_filter = None
+    get_crawl_executor = None
+    CrawlRejected = RuntimeError
+    CRAWL_TARGET_POSTS, CRAWL_DEADLINE = 0, 0
+    CONTEXT_MAX_POSTS = 30
+    def select_context(df, query=""):
+        return df.head(CONTEXT_MAX_POSTS).reset_index(drop=True), {'candidates': len(df), 'selected': min(len(df), CONTEXT_MAX_POSTS), 'tokens': 0, 'skipped_duplicates': 0}
+    def format_post_line(post_id, title, content):
+        return f"[ID: {post_id}] {title}: {str(content)[:150]}\n"
+    def plan_namespace(model_name, system_instruction):
+        return model_name
+    def get_answer_cache():
+        return None
+    def format_age(seconds):
+        return f"{int(seconds)}초 전"
     # st.error(f"필수 모듈을 임포트하는 중 오류가 발생했습니다: {e}")
     # st.stop()
 
 
+# 백그라운드 워밍업 (옵트인): UI를 먼저 띄우고 형태소 분석기/모델/브라우저를 미리 준비
+# (프로세스당 한 번만 시작되며, 이후 재실행에서는 기존 워밍업 상태를 그대로 사용)
+warmup = start_warmup() if WARMUP_ENABLED else None
+
+WARMUP_ICONS = {"pending": "⚪", "running": "🟡", "ready": "🟢", "failed": "🔴"}
+
+@st.fragment(run_every=None if warmup is None or warmup.done else 2)
+def render_warmup_status():
+    """
+    사이드바에 워밍업 구성 요소별 준비 상태를 표시합니다. (준비 중에는 2초마다 갱신)
+    """
+    st.markdown("**사전 준비 상태**")
+    for item in warmup.status().values():
+        line = f"{WARMUP_ICONS[item['state']]} {item['label']}"
+        if item['state'] == "ready":
+            line += f" ({item['elapsed']:.1f}초)"
+        elif item['state'] == "failed":
+            line += f" - 실패: {item['error']}"
+        st.caption(line)
+
 # --------------------------------------------------------------------------
 # 2. 사이드바 설정 (API 상태 표시)
 # --------------------------------------------------------------------------
@@ -53,6 +99,13 @@ with st.sidebar:
             st.warning("API 키가 누락되었습니다. '.env' 파일을 확인해주세요.")
         if not model_name:
             st.warning("모델 설정이 누락되었습니다. '.env' 파일을 확인해주세요.")
+
+    if warmup is not None:
+        render_warmup_status()
+
+    if get_crawl_executor is not None:
+        crawl_metrics = get_crawl_executor().metrics()
+        st.caption(f"크롤링 대기열 {crawl_metrics['queue_depth']}건 · 실행 중 {crawl_metrics['running']}/{crawl_metrics['max_concurrency']} · 평균 대기 {crawl_metrics['avg_wait']:.1f}초 (p95 {crawl_metrics['p95_wait']:.1f}초)")
         
     st.markdown("---")
     st.info("AI가 사용자의 질문을 분석하여 자동으로 커뮤니티(DC/Arca)를 선정하고 데이터를 수집합니다.")
@@ -91,11 +144,14 @@ def get_gemini_model():
 # 4. 핵심 로직 함수 
 # --------------------------------------------------------------------------
 
-def get_search_plan(user_input):
+def get_search_plan(user_input, model=None, plan_cache=None):
     """
     사용자의 질문을 분석하여 검색 계획을 수립합니다.
+    같은(정규화 기준) 질문의 계획은 검색 계획 캐시(src/plan_cache.py)에서 재사용하여 LLM 호출을 생략합니다.
+    model/plan_cache를 전달하면 Gemini 모델과 전역 캐시 대신 사용합니다. (테스트 시 로컬 스텁 모델 주입)
     """
-    model = get_gemini_model()
+    model = model or get_gemini_model()
+    plan_cache = plan_cache if plan_cache is not None else get_plan_cache()
     
     system_instruction = """
     너는 인터넷 커뮤니티의 문화와 은어에 통달한 '커뮤니티 키워드 검색을 위한 커뮤니티 트렌드/은어 전문가'야. 
@@ -138,56 +194,113 @@ def get_search_plan(user_input):
     }
     """
     
+    # 모델이나 지시문이 바뀌면 이전 계획을 재사용하지 않도록 네임스페이스에 포함
+    namespace = plan_namespace(getattr(model, "model_name", None) or os.getenv("MODEL", ""), system_instruction)
+    if plan_cache is not None:
+        cached_plan = plan_cache.get(user_input, namespace)
+        if cached_plan is not None:
+            print(f"[DEBUG] Search plan cache hit: {user_input}")
+            return cached_plan
+
     try:
         response = model.generate_content(
             f"{system_instruction}\n\nUser Input: {user_input}",
             generation_config={"response_mime_type": "application/json"}
         )
         if response.parts:
-            return json.loads(response.text)
+            plan = json.loads(response.text)
+            # 정상적으로 수립된 계획만 저장 (오류 응답은 다음 요청에서 다시 시도)
+            if plan_cache is not None:
+                plan_cache.put(user_input, namespace, plan)
+            return plan
         else:
             return {"mode": "chat", "reply_message": "죄송합니다. 계획을 수립하는 중 문제가 발생했습니다.", "tasks": []}
     except Exception as e:
         return {"mode": "chat", "reply_message": f"오류가 발생했습니다: {str(e)}", "tasks": []}
 
-def execute_crawling(tasks):
+def create_title_prescreen():
+    """
+    TITLE_PRESCREEN 환경 변수가 켜져 있으면 제목 혐오 사전 필터를 생성합니다. (꺼져 있으면 None)
+    """
+    if TitlePrescreen is not None and os.getenv("TITLE_PRESCREEN", "").lower() in ("1", "true", "yes"):
+        return TitlePrescreen()
+    return None
+
+def execute_crawling(tasks, target_posts=None, deadline=None, executor=None):
     """
     수립된 계획(tasks)을 병렬로 실행하여 데이터를 수집합니다.
+    TITLE_PRESCREEN 환경 변수가 켜져 있으면 목록 단계에서 제목 혐오 사전 필터를 적용합니다.
+    target_posts(기본값 CRAWL_TARGET_POSTS)나 deadline(초, 기본값 CRAWL_DEADLINE)이 설정되어 있으면
+    전체 목표 게시물 수를 소스별로 나누어 수집하고, 목표나 제한 시간에 도달하면 진행 중인 크롤링을 중단하여 그때까지의 결과를 반환합니다.
+    executor(공유 크롤링 실행기의 세션)를 전달하면 예산 설정 여부와 관계없이 모든 크롤링 작업을 해당 실행기에 제출하며,
+    대기열이 가득 차면 이미 제출한 작업을 취소하고 CrawlRejected를 그대로 전달합니다.
     """
     all_results = []
+    target_posts = target_posts if target_posts is not None else CRAWL_TARGET_POSTS
+    deadline = deadline if deadline is not None else CRAWL_DEADLINE
+    
+    # 제목 사전 필터 (옵트인): 제목만으로 제거될 게시물은 본문/댓글을 요청하지 않음
+    title_prescreen = create_title_prescreen()
+    
+    # 예산 기반 크롤링 (옵트인): 느린 소스가 전체 응답을 붙잡지 않도록 목표/제한 시간에서 중단
+    if crawl_with_budget is not None and (target_posts or deadline):
+        extra_options = {"title_prescreen": title_prescreen} if title_prescreen is not None else None
+        final_df, _ = crawl_with_budget(tasks, search_community, target_posts or None, deadline or None, extra_options, executor)
+        if title_prescreen is not None:
+            title_prescreen.flush_log()
+        return final_df
     
-    with concurrent.futures.ThreadPoolExecutor() as executor:
+    # 공유 크롤링 실행기(세션)가 전달되면 그대로 사용하고, 없을 때만 요청 전용 스레드 풀을 생성
+    own_pool = executor is None
+    crawl_pool = concurrent.futures.ThreadPoolExecutor() if own_pool else executor
+    try:
         future_to_task = {}
-        for task in tasks:
-            target = task.get("target_source")
-            keyword = task.get("keyword")
-            options = task.get("options", {})
-            
-            # 디버깅: 전달되는 파라미터 출력
-            print(f"[DEBUG] Crawling Task: {target} - {keyword}")
-            future = executor.submit(search_community, target, keyword, **options)
-            future_to_task[future] = task
+        try:
+            for task in tasks:
+                target = task.get("target_source")
+                keyword = task.get("keyword")
+                options = task.get("options", {})
+                
+                # 디버깅: 전달되는 파라미터 출력
+                print(f"[DEBUG] Crawling Task: {target} - {keyword}")
+                if title_prescreen is not None:
+                    options = {**options, "title_prescreen": title_prescreen}
+                future = crawl_pool.submit(search_community, target, keyword, **options)
+                future_to_task[future] = task
+        except CrawlRejected:
+            # 일부만 제출된 상태에서 대기열이 가득 차면 제출된 작업을 취소하고 거절을 전달
+            for future in future_to_task:
+                future.cancel()
+            raise
 
         # [수정] 모든 태스크가 '완전히' 끝날 때까지 명시적으로 대기 (wait)
         # return_when=ALL_COMPLETED를 사용하여 하나라도 실행 중이면 넘어가지 않음
         if future_to_task:
             concurrent.futures.wait(future_to_task.keys(), return_when=concurrent.futures.ALL_COMPLETED)
-            
-        # 모든 작업이 완료된 후 결과 수집
-        for future in future_to_task:
-            try:
-                df = future.result()
-                current_task = future_to_task[future]
-                print(f"[DEBUG] Crawling result for {current_task.get('target_source')}: {len(df)} rows")
-                if not df.empty:
-                    df["Source"] = current_task.get("target_source")
-                    df["Keyword"] = current_task.get("keyword")
-                    all_results.append(df)
-                else:
-                    print(f"[DEBUG] Empty DataFrame returned for {current_task.get('target_source')}")
-
-            except Exception as e:
-                print(f"[DEBUG] Error: {e}", flush=True)
+    finally:
+        # 직접 만든 풀만 종료 (공유 실행기는 다른 요청이 계속 사용)
+        if own_pool:
+            crawl_pool.shutdown(wait=False)
+        
+    # 모든 작업이 완료된 후 결과 수집
+    for future in future_to_task:
+        try:
+            df = future.result()
+            current_task = future_to_task[future]
+            print(f"[DEBUG] Crawling result for {current_task.get('target_source')}: {len(df)} rows")
+            if not df.empty:
+                df["Source"] = current_task.get("target_source")
+                df["Keyword"] = current_task.get("keyword")
+                all_results.append(df)
+            else:
+                print(f"[DEBUG] Empty DataFrame returned for {current_task.get('target_source')}")
+
+        except Exception as e:
+            print(f"[DEBUG] Error: {e}", flush=True)
+
+    # 사전 필터로 제거된 게시물은 감사 로그로 저장
+    if title_prescreen is not None:
+        title_prescreen.flush_log()
 
     if all_results:
         # [수정] 여러 소스의 데이터를 고르게 섞기 (Interleaving)
@@ -203,6 +316,46 @@ def execute_crawling(tasks):
     else:
         return pd.DataFrame()
 
+def collect_report_sample(tasks, sample_size=30, executor=None):
+    """
+    크롤링과 혐오 표현 필터링을 수행하여 보고서에 사용할 정상 게시물 표본(최대 sample_size건)을 만듭니다.
+    소스별로 크롤링이 끝나는 대로 해당 소스의 결과를 필터링하고, 필터링된 결과를 순위 기준으로 섞습니다.
+    (가장 느린 크롤러를 기다리는 동안 먼저 끝난 소스의 필터링이 진행됨)
+    예산 기반 크롤링(CRAWL_TARGET_POSTS/CRAWL_DEADLINE)을 사용하면 수집이 끝난 뒤 한 번에 필터링합니다.
+    executor(공유 크롤링 실행기의 세션)를 전달하면 크롤링 작업을 해당 실행기에 제출합니다. (대기열이 가득 차면 CrawlRejected 발생)
+
+    Returns:
+        (pd.DataFrame, pd.DataFrame, dict): (수집 원본, 보고서 표본, 요약 {'dropped_rows', 'scored_texts', 'errors'})
+    """
+    def filter_source(df):
+        # 본문 150자 제한 후, 순위 순서대로 검사하다가 정상 게시물이 sample_size건 모이면 중단
+        # (댓글은 프롬프트에 쓰이지 않으므로 예측하지 않음)
+        if 'Content' in df.columns:
+            df['Content'] = df['Content'].astype(str).str.slice(0, 150)
+        return filter_hate_speech_lazy(df, sample_size, include_comments=False)
+
+    if crawl_and_filter is None or CRAWL_TARGET_POSTS or CRAWL_DEADLINE:
+        raw_df = execute_crawling(tasks, executor=executor)
+        if raw_df.empty:
+            return raw_df, raw_df, {'dropped_rows': 0, 'scored_texts': 0, 'errors': []}
+        try:
+            target_df, stats = filter_source(raw_df)
+            return raw_df, target_df, {'dropped_rows': stats['dropped_rows'], 'scored_texts': stats['scored_texts'], 'errors': []}
+        except Exception as e:
+            return raw_df, raw_df.head(sample_size), {'dropped_rows': 0, 'scored_texts': 0, 'errors': [str(e)]}
+
+    title_prescreen = create_title_prescreen()
+    extra_options = {"title_prescreen": title_prescreen} if title_prescreen is not None else None
+    raw_df, clean_df, summary = crawl_and_filter(tasks, search_community, filter_source, extra_options, executor)
+    if title_prescreen is not None:
+        title_prescreen.flush_log()
+
+    return raw_df, clean_df.head(sample_size), {
+        'dropped_rows': sum(stats['dropped_rows'] for stats in summary['filter_stats']),
+        'scored_texts': sum(stats['scored_texts'] for stats in summary['filter_stats']),
+        'errors': summary['errors'],
+    }
+
 def generate_report(user_input, df):
     model = get_gemini_model()
     
@@ -213,13 +366,11 @@ def generate_report(user_input, df):
     title_col = cols.get('title', 'Title')
     content_col = cols.get('content', 'Content')
 
-    # 인덱스 1부터 시작 (30개 제한)
-    for i, (idx, row) in enumerate(df.head(30).iterrows()):
+    # 인덱스 1부터 시작 (df는 select_context가 토큰 예산 안에서 고른 게시물)
+    for i, (idx, row) in enumerate(df.head(CONTEXT_MAX_POSTS).iterrows()):
         title = row.get(title_col, "No Title")
-        # 본문 150자 제한 (이미 잘려있겠지만 안전장치 및 프롬프트 최적화)
-        content = str(row.get(content_col, ""))[:150]
-        # ID를 1부터 시작하는 순번으로 매핑하여 프롬프트에 전달
-        summary_text += f"[ID: {i + 1}] {title}: {content}\n"
+        # ID를 1부터 시작하는 순번으로 매핑하여 프롬프트에 전달 (본문은 150자 제한)
+        summary_text += format_post_line(i + 1, title, row.get(content_col, ""))
         
     prompt = f"""
     당신은 커뮤니티 여론 분석 전문가입니다.
@@ -248,8 +399,8 @@ def generate_report(user_input, df):
     **중요:** 보고서 본문 작성이 모두 끝나면, 반드시 `__REF_DATA__` 라는 구분자를 출력하고, 그 뒤에 **JSON 형식**으로 아래 정보들을 출력해주세요.
     
     1. **reference_ids**: 분석에 가장 영양가가 높았던 글의 ID (최대 3개, 숫자 리스트)
-    2. **sentiment_counts**: 전체(최대 30개) 글에 대한 감성 분석 통계. 각각의 글에 대해 ("Positive"|"Negative"|"Neutral")을 판단함. (긍정 부정 판단이 불가능할 경우에는 "Neutral"로 판단)
-    3. **topic_counts**: 전체(최대 30개) 글에서 주로 다뤄진 상위 키워드(한국어로 작성) 3~5개와 그 빈도수
+    2. **sentiment_counts**: 전체(위 ID 목록의 모든) 글에 대한 감성 분석 통계. 각각의 글에 대해 ("Positive"|"Negative"|"Neutral")을 판단함. (긍정 부정 판단이 불가능할 경우에는 "Neutral"로 판단)
+    3. **topic_counts**: 전체(위 ID 목록의 모든) 글에서 주로 다뤄진 상위 키워드(한국어로 작성) 3~5개와 그 빈도수
     
     __REF_DATA__
     {{
@@ -261,6 +412,58 @@ def generate_report(user_input, df):
     
     return model.generate_content(prompt, stream=True)
 
+def build_reference_links(target_df, ref_ids):
+    """
+    reference_ids(1부터 시작하는 보고서 ID)를 target_df의 게시글 링크 목록(마크다운)으로 변환합니다.
+    """
+    if not ref_ids:
+        return ""
+    links = "\n\n---\n### 🔗 Gemini가 참고한 핵심 게시글\n"
+    cols = {c.lower(): c for c in target_df.columns}
+    url_col = cols.get('posturl') or cols.get('url') or cols.get('link')
+    title_col = cols.get('title', 'Title')
+
+    if url_col:
+        for ref_id in ref_ids:
+            target_idx = ref_id - 1
+            if 0 <= target_idx < len(target_df):
+                row = target_df.iloc[target_idx]
+                links += f"- [{row[title_col]}]({row[url_col]})\n"
+    return links
+
+def render_reference_list(df_ref):
+    """
+    보고서에 사용된 전체 게시글 목록을 Expander로 출력합니다.
+    """
+    with st.expander(f"📚 사용된 전체 게시글 보기 ({len(df_ref)}건)"):
+        cols = {c.lower(): c for c in df_ref.columns}
+        url_col = cols.get('posturl') or cols.get('url') or cols.get('link')
+        title_col = cols.get('title', 'Title')
+        for i, (idx, row) in enumerate(df_ref.iterrows()):
+            st.markdown(f"**{i+1}.** [{row[title_col]}]({row[url_col]}) ({row.get('Source', '')})")
+
+def record_search_stats(tasks, sentiment_counts, topic_counts):
+    """
+    감성/주제 통계를 search_history에 추가하고 우측 대시보드를 최신 항목으로 다시 그립니다.
+    """
+    sources = set([t.get('target_source').upper() for t in tasks])
+    keywords = set([t.get('keyword') for t in tasks])
+    label = f"{', '.join(sources)} - {', '.join(keywords)}"
+    
+    new_history_item = {
+        "label": label,
+        "timestamp": time.time(),
+        "sentiment": sentiment_counts,
+        "topics": topic_counts
+    }
+    
+    st.session_state.search_history.append(new_history_item)
+    # 인덱스를 가장 최신(마지막)으로 이동
+    st.session_state.current_view_index = len(st.session_state.search_history) - 1
+        
+    # 우측 대시보드 리렌더링
+    render_stats_dashboard()
+
 # ==========================================================================
 # 5. 메인 로직 
 # ==========================================================================
@@ -309,6 +512,9 @@ if "search_history" not in st.session_state:
 if "current_view_index" not in st.session_state:
     st.session_state.current_view_index = -1 # 현재 보고 있는 검색 기록의 인덱스
 
+if "crawl_session_id" not in st.session_state:
+    st.session_state.crawl_session_id = uuid.uuid4().hex # 공유 크롤링 실행기의 세션별 대기열 식별자
+
 if "messages" not in st.session_state:
     st.session_state.messages = []
     # 협업자 환영 메시지 적용
@@ -427,13 +633,7 @@ with chat_col:
                 # [수정 2] 메시지 히스토리 루프에서 Expander 렌더링
                 # 이전 검색 결과의 목록도 여기서 보존되어 출력됩니다.
                 if "references" in message and isinstance(message["references"], pd.DataFrame) and not message["references"].empty:
-                    with st.expander(f"📚 사용된 전체 게시글 보기 ({len(message['references'])}건)"):
-                        df_ref = message["references"]
-                        cols = {c.lower(): c for c in df_ref.columns}
-                        url_col = cols.get('posturl') or cols.get('url') or cols.get('link')
-                        title_col = cols.get('title', 'Title')
-                        for i, (idx, row) in enumerate(df_ref.iterrows()):
-                            st.markdown(f"**{i+1}.** [{row[title_col]}]({row[url_col]}) ({row.get('Source', '')})")
+                    render_reference_list(message["references"])
 
     # 입력 처리 로직 (버튼 및 Chat Input)
     # Chat Input은 항상 하단에 위치
@@ -487,36 +687,68 @@ with chat_col:
                         
                         task_summary = [f"{t.get('target_source').upper()}: '{t.get('keyword')}'" for t in tasks]
                         status.write(f"📋 **검색 계획 수립 완료**: {', '.join(task_summary)}")
-                        status.update(label="데이터를 수집하고 있습니다...", state="running")
+                        status.update(label="데이터를 수집하고 필터링하고 있습니다...", state="running")
                         
-                        # [Step 2] 크롤링 실행
-                        raw_df = execute_crawling(tasks)
+                        # [Step 2~3] 크롤링 및 혐오 표현 필터링 (소스별로 크롤링이 끝나는 대로 필터링)
+                        # 필터를 통과한 후보(최대 건수의 2배) 중 관련도/다양성 기준으로 보고서 근거를 고름 (target_df는 메시지에 저장됨)
+                        # 프로세스 공유 크롤링 실행기: 동시 브라우저 수를 제한하고, 대기열이 가득 차면 요청을 거절
+                        # 같은 검색(정규화된 task 목록)의 최근 분석 결과가 있으면 크롤링/필터링/보고서 생성을 생략
+                        answer_cache = get_answer_cache()
+                        answer_namespace = os.getenv("MODEL", "")
+                        cached_answer = answer_cache.get(tasks, answer_namespace) if answer_cache is not None else None
                         
-                        if not raw_df.empty:
-                            if 'Content' in raw_df.columns:
-                                raw_df['Content'] = raw_df['Content'].astype(str).str.slice(0, 150)
-
+                        crawl_executor = get_crawl_executor() if get_crawl_executor is not None else None
+                        rejected_msg = None
+                        if crawl_executor is not None and cached_answer is None:
+                            admission = crawl_executor.admit(len(tasks))
+                            if not admission['accepted']:
+                                rejected_msg = f"😥 현재 분석 요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요. (대기 {admission['queue_depth']}건, 예상 대기 약 {admission['estimated_wait']:.0f}초)"
+                            elif admission['estimated_wait'] > 0:
+                                status.write(f"⏳ 크롤링 대기열 {admission['queue_depth']}건, 예상 대기 약 {admission['estimated_wait']:.0f}초")
+                        
+                        raw_df = target_df = pd.DataFrame()
+                        if cached_answer is not None:
+                            raw_df = target_df = cached_answer['references']
+                        elif rejected_msg is None:
+                            try:
+                                session_executor = crawl_executor.session(st.session_state.crawl_session_id) if crawl_executor is not None else None
+                                raw_df, target_df, filter_summary = collect_report_sample(tasks, CONTEXT_MAX_POSTS * 2, session_executor)
+                            except CrawlRejected as e:
+                                rejected_msg = f"😥 현재 분석 요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요. ({e})"
+                        
+                        if cached_answer is not None:
+                            age = format_age(cached_answer['age'])
+                            status.write(f"♻️ **저장된 분석 결과 사용**: 같은 검색의 결과가 {age}에 생성되어 있어 즉시 표시합니다.")
+                            
+                            full_response = f"> 🕒 {age}에 수집된 데이터를 기반으로 한 분석 결과입니다.\n\n" + cached_answer['report']
+                            if cached_answer['sentiment_counts'] or cached_answer['topic_counts']:
+                                record_search_stats(tasks, cached_answer['sentiment_counts'], cached_answer['topic_counts'])
+                            full_response += build_reference_links(target_df, cached_answer['reference_ids'])
+                            message_placeholder.markdown(full_response)
+                            
+                            if not target_df.empty:
+                                render_reference_list(target_df)
+                            
+                            status.update(label=f"분석 완료! ({age} 결과 재사용)", state="complete", expanded=False)
+                        
+                        elif not raw_df.empty:
                             initial_count = len(raw_df)
                             status.write(f"✅ 총 {initial_count}건의 데이터를 수집했습니다.")
-                            status.update(label="혐오 표현을 필터링하고 있습니다...", state="running")
                             
-                            # [Step 3] 혐오 표현 필터링
-                            try:
-                                clean_df = filter_hate_speech(raw_df)
-                                target_df = clean_df.head(30) # 최신 30건 사용
-                                
-                                # target_df를 로컬 변수로 사용 (메시지에 저장됨)
-                                
-                                filtered_cnt = initial_count - len(clean_df)
-                                used_cnt = len(target_df)
-                                
-                                msg = f"🧹 **필터링 완료**: {filtered_cnt}건의 부적절한 게시물을 제외했습니다. (분석 대상: 최근 {used_cnt}건)"
-                                status.write(msg)
-                                    
-                            except Exception as e:
-                                st.warning(f"필터링 중 오류 발생: {e}")
-                                clean_df = raw_df
-                                target_df = clean_df.head(30)
+                            for error in filter_summary['errors']:
+                                st.warning(f"필터링 중 오류 발생: {error}")
+                            
+                            filtered_cnt = filter_summary['dropped_rows']
+                            
+                            # 비슷한 글이 반복되지 않도록 토큰 예산 안에서 근거 게시물 선정 (ID = target_df 순번 + 1)
+                            query = " ".join([prompt] + [t.get('keyword', '') for t in tasks])
+                            target_df, context_stats = select_context(target_df, query)
+                            used_cnt = len(target_df)
+                            
+                            msg = f"🧹 **필터링 완료**: {filtered_cnt}건의 부적절한 게시물을 제외했습니다. (분석 대상: 후보 {context_stats['candidates']}건 중 {used_cnt}건, 검사 텍스트 {filter_summary['scored_texts']}개)"
+                            status.write(msg)
+                            if context_stats['skipped_duplicates']:
+                                status.write(f"🧩 중복에 가까운 게시물 {context_stats['skipped_duplicates']}건을 보고서 근거에서 제외했습니다. (약 {context_stats['tokens']} 토큰)")
                             
                             status.update(label="최종 보고서를 작성하고 있습니다...", state="running")
                             
@@ -552,51 +784,26 @@ with chat_col:
                                         topic_counts = json_data.get("topic_counts", {})
                                         
                                         # [수정] 통계를 search_history에 추가 (History Logic)
-                                        sources = set([t.get('target_source').upper() for t in tasks])
-                                        keywords = set([t.get('keyword') for t in tasks])
-                                        label = f"{', '.join(sources)} - {', '.join(keywords)}"
-                                        
-                                        new_history_item = {
-                                            "label": label,
-                                            "timestamp": time.time(),
-                                            "sentiment": sentiment_counts,
-                                            "topics": topic_counts
-                                        }
+                                        record_search_stats(tasks, sentiment_counts, topic_counts)
                                         
-                                        st.session_state.search_history.append(new_history_item)
-                                        # 인덱스를 가장 최신(마지막)으로 이동
-                                        st.session_state.current_view_index = len(st.session_state.search_history) - 1
-                                            
-                                        # 우측 대시보드 리렌더링
-                                        render_stats_dashboard()
+                                        # 통계까지 정상적으로 생성된 결과만 공유 캐시에 저장 (다른 세션의 같은 검색에서 재사용)
+                                        if answer_cache is not None:
+                                            try:
+                                                answer_cache.put(tasks, report_content, ref_ids, sentiment_counts, topic_counts, target_df, answer_namespace)
+                                            except Exception as e:
+                                                print(f"[DEBUG] Answer cache store failed: {e}")
 
                                     except json.JSONDecodeError:
                                         print(f"[DEBUG] JSON Parsing failed")
 
                                 # [UI 구성 1] 추천 링크 추가
-                                if ref_ids:
-                                    full_response += "\n\n---\n### 🔗 Gemini가 참고한 핵심 게시글\n"
-                                    cols = {c.lower(): c for c in target_df.columns}
-                                    url_col = cols.get('posturl') or cols.get('url') or cols.get('link')
-                                    title_col = cols.get('title', 'Title')
-
-                                    if url_col:
-                                        for ref_id in ref_ids:
-                                            target_idx = ref_id - 1
-                                            if 0 <= target_idx < len(target_df):
-                                                row = target_df.iloc[target_idx]
-                                                full_response += f"- [{row[title_col]}]({row[url_col]})\n"
+                                full_response += build_reference_links(target_df, ref_ids)
                             
                                 message_placeholder.markdown(full_response)
                                 
                                 # [수정] Expander 즉시 렌더링 (Rerun 기다리지 않음)
                                 if not target_df.empty:
-                                    with st.expander(f"📚 사용된 전체 게시글 보기 ({len(target_df)}건)"):
-                                        cols = {c.lower(): c for c in target_df.columns}
-                                        url_col = cols.get('posturl') or cols.get('url') or cols.get('link')
-                                        title_col = cols.get('title', 'Title')
-                                        for i, (idx, row) in enumerate(target_df.iterrows()):
-                                            st.markdown(f"**{i+1}.** [{row[title_col]}]({row[url_col]}) ({row.get('Source', '')})")
+                                    render_reference_list(target_df)
 
                             except Exception as e:
                                 full_response += f"\n\n(오류 발생: {str(e)})"
@@ -605,9 +812,9 @@ with chat_col:
                             status.update(label="분석 완료! (아래에서 전체 목록을 확인하세요)", state="complete", expanded=False)
                                 
                         else:
-                            full_response = "😥 검색 결과가 없습니다."
+                            full_response = rejected_msg or "😥 검색 결과가 없습니다."
                             message_placeholder.markdown(full_response)
-                            status.update(label="검색 실패", state="error", expanded=False)
+                            status.update(label="요청 대기열 초과" if rejected_msg else "검색 실패", state="error", expanded=False)
                     
                     else:
                         # Chat 모드
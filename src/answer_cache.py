@@ -0,0 +1,125 @@
+import io
+import os
+import json
+import time
+import pandas as pd
+
+try:
+    from .plan_cache import normalize_prompt
+    from .sqlite_store import SqliteTTLStore, process_singleton
+except ImportError:
+    from plan_cache import normalize_prompt
+    from sqlite_store import SqliteTTLStore, process_singleton
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 분석 결과 캐시 사용 여부와 저장 경로 (여러 Streamlit 세션/프로세스가 같은 파일을 공유)
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE", "1").lower() in ("1", "true", "yes")
+ANSWER_CACHE_PATH = os.path.join(BASE_DIR, 'cache', 'answer_cache.sqlite')
+# 결과 유효 시간(초): 커뮤니티 여론은 빠르게 바뀌므로 기본 10분
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "600"))
+# 최대 저장 항목 수 (초과 시 가장 오래 사용되지 않은 항목부터 삭제)
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "200"))
+
+
+def normalize_tasks(tasks):
+    """
+    검색 계획의 task 목록을 캐시 키용 문자열로 정규화합니다.
+    소스는 소문자, 키워드는 normalize_prompt로 정리하고, 값이 없는(null) 옵션은 제외한 뒤 정렬하므로
+    task 순서나 옵션 표기(예: end_page 1 / "1")가 달라도 같은 검색이면 같은 키가 됩니다.
+    """
+    normalized = []
+    for task in tasks:
+        options = task.get("options") or {}
+        normalized.append([
+            str(task.get("target_source") or "").strip().lower(),
+            normalize_prompt(str(task.get("keyword") or "")),
+            sorted((str(k), str(v).strip().lower()) for k, v in options.items() if v not in (None, "")),
+        ])
+    return json.dumps(sorted(normalized), ensure_ascii=False)
+
+
+def format_age(seconds):
+    """캐시된 결과의 경과 시간을 사람이 읽기 쉬운 문자열로 바꿉니다. (예: '3분 전')"""
+    seconds = max(0, int(seconds))
+    if seconds < 60:
+        return f"{seconds}초 전"
+    if seconds < 3600:
+        return f"{seconds // 60}분 전"
+    return f"{seconds // 3600}시간 {seconds % 3600 // 60}분 전"
+
+
+class AnswerCache:
+    """
+    (정규화된 task 목록, 모델 네임스페이스) 단위로 분석 결과 전체를 저장하는 로컬 SQLite 저장소입니다.
+
+    같은 화제를 여러 사용자가 짧은 시간 안에 물으면 요청마다 크롤링, 혐오 표현 필터링, 보고서 생성을 반복하게 되므로,
+    보고서 본문, reference_ids, 감성/주제 통계, 보고서 근거 게시물(target_df)을 TTL 동안 저장해 두고 즉시 재사용합니다.
+    항목 수가 max_entries를 넘으면 가장 오래 사용되지 않은 항목부터 삭제합니다. (SqliteTTLStore)
+    """
+    def __init__(self, path=ANSWER_CACHE_PATH, ttl=ANSWER_CACHE_TTL, max_entries=ANSWER_CACHE_MAX_ENTRIES, clock=time.time):
+        self.path = path
+        self._store = SqliteTTLStore(path, 'answer_entries', ttl, max_entries, clock)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, tasks, namespace=""):
+        """
+        task 목록에 대한 저장된 분석 결과를 반환합니다. (없거나 만료되었으면 None)
+
+        Returns:
+            dict | None: report, reference_ids, sentiment_counts, topic_counts,
+                         references(DataFrame), created_at, age(초)
+        """
+        row = self._store.get(namespace, normalize_tasks(tasks))
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+
+        answer = json.loads(row[0])
+        # 근거 게시물은 문자열 그대로 복원 (날짜/숫자처럼 보이는 값을 변환하지 않음)
+        answer['references'] = pd.read_json(io.StringIO(answer['references']), orient='split', dtype=False, convert_dates=False)
+        answer['created_at'] = row[1]
+        answer['age'] = self._store.now() - row[1]
+        return answer
+
+    def put(self, tasks, report, reference_ids, sentiment_counts, topic_counts, references, namespace=""):
+        """분석 결과를 저장하고, 만료된 항목과 최대 항목 수를 넘는 오래된 항목을 정리합니다."""
+        answer = {
+            'report': report,
+            'reference_ids': list(reference_ids or []),
+            'sentiment_counts': sentiment_counts or {},
+            'topic_counts': topic_counts or {},
+            'references': references.to_json(orient='split', force_ascii=False, index=False),
+        }
+        self._store.put(namespace, normalize_tasks(tasks), json.dumps(answer, ensure_ascii=False))
+
+    def clear(self):
+        """저장된 모든 분석 결과를 삭제합니다."""
+        self._store.clear()
+
+    def stats(self):
+        """캐시 적중 통계를 반환합니다."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': self._store.size(),
+            'path': self.path,
+        }
+
+    def close(self):
+        self._store.close()
+
+
+# 프로세스 전역 분석 결과 캐시
+_shared_answer_cache = process_singleton(AnswerCache)
+
+
+def get_answer_cache():
+    """프로세스 전역 분석 결과 캐시를 반환합니다. (ANSWER_CACHE=0이면 None)"""
+    if not ANSWER_CACHE_ENABLED:
+        return None
+    return _shared_answer_cache()
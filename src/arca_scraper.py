@@ -1,21 +1,15 @@
-import time
 import random
 import re
 import pandas as pd
 import urllib.parse
 
-# Selenium 관련 Import
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from selenium.common.exceptions import TimeoutException, WebDriverException
-from webdriver_manager.chrome import ChromeDriverManager
-
 # BeautifulSoup Import
 from bs4 import BeautifulSoup
 
+# Selenium/webdriver_manager는 임포트 비용이 크므로 search_arca 안에서 임포트합니다.
+from .driver_manager import chrome_service
+from .crawl_budget import polite_delay, crawl_stopped
+
 
 # BASE URL 정의
 BASE_URL = "https://arca.live" 
@@ -33,6 +27,9 @@ USER_AGENT_LIST = [
 # robots.txt에 명시된 크롤링 금지(Disallow) 채널 ID 목록 정의
 DISALLOWED_CHANNEL_IDS = {'my'} 
 
+# 제목/본문에서 제거할 URL 패턴
+URL_PATTERN = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$\-@\.&+:/?=]|[!*\(\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
+
 def extract_arca_comments(soup):
     """
     ArcaLive 게시물에서 댓글을 추출합니다.
@@ -58,11 +55,23 @@ def extract_arca_comments(soup):
         
     return comments_formatted
 
-def search_arca(channel_id: str = 'breaking', search_keyword: str = "", start_page: int = 1, end_page: int = 1) -> pd.DataFrame:
+def search_arca(channel_id: str = 'breaking', search_keyword: str = "", start_page: int = 1, end_page: int = 1, title_prescreen=None,
+                stop_event=None, max_posts=None, on_post=None) -> pd.DataFrame:
     """
     아카라이브 채널 목록 및 채널 내 검색, 통합 검색(channel_id='breaking' 사용)을 Selenium을 사용하여 수행합니다.
     게시글 본문과 함께 텍스트 댓글을 수집하여 저장합니다.
+    
+    title_prescreen (callable, 선택): 목록 페이지의 게시물 후보 리스트를 받아 본문을 요청할 후보만 반환하는 함수.
+        (예: preprocessor.TitlePrescreen) 지정하지 않으면 모든 게시물을 수집합니다.
+    stop_event (threading.Event, 선택): 설정되면 다음 게시물 요청 전에 수집을 중단하고 그때까지의 결과를 반환합니다.
+    max_posts (int, 선택): 이 수만큼 게시물을 수집하면 중단합니다.
+    on_post (callable, 선택): 게시물 하나를 수집할 때마다 해당 행(dict)으로 호출됩니다. (예: crawl_budget.CrawlBudget)
     """
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
     
     data_list = []
     
@@ -114,8 +123,7 @@ def search_arca(channel_id: str = 'breaking', search_keyword: str = "", start_pa
     
     driver = None
     try:
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
+        driver = webdriver.Chrome(service=chrome_service(), options=options)
         # eager 모드이므로 타임아웃을 20초로 단축
         driver.set_page_load_timeout(20)
         print("[DEBUG] Arca WebDriver 초기화 성공")
@@ -127,6 +135,8 @@ def search_arca(channel_id: str = 'breaking', search_keyword: str = "", start_pa
 
     try:
         for i in range(int(start_page), int(end_page) + 1):
+            if crawl_stopped(stop_event, len(data_list), max_posts):
+                break
             
             # ----------------------
             # 1단계: 목록 페이지 요청 URL 구성 및 로딩
@@ -173,8 +183,9 @@ def search_arca(channel_id: str = 'breaking', search_keyword: str = "", start_pa
             print(f"-> [ARCA] 페이지 {i}에서 {len(article_list)}개의 게시물 목록 확보.")
             
             # ----------------------
-            # 2단계: 개별 게시물 접근 및 내용 추출 
+            # 2단계: 목록에서 게시물 후보(ID, 제목, URL, 채널) 추출
             # ----------------------
+            candidates = []
             for a_item in article_list:
                 
                 relative_url = a_item.get('href')
@@ -202,15 +213,37 @@ def search_arca(channel_id: str = 'breaking', search_keyword: str = "", start_pa
                         gallery_id_for_output = badge_tag.get_text(strip=True)
                     else:
                         gallery_id_for_output = "Unknown Channel"
+
+                candidates.append({
+                    'Site': 'ARCALIVE',
+                    'PostID': post_id,
+                    'Title': re.sub(pattern=URL_PATTERN, repl='', string=title_raw).strip(),
+                    'GalleryID': gallery_id_for_output,
+                    'PostURL': post_full_url
+                })
+
+            # 제목 사전 필터: 어차피 제거될 게시물은 본문 요청을 생략
+            if title_prescreen is not None:
+                candidates = title_prescreen(candidates)
+
+            # ----------------------
+            # 3단계: 개별 게시물 접근 및 내용 추출 
+            # ----------------------
+            for candidate in candidates:
+                post_id = candidate['PostID']
+                post_full_url = candidate['PostURL']
+                title_clean = candidate['Title']
+                gallery_id_for_output = candidate['GalleryID']
                 
-                time.sleep(random.uniform(1.5, 3.5)) 
+                if crawl_stopped(stop_event, len(data_list), max_posts) or polite_delay(stop_event):
+                    break
                 
                 # 게시물 본문 요청
                 article_contents = ""
                 comments_formatted = ""
 
                 try:
-                    print(f"    -> [ARCA] 게시물 본문 요청: {title_raw[:20]}... (ID: {post_id}, 채널: {gallery_id_for_output})")
+                    print(f"    -> [ARCA] 게시물 본문 요청: {title_clean[:20]}... (ID: {post_id}, 채널: {gallery_id_for_output})")
                     driver.get(post_full_url) 
                     
                     WebDriverWait(driver, 5).until(
@@ -243,13 +276,10 @@ def search_arca(channel_id: str = 'breaking', search_keyword: str = "", start_pa
                     continue
                 
                 # ----------------------
-                # 3단계: 데이터 클리닝 및 저장
+                # 4단계: 데이터 클리닝 및 저장
                 # ----------------------
                 
-                pattern = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$\-@\.&+:/?=]|[!*\(\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
-                repl = ''
-                title_clean = re.sub(pattern=pattern, repl=repl, string=title_raw).strip()
-                article_contents_clean = re.sub(pattern=pattern, repl=repl, string=article_contents).strip()
+                article_contents_clean = re.sub(pattern=URL_PATTERN, repl='', string=article_contents).strip()
                 
                 if article_contents_clean:
                     data_list.append({
@@ -261,6 +291,8 @@ def search_arca(channel_id: str = 'breaking', search_keyword: str = "", start_pa
                         'GalleryID': gallery_id_for_output, 
                         'PostURL': post_full_url
                     })
+                    if on_post is not None:
+                        on_post(data_list[-1])
 
     finally:
         if driver:
@@ -268,7 +300,7 @@ def search_arca(channel_id: str = 'breaking', search_keyword: str = "", start_pa
             print("--- WebDriver 종료 ---")
 
     # ----------------------
-    # 4단계: 리스트를 최종 DataFrame으로 변환 및 중복 제거
+    # 5단계: 리스트를 최종 DataFrame으로 변환 및 중복 제거
     # ----------------------
     df = pd.DataFrame(data_list)
 
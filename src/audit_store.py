@@ -0,0 +1,418 @@
+import os
+import re
+import sys
+import json
+import glob
+import time
+import uuid
+import queue
+import atexit
+import threading
+from datetime import datetime, date
+
+# --- 경로 및 환경 설정 ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 감사 로그 저장소 위치 (날짜별 파티션 폴더: date=YYYY-MM-DD/part-*.parquet)
+AUDIT_DIR = os.getenv("HATE_AUDIT_DIR", os.path.join(BASE_DIR, 'logs', 'audit'))
+# 백그라운드 기록 주기(초): 이 시간 동안 모인 항목을 파티션별 파일 하나로 기록
+AUDIT_FLUSH_INTERVAL = float(os.getenv("HATE_AUDIT_FLUSH_INTERVAL", "2.0"))
+# 한 파티션의 파일 수가 이 값을 넘으면 기록 스레드가 자동으로 하나로 합침 (0이면 자동 병합 안 함)
+AUDIT_COMPACT_THRESHOLD = int(os.getenv("HATE_AUDIT_COMPACT_THRESHOLD", "32"))
+# 병합 중인 파티션 표시 파일 (앱/일괄 처리 CLI 등 여러 프로세스가 같은 파티션을 동시에 병합하지 않도록 함)
+_COMPACT_LOCK_NAME = "_compacting.lock"
+# 병합 잠금 파일이 이보다 오래되었으면 비정상 종료된 프로세스가 남긴 것으로 보고 제거(초)
+_COMPACT_LOCK_STALE = 600
+
+# 항목 데이터(dict)의 키 -> 저장소 컬럼 매핑
+_DATA_COLUMNS = {
+    'Site': 'site',
+    'PostID': 'post_id',
+    'GalleryID': 'gallery_id',
+    'PostURL': 'post_url',
+    'Source': 'source',
+    'Keyword': 'keyword',
+    'Title': 'title',
+    'Content': 'content',
+    'Comments': 'comments',
+    'Comment': 'comment',
+}
+# 문자열 컬럼 순서 (스키마 고정: 파일마다 컬럼 구성이 달라지지 않도록 함)
+_STRING_COLUMNS = ['run_id', 'stage', 'reason'] + list(_DATA_COLUMNS.values()) + ['extra']
+
+
+def _audit_schema():
+    import pyarrow as pa
+    fields = [pa.field('logged_at', pa.timestamp('us')), pa.field('p_hate', pa.float64())]
+    fields += [pa.field(name, pa.string()) for name in _STRING_COLUMNS]
+    return pa.schema(fields)
+
+
+def _to_str(value):
+    if value is None:
+        return None
+    if isinstance(value, float) and value != value:  # NaN
+        return None
+    return str(value)
+
+
+def to_audit_records(dropped_rows, stage, run_id=None, logged_at=None):
+    """
+    filter_hate_speech/TitlePrescreen의 제거 항목({'reason', 'p_hate', 'data'})을 저장소 레코드로 변환합니다.
+    알려진 필드는 개별 컬럼으로, 그 외 필드는 extra 컬럼에 JSON 문자열로 저장합니다.
+    """
+    logged_at = logged_at or datetime.now()
+    run_id = run_id or uuid.uuid4().hex[:12]
+    records = []
+    for item in dropped_rows:
+        record = {'logged_at': logged_at, 'run_id': run_id, 'stage': stage,
+                  'reason': item['reason'], 'p_hate': float(item['p_hate'])}
+        extra = {}
+        for key, value in item['data'].items():
+            column = _DATA_COLUMNS.get(key)
+            if column is not None:
+                record[column] = _to_str(value)
+            elif _to_str(value) is not None:
+                extra[key] = _to_str(value)
+        record['extra'] = json.dumps(extra, ensure_ascii=False) if extra else None
+        records.append(record)
+    return records
+
+
+class AuditStore:
+    """
+    혐오 필터링으로 제거된 항목을 날짜별로 파티션된 Parquet 파일에 추가 기록하는 감사 로그 저장소입니다.
+
+    append()는 제거 항목을 큐에 넣고 바로 반환하며, 레코드 변환과 파일 기록은 백그라운드 스레드가
+    flush_interval마다 모인 항목을 파티션(date=YYYY-MM-DD)별 파일 하나로 묶어 수행합니다.
+    파일은 임시 이름으로 쓴 뒤 교체하므로 조회 중에 반쯤 쓰인 파일이 읽히지 않습니다.
+    작은 파일이 쌓인 파티션은 compact()로 하나의 파일로 합칠 수 있으며, 조회는 scan_audit()/dropped_counts()를 사용합니다.
+    """
+    def __init__(self, root=AUDIT_DIR, flush_interval=AUDIT_FLUSH_INTERVAL, compact_threshold=AUDIT_COMPACT_THRESHOLD):
+        # Parquet 기록에 필요한 pyarrow가 없으면 생성 단계에서 ImportError (호출 측은 CSV 로그로 대체)
+        import pyarrow  # noqa: F401
+        self.root = root
+        self.flush_interval = flush_interval
+        self.compact_threshold = compact_threshold
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()          # 기록/병합 직렬화
+        self._thread_lock = threading.Lock()
+        self._thread = None
+        self._stopping = threading.Event()
+        self.written_records = 0
+        self.written_files = 0
+
+    # --- 기록 ---
+    def append(self, dropped_rows, stage, run_id=None, logged_at=None):
+        """
+        제거 항목 리스트를 기록 대기열에 추가합니다. (변환/파일 기록을 기다리지 않음)
+
+        Args:
+            dropped_rows (list): {'reason', 'p_hate', 'data'} 형태의 딕셔너리 리스트
+            stage (str): 제거 단계 ('filter': filter_hate_speech, 'prescreen': 제목 사전 필터)
+        """
+        if not dropped_rows:
+            return
+        self._ensure_writer()
+        self._queue.put((list(dropped_rows), stage, run_id, logged_at or datetime.now()))
+
+    def _ensure_writer(self):
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._writer_loop, name="audit-writer", daemon=True)
+                self._thread.start()
+
+    def _drain(self, first_batch):
+        batches = [first_batch]
+        while True:
+            try:
+                batches.append(self._queue.get_nowait())
+            except queue.Empty:
+                return batches
+
+    def _writer_loop(self):
+        while not (self._stopping.is_set() and self._queue.empty()):
+            try:
+                first_batch = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            # 짧은 간격 동안 들어온 항목을 모아 파일 수를 줄임
+            if not self._stopping.is_set():
+                self._stopping.wait(self.flush_interval)
+            batches = self._drain(first_batch)
+            try:
+                self._write([record for batch in batches for record in to_audit_records(*batch)])
+            except Exception as e:
+                print(f"[오류] 감사 로그 기록 실패 ({sum(len(batch[0]) for batch in batches)}개 항목): {e}")
+            finally:
+                for _ in batches:
+                    self._queue.task_done()
+
+    def _partition_dir(self, day):
+        return os.path.join(self.root, f"date={day.isoformat()}")
+
+    def _write(self, records):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        by_day = {}
+        for record in records:
+            by_day.setdefault(record['logged_at'].date(), []).append(record)
+
+        schema = _audit_schema()
+        with self._lock:
+            for day, day_records in by_day.items():
+                partition = self._partition_dir(day)
+                os.makedirs(partition, exist_ok=True)
+                name = f"part-{datetime.now().strftime('%H%M%S%f')}-{uuid.uuid4().hex[:8]}.parquet"
+                table = pa.Table.from_pylist(day_records, schema=schema)
+                self._write_table(pq, table, os.path.join(partition, name))
+                self.written_records += len(day_records)
+                self.written_files += 1
+
+                if self.compact_threshold and len(self._partition_files(partition)) > self.compact_threshold:
+                    # 병합 실패는 기록 실패와 구분 (항목은 이미 파일로 기록됨)
+                    try:
+                        self._compact_partition(partition)
+                    except Exception as e:
+                        print(f"[경고] 감사 로그 병합 실패 ({os.path.basename(partition)}, 기록된 항목은 유지됨): {e}")
+
+    @staticmethod
+    def _write_table(pq, table, path):
+        tmp_path = f"{path}.tmp"
+        pq.write_table(table, tmp_path, compression='zstd')
+        os.replace(tmp_path, path)
+
+    def flush(self, timeout=None):
+        """
+        대기 중인 항목이 모두 파일로 기록될 때까지 기다립니다.
+
+        Returns:
+            bool: 제한 시간 내에 모두 기록되었으면 True
+        """
+        if self._thread is None:
+            return True
+        done = threading.Event()
+
+        def wait_queue():
+            self._queue.join()
+            done.set()
+
+        threading.Thread(target=wait_queue, daemon=True).start()
+        return done.wait(timeout)
+
+    def close(self, timeout=10):
+        """남은 항목을 기록하고 기록 스레드를 종료합니다."""
+        self._stopping.set()
+        with self._thread_lock:
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    # --- 병합 ---
+    @staticmethod
+    def _partition_files(partition):
+        return sorted(glob.glob(os.path.join(partition, "*.parquet")))
+
+    @staticmethod
+    def _acquire_compact_lock(partition):
+        """
+        파티션 병합 잠금 파일을 생성합니다. (O_CREAT | O_EXCL이므로 프로세스 간에도 한 곳만 성공)
+        다른 프로세스가 병합 중이면 False를 반환하며, 오래된 잠금 파일은 제거하고 한 번 더 시도합니다.
+        """
+        lock_path = os.path.join(partition, _COMPACT_LOCK_NAME)
+        for _ in range(2):
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(lock_path) > _COMPACT_LOCK_STALE:
+                        os.remove(lock_path)
+                        continue
+                except FileNotFoundError:
+                    continue
+                return False
+            with os.fdopen(fd, 'w') as f:
+                f.write(f"{os.getpid()}\n")
+            return True
+        return False
+
+    def _compact_partition(self, partition):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not self._acquire_compact_lock(partition):
+            # 다른 프로세스가 같은 파티션을 병합 중이면 건너뜀 (같은 파일을 각자 합쳐 행이 중복되는 것을 방지)
+            return 0
+        try:
+            files = self._partition_files(partition)
+            if len(files) < 2:
+                return 0
+            table = pa.concat_tables([pq.read_table(path, schema=_audit_schema()) for path in files])
+            table = table.sort_by('logged_at')
+            name = f"part-compacted-{datetime.now().strftime('%H%M%S%f')}-{uuid.uuid4().hex[:8]}.parquet"
+            # 합친 파일을 먼저 기록한 뒤 원본을 삭제 (중간에 실패해도 데이터가 사라지지 않음)
+            self._write_table(pq, table, os.path.join(partition, name))
+            for path in files:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            print(f"[정보] 감사 로그 병합: {os.path.basename(partition)} 파일 {len(files)}개 -> 1개 ({table.num_rows}행)")
+            return len(files)
+        finally:
+            try:
+                os.remove(os.path.join(partition, _COMPACT_LOCK_NAME))
+            except FileNotFoundError:
+                pass
+
+    def compact(self, min_files=2, before=None):
+        """
+        파일이 min_files개 이상인 파티션을 하나의 파일로 합칩니다.
+
+        Args:
+            min_files (int): 병합 대상이 되는 최소 파일 수
+            before (date): 지정하면 이 날짜 이전 파티션만 병합
+
+        Returns:
+            int: 병합된(삭제된) 원본 파일 수
+        """
+        merged = 0
+        with self._lock:
+            for partition in sorted(glob.glob(os.path.join(self.root, "date=*"))):
+                day = date.fromisoformat(os.path.basename(partition)[len("date="):])
+                if before is not None and day >= before:
+                    continue
+                if len(self._partition_files(partition)) >= min_files:
+                    merged += self._compact_partition(partition)
+        return merged
+
+    def stats(self):
+        return {
+            'root': self.root,
+            'pending_batches': self._queue.qsize(),
+            'written_records': self.written_records,
+            'written_files': self.written_files,
+        }
+
+
+# --- 조회 ---
+def scan_audit(root=AUDIT_DIR):
+    """
+    감사 로그 전체를 polars LazyFrame으로 엽니다. (date 컬럼은 파티션 폴더명에서 읽음)
+    필터/집계는 collect() 시점에 필요한 파티션과 컬럼만 읽어 수행됩니다.
+    아직 기록된 파티션이 없으면(새로 설치한 경우 등) 같은 스키마의 빈 LazyFrame을 반환합니다.
+    """
+    import polars as pl
+    pattern = os.path.join(root, "date=*", "*.parquet")
+    if not glob.glob(pattern):
+        schema = {'logged_at': pl.Datetime('us'), 'p_hate': pl.Float64}
+        schema.update({name: pl.String for name in _STRING_COLUMNS})
+        schema['date'] = pl.Date
+        return pl.LazyFrame(schema=schema)
+    return pl.scan_parquet(pattern, hive_partitioning=True)
+
+
+def dropped_counts(by=('date', 'reason', 'site'), reason=None, site=None, start_date=None, end_date=None, root=AUDIT_DIR):
+    """
+    제거 항목 수를 by 컬럼 기준으로 집계합니다.
+
+    Args:
+        by (tuple): 집계 기준 컬럼 (date, reason, site, stage, source, keyword 등)
+        reason (str | list): 제거 사유 필터 ('Title Hate', 'Content Hate', 'Comment Hate')
+        site (str | list): 사이트 필터 ('DCINSIDE', 'ARCALIVE')
+        start_date, end_date (date | str): 날짜 범위 (양 끝 포함)
+
+    Returns:
+        polars.DataFrame: by 컬럼 + count, avg_p_hate
+    """
+    import polars as pl
+
+    lf = scan_audit(root)
+    if reason is not None:
+        lf = lf.filter(pl.col('reason').is_in([reason] if isinstance(reason, str) else list(reason)))
+    if site is not None:
+        lf = lf.filter(pl.col('site').is_in([site] if isinstance(site, str) else list(site)))
+    if start_date is not None:
+        lf = lf.filter(pl.col('date') >= (date.fromisoformat(start_date) if isinstance(start_date, str) else start_date))
+    if end_date is not None:
+        lf = lf.filter(pl.col('date') <= (date.fromisoformat(end_date) if isinstance(end_date, str) else end_date))
+
+    by = list(by)
+    return (
+        lf.group_by(by)
+        .agg(pl.len().alias('count'), pl.col('p_hate').mean().alias('avg_p_hate'))
+        .sort(by)
+        .collect()
+    )
+
+
+def import_csv_logs(log_dir, store):
+    """
+    기존 CSV 감사 로그(logs/*dropped_hate_speech_YYYYMMDD_HHMMSS.csv)를 저장소로 옮깁니다.
+    기록 시각은 파일명의 타임스탬프를 사용합니다.
+
+    Returns:
+        int: 옮긴 항목 수
+    """
+    import pandas as pd
+
+    total = 0
+    for path in sorted(glob.glob(os.path.join(log_dir, "*.csv"))):
+        match = re.match(r"(prescreen_)?dropped_hate_speech_(\d{8}_\d{6})\.csv$", os.path.basename(path))
+        if not match:
+            continue
+        logged_at = datetime.strptime(match.group(2), "%Y%m%d_%H%M%S")
+        log_df = pd.read_csv(path, encoding='utf-8-sig', dtype=str)
+        dropped_rows = []
+        for item in log_df.to_dict('records'):
+            reason = item.pop('Reason')
+            p_hate = item.pop('PHate')
+            dropped_rows.append({'reason': reason, 'p_hate': float(p_hate), 'data': item})
+        stage = 'prescreen' if match.group(1) else 'filter'
+        store.append(dropped_rows, stage, run_id=f"csv:{os.path.basename(path)}", logged_at=logged_at)
+        total += len(dropped_rows)
+    store.flush()
+    return total
+
+
+# 프로세스 전역 저장소
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_audit_store():
+    """프로세스 전역 감사 로그 저장소를 반환합니다. (최초 호출 시 생성)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = AuditStore()
+        return _store
+
+
+@atexit.register
+def _close_store():
+    # 프로세스 종료 전 대기 중인 항목을 기록
+    if _store is not None:
+        _store.close()
+
+
+# --- 실행 예시 ---
+# python -m src.audit_store import-csv   : 기존 CSV 로그를 저장소로 이전
+# python -m src.audit_store compact      : 오늘 이전 파티션의 작은 파일 병합
+# python -m src.audit_store summary      : 날짜/사유/사이트별 제거 항목 수 출력
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "summary"
+    audit_store = get_audit_store()
+
+    if command == "import-csv":
+        count = import_csv_logs(os.path.join(BASE_DIR, 'logs'), audit_store)
+        print(f"[완료] CSV 감사 로그 {count}개 항목을 {audit_store.root}로 옮겼습니다.")
+    elif command == "compact":
+        merged = audit_store.compact(before=date.today())
+        print(f"[완료] 파일 {merged}개를 병합했습니다.")
+    elif command == "summary":
+        print(dropped_counts())
+    else:
+        print(f"[오류] 알 수 없는 명령입니다: {command} (import-csv | compact | summary)")
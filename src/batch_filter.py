@@ -0,0 +1,262 @@
+import os
+import glob
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+from .preprocessor import (
+    filter_hate_speech, get_model_session, set_tokenizer_workers, BASE_DIR, MODEL_PATH, VECTORIZER_PATH, TOKENIZER_WORKERS
+)
+
+# 파일 하나를 나누어 읽을 때 한 청크의 행 수 (대용량 파일도 메모리 사용량이 청크 크기로 제한됨)
+BATCH_CHUNK_ROWS = int(os.getenv("HATE_BATCH_CHUNK_ROWS", "5000"))
+# 동시에 처리할 파일 수 (모델 세션은 모든 워커가 공유)
+BATCH_WORKERS = int(os.getenv("HATE_BATCH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# 필터링 결과 파일명 접두사 (preprocessor.py 실행 예시와 동일)
+OUTPUT_PREFIX = "filtered_"
+SUPPORTED_EXTENSIONS = ('.csv', '.parquet')
+
+
+def collect_inputs(patterns):
+    """
+    디렉토리 또는 glob 패턴 목록에서 처리할 CSV/Parquet 파일 목록을 만듭니다.
+    디렉토리는 바로 아래의 *.csv, *.parquet 파일을 대상으로 하며, 이미 필터링된 결과 파일(filtered_*)은 제외합니다.
+    """
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+        else:
+            matches = glob.glob(pattern, recursive=True)
+        for path in sorted(matches):
+            name = os.path.basename(path)
+            if not os.path.isfile(path) or not name.lower().endswith(SUPPORTED_EXTENSIONS):
+                continue
+            if name.startswith(OUTPUT_PREFIX):
+                continue
+            path = os.path.abspath(path)
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+
+def output_path_for(input_path, output_dir=None):
+    """입력 파일에 대응하는 결과 파일 경로 (기본: 입력 파일과 같은 폴더의 filtered_<파일명>)"""
+    directory = output_dir or os.path.dirname(input_path)
+    return os.path.join(directory, OUTPUT_PREFIX + os.path.basename(input_path))
+
+
+def iter_chunks(path, chunk_rows=BATCH_CHUNK_ROWS):
+    """파일을 chunk_rows 행 단위의 DataFrame으로 나누어 읽습니다. (CSV: read_csv chunksize, Parquet: iter_batches)"""
+    if path.lower().endswith('.parquet'):
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+        return
+
+    try:
+        reader = pd.read_csv(path, chunksize=chunk_rows, encoding='utf-8-sig')
+    except pd.errors.EmptyDataError:
+        return
+    with reader:
+        for chunk in reader:
+            yield chunk
+
+
+class _ChunkWriter:
+    """청크 단위 결과를 임시 파일에 이어 쓰고, 모두 끝나면 결과 경로로 원자적으로 교체합니다."""
+    def __init__(self, input_path, output_path):
+        self.output_path = output_path
+        self.tmp_path = f"{output_path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        self.is_parquet = output_path.lower().endswith('.parquet')
+        self._parquet_writer = None
+        self._schema = None
+        self._wrote_header = False
+        if self.is_parquet:
+            import pyarrow.parquet as pq
+            # 필터링은 컬럼 구성을 바꾸지 않으므로 입력 파일의 스키마를 그대로 사용 (청크마다 추론된 타입이 달라지는 것 방지)
+            self._schema = pq.ParquetFile(input_path).schema_arrow.remove_metadata()
+
+    def write(self, df):
+        if self.is_parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.tmp_path, self._schema, compression='zstd')
+            self._parquet_writer.write_table(table)
+            return
+
+        df.to_csv(
+            self.tmp_path, mode='w' if not self._wrote_header else 'a', header=not self._wrote_header,
+            index=False, encoding='utf-8-sig' if not self._wrote_header else 'utf-8'
+        )
+        self._wrote_header = True
+
+    def commit(self, empty_columns=None):
+        if self.is_parquet:
+            import pyarrow.parquet as pq
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.tmp_path, self._schema, compression='zstd')
+            self._parquet_writer.close()
+        elif not self._wrote_header:
+            pd.DataFrame(columns=empty_columns or []).to_csv(self.tmp_path, index=False, encoding='utf-8-sig')
+        os.replace(self.tmp_path, self.output_path)
+
+    def abort(self):
+        if self._parquet_writer is not None:
+            try:
+                self._parquet_writer.close()
+            except Exception:
+                pass
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+def filter_file(input_path, output_path, chunk_rows=BATCH_CHUNK_ROWS, model_path=MODEL_PATH, vectorizer_path=VECTORIZER_PATH):
+    """
+    파일 하나를 청크 단위로 읽어 filter_hate_speech를 적용하고 결과를 output_path에 저장합니다.
+    결과는 임시 파일에 기록한 뒤 os.replace로 교체하므로, 중간에 중단되어도 불완전한 결과 파일이 남지 않습니다.
+
+    Returns:
+        dict: 파일별 처리 결과 (입력/출력 행 수, 소요 시간)
+    """
+    start = time.perf_counter()
+    rows_in = 0
+    rows_out = 0
+    columns = None
+    writer = _ChunkWriter(input_path, output_path)
+    try:
+        for chunk in iter_chunks(input_path, chunk_rows):
+            columns = list(chunk.columns)
+            rows_in += len(chunk)
+            filtered = filter_hate_speech(chunk, model_path, vectorizer_path)
+            rows_out += len(filtered)
+            writer.write(filtered)
+        writer.commit(columns)
+    except BaseException:
+        writer.abort()
+        raise
+
+    return {
+        'file': input_path,
+        'output': output_path,
+        'status': 'done',
+        'rows_in': rows_in,
+        'rows_out': rows_out,
+        'elapsed': time.perf_counter() - start,
+    }
+
+
+def run_batch(patterns, output_dir=None, workers=BATCH_WORKERS, chunk_rows=BATCH_CHUNK_ROWS, overwrite=False,
+              model_path=MODEL_PATH, vectorizer_path=VECTORIZER_PATH, tokenizer_workers=None):
+    """
+    여러 크롤링 결과 파일을 워커 스레드 풀에서 병렬로 필터링합니다.
+    모든 워커는 프로세스 전역 모델 세션(get_model_session)을 공유하며, 모델은 작업 시작 전에 한 번만 로드합니다.
+    가장 비싼 Okt 형태소 분석은 프로세스 공유 인스턴스(_okt_lock)에서 직렬화되므로,
+    처리 중에는 토큰화 워커 풀(tokenizer_workers개 프로세스, 기본값: HATE_TOKENIZER_WORKERS가 2 이상이면 그 값, 아니면 workers)을 켜서
+    각 스레드의 토큰화를 별도 Okt 프로세스에서 병렬로 수행합니다. (0 또는 1이면 공유 Okt로 순차 처리)
+    결과 파일이 이미 있으면 건너뛰므로(overwrite=False), 중단된 작업을 같은 명령으로 이어서 실행할 수 있습니다.
+
+    Returns:
+        list[dict]: 입력 파일 순서대로 정렬된 파일별 처리 결과
+    """
+    inputs = collect_inputs(patterns)
+    if not inputs:
+        print("[경고] 처리할 CSV/Parquet 파일이 없습니다.")
+        return []
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    results = {}
+    pending = []
+    for path in inputs:
+        out_path = output_path_for(path, output_dir)
+        if os.path.exists(out_path) and not overwrite:
+            results[path] = {'file': path, 'output': out_path, 'status': 'skipped', 'rows_in': 0, 'rows_out': 0, 'elapsed': 0.0}
+        else:
+            pending.append((path, out_path))
+
+    if tokenizer_workers is None:
+        tokenizer_workers = TOKENIZER_WORKERS if TOKENIZER_WORKERS > 1 else workers
+    print(f"[시작] 파일 {len(inputs)}개 중 {len(pending)}개 처리 (건너뜀 {len(inputs) - len(pending)}개, 워커 {workers}개, 토큰화 워커 {tokenizer_workers}개, 청크 {chunk_rows}행)")
+    if pending:
+        # 워커들이 동시에 모델을 로드하지 않도록 미리 로드
+        get_model_session(model_path, vectorizer_path).get()
+
+    previous_tokenizer_workers = set_tokenizer_workers(tokenizer_workers)
+    try:
+        _run_pending(pending, results, workers, chunk_rows, model_path, vectorizer_path)
+    finally:
+        set_tokenizer_workers(previous_tokenizer_workers)
+
+    return [results[path] for path in inputs]
+
+
+def _run_pending(pending, results, workers, chunk_rows, model_path, vectorizer_path):
+    # 파일별 필터링을 워커 스레드 풀에서 실행하고 결과를 results(입력 경로 -> 처리 결과)에 기록
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {
+            executor.submit(filter_file, path, out_path, chunk_rows, model_path, vectorizer_path): (path, out_path)
+            for path, out_path in pending
+        }
+        for done_count, future in enumerate(as_completed(futures), start=1):
+            path, out_path = futures[future]
+            try:
+                result = future.result()
+                print(f"[진행] ({done_count}/{len(pending)}) {os.path.basename(path)} 완료: {result['rows_in']}행 -> {result['rows_out']}행")
+            except Exception as e:
+                result = {'file': path, 'output': out_path, 'status': 'failed', 'rows_in': 0, 'rows_out': 0, 'elapsed': 0.0, 'error': str(e)}
+                print(f"[오류] ({done_count}/{len(pending)}) {os.path.basename(path)} 처리 실패: {e}")
+            results[path] = result
+
+
+def print_summary(results, wall_time=None):
+    """파일별 처리 속도(행/초)와 삭제 비율을 표로 출력합니다."""
+    if not results:
+        return
+    summary = pd.DataFrame(results)
+    summary['file'] = summary['file'].map(os.path.basename)
+    summary['dropped'] = summary['rows_in'] - summary['rows_out']
+    summary['drop_rate(%)'] = (summary['dropped'] / summary['rows_in'].where(summary['rows_in'] > 0) * 100).round(2)
+    summary['rows/sec'] = (summary['rows_in'] / summary['elapsed'].where(summary['elapsed'] > 0)).round(1)
+    summary['elapsed(s)'] = summary['elapsed'].round(2)
+
+    print("\n[결과] 파일별 처리 요약")
+    print(summary[['file', 'status', 'rows_in', 'rows_out', 'dropped', 'drop_rate(%)', 'rows/sec', 'elapsed(s)']].to_string(index=False))
+
+    done = summary[summary['status'] == 'done']
+    if len(done):
+        total_in = int(done['rows_in'].sum())
+        total_dropped = int(done['dropped'].sum())
+        rate = total_dropped / total_in * 100 if total_in else 0.0
+        line = f"      전체: {total_in}행 중 {total_dropped}행 삭제 ({rate:.2f}%)"
+        if wall_time:
+            line += f", {total_in / wall_time:.1f}행/초 (경과 {wall_time:.1f}초)"
+        print(line)
+    failed = int((summary['status'] == 'failed').sum())
+    if failed:
+        print(f"[경고] 처리에 실패한 파일 {failed}개 (다시 실행하면 실패한 파일만 처리됩니다)")
+
+
+# --- 실행 예시: python -m src.batch_filter src/data ["src/data/**/*.parquet"] [--output-dir out] [--workers 4] [--tokenizer-workers 4] ---
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="크롤링 결과 파일 일괄 혐오 표현 필터링")
+    parser.add_argument("inputs", nargs='*', default=[os.path.join(BASE_DIR, 'data')], help="입력 디렉토리 또는 glob 패턴 (기본: src/data)")
+    parser.add_argument("--output-dir", default=None, help="결과 저장 폴더 (기본: 입력 파일과 같은 폴더)")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    parser.add_argument("--tokenizer-workers", type=int, default=None, help="토큰화 워커 프로세스 수 (기본: HATE_TOKENIZER_WORKERS 또는 --workers, 0: 공유 Okt로 순차 처리)")
+    parser.add_argument("--chunk-rows", type=int, default=BATCH_CHUNK_ROWS)
+    parser.add_argument("--overwrite", action='store_true', help="이미 있는 결과 파일도 다시 생성")
+    args = parser.parse_args()
+
+    batch_start = time.perf_counter()
+    batch_results = run_batch(args.inputs, args.output_dir, args.workers, args.chunk_rows, args.overwrite,
+                              tokenizer_workers=args.tokenizer_workers)
+    print_summary(batch_results, time.perf_counter() - batch_start)
@@ -0,0 +1,345 @@
+import os
+import io
+import sys
+import glob
+import json
+import time
+import shutil
+import platform
+import tempfile
+import tracemalloc
+import contextlib
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .preprocessor import (
+    get_model_session, tokenize_serial_tokens, vectorize_tokens, _predict_matrix, _collect_filter_texts, _apply_hate_filter,
+    save_dropped_log, BASE_DIR, AUDIT_FORMAT, SCORING_ENGINE
+)
+
+# 합성 데이터의 원본 문장을 가져올 폴더 (익명화된 감사 로그 CSV)
+SEED_LOG_DIR = os.path.join(BASE_DIR, 'logs')
+# 벤치마크 결과(JSON) 기본 저장 폴더
+BENCHMARK_DIR = os.path.join(BASE_DIR, 'benchmarks')
+# 성능 저하로 판단하는 기준 (처리량 감소율 또는 p95 지연 증가율)
+REGRESSION_TOLERANCE = 0.10
+
+STAGES = ['tokenize', 'vectorize', 'predict', 'filter_rebuild', 'log_write']
+
+# 감사 로그 CSV가 없을 때 사용하는 기본 문장
+_FALLBACK_SEEDS = [
+    "오늘 경기 진짜 재밌었다",
+    "이번 업데이트 패치노트 정리해봄",
+    "강릉 여행 숙소 추천 좀 해줘",
+    "감독 전술이 너무 답답하다",
+    "이 가격이면 살만한듯",
+    "댓글 보니까 다들 생각이 비슷하네",
+]
+
+
+def load_seed_texts(log_dir=SEED_LOG_DIR):
+    """감사 로그 CSV의 제목/본문/댓글 텍스트를 합성 데이터의 원본 문장으로 모읍니다."""
+    texts = []
+    for path in sorted(glob.glob(os.path.join(log_dir, '*.csv'))):
+        try:
+            log_df = pd.read_csv(path, encoding='utf-8-sig', dtype=str)
+        except Exception:
+            continue
+        for col in ['Title', 'Content', 'Comment']:
+            if col in log_df.columns:
+                texts.extend(log_df[col].dropna().tolist())
+        if 'Comments' in log_df.columns:
+            for value in log_df['Comments'].dropna():
+                texts.extend(value.split(' ||| '))
+    texts = list(dict.fromkeys(text.strip() for text in texts if isinstance(text, str) and text.strip()))
+    return texts or list(_FALLBACK_SEEDS)
+
+
+class SyntheticDataset:
+    """
+    원본 문장의 단어를 섞어 크롤링 결과와 같은 형태(Title, Content, Comments)의 합성 데이터를 만듭니다.
+    문장마다 원본 문장 하나를 골라 일부 단어를 다른 원본 문장의 단어로 바꾸므로,
+    실제 문장 길이 분포를 유지하면서도 대부분의 텍스트가 서로 달라 캐시 효과가 측정에 섞이지 않습니다.
+    """
+    def __init__(self, seed_texts=None, seed=42, mutation_rate=0.3):
+        self.seed_texts = seed_texts or load_seed_texts()
+        self.words = [word for text in self.seed_texts for word in text.split()]
+        self.mutation_rate = mutation_rate
+        self.rng = np.random.default_rng(seed)
+
+    def text(self):
+        words = self.seed_texts[self.rng.integers(len(self.seed_texts))].split() or ["빈문장"]
+        mutate = self.rng.random(len(words)) < self.mutation_rate
+        for i in np.flatnonzero(mutate):
+            words[i] = self.words[self.rng.integers(len(self.words))]
+        return " ".join(words)
+
+    def posts(self, n_posts, comments_per_post=5):
+        """
+        n_posts개의 게시물 DataFrame을 만듭니다.
+        게시물별 댓글 수는 평균이 comments_per_post인 포아송 분포를 따릅니다.
+        """
+        fanout = self.rng.poisson(comments_per_post, n_posts) if comments_per_post > 0 else np.zeros(n_posts, dtype=int)
+        return pd.DataFrame({
+            'Site': 'BENCHMARK',
+            'PostID': np.arange(n_posts),
+            'Title': [self.text() for _ in range(n_posts)],
+            'Content': [self.text() for _ in range(n_posts)],
+            'Comments': [" ||| ".join(self.text() for _ in range(k)) for k in fanout],
+        })
+
+
+def _batches(items, batch_size):
+    return [items[start:start + batch_size] for start in range(0, len(items), batch_size)]
+
+
+def _run_batches(fn, batches, quiet=True):
+    """배치마다 fn을 실행하고 (결과 리스트, 배치별 지연 시간(초) 리스트)를 반환합니다."""
+    outputs = []
+    latencies = []
+    sink = io.StringIO()
+    for batch in batches:
+        with contextlib.redirect_stdout(sink) if quiet else contextlib.nullcontext():
+            start = time.perf_counter()
+            outputs.append(fn(batch))
+            latencies.append(time.perf_counter() - start)
+        sink.seek(0)
+        sink.truncate()
+    return outputs, latencies
+
+
+def _peak_memory(fn, batches):
+    """tracemalloc으로 한 단계 전체를 실행하는 동안의 Python 힙 최대 사용량(MB)을 측정합니다."""
+    tracemalloc.start()
+    try:
+        _run_batches(fn, batches)
+        return tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    finally:
+        tracemalloc.stop()
+
+
+def _stage_report(items, latencies, peak_mb=None):
+    lat_ms = np.asarray(latencies, dtype=np.float64) * 1000.0
+    total = float(np.sum(latencies))
+    return {
+        'items': int(items),
+        'batches': len(latencies),
+        'total_s': round(total, 6),
+        'items_per_sec': round(items / total, 2) if total > 0 else None,
+        'latency_ms': {
+            'p50': round(float(np.percentile(lat_ms, 50)), 3),
+            'p95': round(float(np.percentile(lat_ms, 95)), 3),
+            'p99': round(float(np.percentile(lat_ms, 99)), 3),
+            'max': round(float(np.max(lat_ms)), 3),
+        } if len(lat_ms) else None,
+        'peak_mem_mb': round(peak_mb, 3) if peak_mb is not None else None,
+    }
+
+
+def run_benchmark(n_posts=1000, comments_per_post=5, batch_size=200, seed=42, measure_memory=True, session=None):
+    """
+    합성 데이터로 필터링 파이프라인을 단계별로 실행하고 단계별 처리량/지연 백분위/최대 메모리를 측정합니다.
+
+    단계는 tokenize(Okt 형태소 분석, 캐시 미사용) -> vectorize(TF-IDF) -> predict(모델 예측)
+    -> filter_rebuild(텍스트 수집, 마스크 적용, 댓글 재조립) -> log_write(감사 로그 기록) 순이며,
+    앞 단계의 결과를 다음 단계의 입력으로 사용합니다.
+    지연 시간은 배치(텍스트 단계는 batch_size개 텍스트, 게시물 단계는 batch_size개 게시물) 단위로 측정합니다.
+    최대 메모리는 시간 측정과 분리된 두 번째 실행에서 tracemalloc으로 측정하며, JVM(H2O, Okt) 메모리는 포함되지 않습니다.
+
+    Returns:
+        dict: {'meta': {...}, 'stages': {단계: {...}}} 형태의 JSON 직렬화 가능한 결과
+    """
+    session = session or get_model_session()
+    with contextlib.redirect_stdout(io.StringIO()):
+        model, vectorizer = session.get()
+
+    df = SyntheticDataset(seed=seed).posts(n_posts, comments_per_post)
+    _, texts = _collect_filter_texts(df)
+    text_batches = _batches(texts, batch_size)
+    post_batches = _batches(df, batch_size)
+
+    # 원문 입력 모델(레지스트리의 char-tfidf/hashing 변형)은 토큰화 단계 없이 원문을 그대로 벡터화
+    if getattr(vectorizer, 'input_kind', 'tokens') == 'text':
+        tokenize_fn, vectorize_fn = list, vectorizer.transform
+    else:
+        tokenize_fn, vectorize_fn = tokenize_serial_tokens, lambda tokens: vectorize_tokens(tokens, vectorizer)
+
+    # 첫 호출 비용(JVM 기동, 사전 로드 등)이 측정에 섞이지 않도록 한 번 미리 실행
+    _run_batches(lambda batch: _predict_matrix(vectorize_fn(tokenize_fn(batch)), model), text_batches[:1])
+
+    stage_fns = {}
+    stages = {}
+
+    stage_fns['tokenize'] = (tokenize_fn, text_batches)
+    tokenized, latencies = _run_batches(*stage_fns['tokenize'])
+    stages['tokenize'] = (len(texts), latencies)
+
+    stage_fns['vectorize'] = (vectorize_fn, tokenized)
+    matrices, latencies = _run_batches(*stage_fns['vectorize'])
+    stages['vectorize'] = (len(texts), latencies)
+
+    stage_fns['predict'] = (lambda X: _predict_matrix(X, model), matrices)
+    probs, latencies = _run_batches(*stage_fns['predict'])
+    stages['predict'] = (len(texts), latencies)
+    prob_map = dict(zip(texts, (p for chunk in probs for p in chunk)))
+
+    def filter_rebuild(batch):
+        parts, batch_texts = _collect_filter_texts(batch)
+        return _apply_hate_filter(batch, parts, [prob_map[text] for text in batch_texts])
+
+    stage_fns['filter_rebuild'] = (filter_rebuild, post_batches)
+    filtered, latencies = _run_batches(*stage_fns['filter_rebuild'])
+    stages['filter_rebuild'] = (n_posts, latencies)
+    dropped_batches = [dropped_rows for _, dropped_rows in filtered]
+
+    log_dir = tempfile.mkdtemp(prefix='hate_benchmark_')
+    try:
+        store = None
+        if AUDIT_FORMAT == 'parquet':
+            try:
+                from .audit_store import AuditStore
+                # 모으기 대기(flush_interval) 없이 변환/기록 비용만 측정
+                store = AuditStore(os.path.join(log_dir, 'audit'), flush_interval=0)
+            except ImportError:
+                store = None
+
+        def log_write(dropped_rows):
+            # Parquet 저장소는 백그라운드에서 기록하므로 실제 파일 기록까지 포함하여 측정
+            save_dropped_log(dropped_rows, stage='benchmark', store=store, log_dir=log_dir)
+            if store is not None:
+                store.flush()
+
+        stage_fns['log_write'] = (log_write, dropped_batches)
+        _, latencies = _run_batches(*stage_fns['log_write'])
+        stages['log_write'] = (sum(len(rows) for rows in dropped_batches), latencies)
+
+        peaks = {name: _peak_memory(*stage_fns[name]) for name in STAGES} if measure_memory else {}
+        if store is not None:
+            store.close()
+    finally:
+        shutil.rmtree(log_dir, ignore_errors=True)
+
+    n_kept = sum(len(frame) for frame, _ in filtered)
+    return {
+        'meta': {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'engine': getattr(session, 'engine', SCORING_ENGINE),
+            'model': session.fingerprint,
+            'audit_format': AUDIT_FORMAT,
+            'n_posts': n_posts,
+            'comments_per_post': comments_per_post,
+            'n_texts': len(texts),
+            'rows_dropped': n_posts - n_kept,
+            'items_logged': stages['log_write'][0],
+            'batch_size': batch_size,
+            'seed': seed,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+        },
+        'stages': {name: _stage_report(items, latencies, peaks.get(name)) for name, (items, latencies) in stages.items()},
+    }
+
+
+def compare_to_baseline(result, baseline, tolerance=REGRESSION_TOLERANCE):
+    """
+    기준 결과(baseline)와 단계별로 비교합니다.
+    처리량이 tolerance 이상 감소하거나 p95 지연이 tolerance 이상 증가한 단계를 성능 저하로 표시합니다.
+
+    Returns:
+        list[dict]: 단계별 비교 결과 ('regression' 키로 성능 저하 여부 표시)
+    """
+    def change(current, base):
+        if current is None or not base:
+            return None
+        return current / base - 1.0
+
+    rows = []
+    for name, current in result['stages'].items():
+        base = baseline.get('stages', {}).get(name)
+        if base is None:
+            continue
+        throughput = change(current['items_per_sec'], base['items_per_sec'])
+        p95 = change((current['latency_ms'] or {}).get('p95'), (base['latency_ms'] or {}).get('p95'))
+        memory = change(current['peak_mem_mb'], base['peak_mem_mb'])
+        rows.append({
+            'stage': name,
+            'items_per_sec': current['items_per_sec'],
+            'baseline_items_per_sec': base['items_per_sec'],
+            'throughput_change': throughput,
+            'p95_change': p95,
+            'peak_mem_change': memory,
+            'regression': (throughput is not None and throughput < -tolerance) or (p95 is not None and p95 > tolerance),
+        })
+    return rows
+
+
+def print_report(result, comparison=None):
+    """단계별 측정 결과(및 기준 결과 대비 변화)를 표로 출력합니다."""
+    meta = result['meta']
+    print(f"[결과] 벤치마크 ({meta['engine']} 엔진, 게시물 {meta['n_posts']}개, 텍스트 {meta['n_texts']}개, 배치 {meta['batch_size']})")
+    table = pd.DataFrame([
+        {
+            'stage': name,
+            'items': stage['items'],
+            'items/sec': stage['items_per_sec'],
+            'p50(ms)': (stage['latency_ms'] or {}).get('p50'),
+            'p95(ms)': (stage['latency_ms'] or {}).get('p95'),
+            'p99(ms)': (stage['latency_ms'] or {}).get('p99'),
+            'peak(MB)': stage['peak_mem_mb'],
+        }
+        for name, stage in result['stages'].items()
+    ])
+    print(table.to_string(index=False))
+
+    if comparison:
+        print("\n[결과] 기준 결과 대비 변화 (+: 증가)")
+        fmt = lambda value: "-" if value is None else f"{value:+.1%}"
+        print(pd.DataFrame([
+            {
+                'stage': row['stage'],
+                'throughput': fmt(row['throughput_change']),
+                'p95': fmt(row['p95_change']),
+                'peak_mem': fmt(row['peak_mem_change']),
+                'status': "저하" if row['regression'] else "정상",
+            }
+            for row in comparison
+        ]).to_string(index=False))
+
+
+# --- 실행 예시: python -m src.benchmark [--posts 1000] [--comments 5] [--baseline src/benchmarks/baseline.json] ---
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="혐오 표현 필터링 파이프라인 단계별 성능 측정")
+    parser.add_argument("--posts", type=int, default=1000, help="합성 게시물 수")
+    parser.add_argument("--comments", type=float, default=5, help="게시물당 평균 댓글 수")
+    parser.add_argument("--batch-size", type=int, default=200, help="지연 시간을 측정할 배치 크기")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-memory", action='store_true', help="tracemalloc 메모리 측정 생략")
+    parser.add_argument("--output", default=None, help="결과 JSON 경로 (기본: src/benchmarks/benchmark_<시각>.json)")
+    parser.add_argument("--baseline", default=None, help="비교할 기준 결과 JSON 경로")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE, help="성능 저하 판단 기준 (비율)")
+    parser.add_argument("--fail-on-regression", action='store_true', help="성능 저하 단계가 있으면 종료 코드 1 반환")
+    args = parser.parse_args()
+
+    print(f"[시작] 벤치마크 실행 중... (게시물 {args.posts}개, 평균 댓글 {args.comments}개)")
+    benchmark_result = run_benchmark(args.posts, args.comments, args.batch_size, args.seed, not args.no_memory)
+
+    comparison_rows = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            comparison_rows = compare_to_baseline(benchmark_result, json.load(f), args.tolerance)
+        benchmark_result['comparison'] = {'baseline': os.path.abspath(args.baseline), 'tolerance': args.tolerance, 'stages': comparison_rows}
+
+    output_path = args.output or os.path.join(BENCHMARK_DIR, f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(benchmark_result, f, ensure_ascii=False, indent=2)
+
+    print_report(benchmark_result, comparison_rows)
+    print(f"      결과 파일: {output_path}")
+
+    if args.fail_on_regression and comparison_rows and any(row['regression'] for row in comparison_rows):
+        sys.exit(1)
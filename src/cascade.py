@@ -0,0 +1,91 @@
+import math
+import numpy as np
+from scipy.special import expit
+
+try:
+    from .fused_features import get_feature_extractor
+except ImportError:
+    # 스크립트로 직접 실행하는 경우 (python src/preprocessor.py)
+    from fused_features import get_feature_extractor
+
+
+class HateCascade:
+    """
+    전체 예측 전에 점수의 상한을 계산하여, 임계값에 도달할 수 없는 텍스트를 걸러내는 1단계 필터입니다.
+
+    이항 GLM 점수는 sigmoid(b + Σ x_j·β_j) 이고 TF-IDF 벡터 x는 음이 아니며 L2 정규화되어 있습니다(||x||₂ = 1).
+    따라서 텍스트에 등장한 어휘 중 계수가 양수인 집합을 P라 하면,
+    코시-슈바르츠 부등식에 의해 Σ x_j·β_j ≤ Σ_{j∈P} x_j·β_j ≤ ||β_P||₂ 이 성립하고,
+    점수의 상한은 sigmoid(b + sqrt(Σ_{j∈P} β_j²)) 입니다.
+    상한이 임계값보다 작은 텍스트는 벡터화/예측(2단계) 없이도 혐오가 아님이 보장됩니다.
+
+    이 상한은 ||x||₂ ≤ 1 일 때만 성립하므로 벡터라이저의 norm이 'l2' 또는 'l1'(||x||₂ ≤ ||x||₁ = 1)이 아니면
+    (예: norm=None이면 가중치가 idf×빈도로 1을 넘을 수 있음) 캐스케이드를 비활성화하고 모든 텍스트를 전체 예측합니다.
+    """
+    def __init__(self, vectorizer, beta, intercept, threshold):
+        self.threshold = float(threshold)
+        self.intercept = float(intercept)
+        self._analyzer = vectorizer.build_analyzer()
+        # 형태소 토큰에서 어휘 인덱스를 바로 구하는 특성 추출기 (지원하지 않는 벡터라이저 설정이면 None)
+        self._extractor = get_feature_extractor(vectorizer)
+
+        # 계수가 양수인 어휘만 미리 추려 {어휘: β²} 테이블로 보관 (음수/0 계수는 상한에 기여하지 않음)
+        beta = np.asarray(beta, dtype=np.float64)
+        self._positive_sq = np.where(beta > 0, beta * beta, 0.0)
+        self.positive_terms = {
+            term: float(beta[idx]) ** 2
+            for term, idx in vectorizer.vocabulary_.items()
+            if beta[idx] > 0
+        }
+
+        # 절편만으로 이미 임계값의 로짓을 넘는다면 상한으로 걸러낼 수 있는 텍스트가 없음
+        margin = math.log(self.threshold / (1.0 - self.threshold)) - self.intercept
+        # 정규화되지 않은 벡터는 상한이 보장되지 않으므로 생략 판정을 하지 않음
+        self.normalized = getattr(vectorizer, 'norm', None) in ('l2', 'l1')
+        if not self.normalized:
+            print(f"[경고] 벡터라이저 norm={getattr(vectorizer, 'norm', None)!r}: 점수 상한이 보장되지 않아 캐스케이드를 사용하지 않습니다.")
+        self.enabled = margin > 0 and self.normalized
+
+    def upper_bounds(self, tokenized_texts):
+        """
+        토큰화된 텍스트(형태소 토큰 튜플 또는 공백으로 연결된 형태소 문자열) 리스트의 점수 상한을 계산합니다.
+
+        Returns:
+            np.ndarray: 텍스트별 혐오 확률 상한
+        """
+        n_texts = len(tokenized_texts)
+        if self._extractor is not None:
+            # 텍스트별로 등장한 어휘 인덱스를 (행, 열) 키로 모아 중복을 제거한 뒤 β² 합을 한 번에 계산
+            flat = []
+            lengths = np.zeros(n_texts, dtype=np.int64)
+            for i, tokens in enumerate(tokenized_texts):
+                indices = self._extractor.term_indices(tokens)
+                flat.extend(indices)
+                lengths[i] = len(indices)
+            n_features = len(self._positive_sq)
+            rows = np.repeat(np.arange(n_texts, dtype=np.int64), lengths)
+            keys = np.unique(rows * n_features + np.asarray(flat, dtype=np.int64))
+            sums = np.bincount(keys // n_features, weights=self._positive_sq[keys % n_features], minlength=n_texts)
+            return expit(self.intercept + np.sqrt(sums))
+
+        sums = np.zeros(n_texts, dtype=np.float64)
+        for i, tokens in enumerate(tokenized_texts):
+            if not isinstance(tokens, str):
+                tokens = " ".join(tokens)
+            if tokens:
+                present = set(self._analyzer(tokens))
+                sums[i] = sum(self.positive_terms.get(term, 0.0) for term in present)
+        return expit(self.intercept + np.sqrt(sums))
+
+    def split(self, tokenized_texts):
+        """
+        텍스트를 2단계(전체 예측) 대상과 생략 대상으로 나눕니다.
+
+        Returns:
+            (np.ndarray, np.ndarray): (전체 예측이 필요한지 여부 마스크, 점수 상한)
+        """
+        bounds = self.upper_bounds(tokenized_texts)
+        if not self.enabled:
+            return np.ones(len(tokenized_texts), dtype=bool), bounds
+        # 부동소수점 오차로 경계값이 잘못 생략되지 않도록 약간의 여유를 둠
+        return bounds >= self.threshold - 1e-9, bounds
@@ -0,0 +1,122 @@
+import os
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# 보고서 프롬프트에 넣을 게시물 요약의 토큰 예산 (대략적인 추정치 기준)
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
+# 보고서에 사용할 최대 게시물 수
+CONTEXT_MAX_POSTS = int(os.getenv("CONTEXT_MAX_POSTS", "30"))
+# MMR 가중치 (1이면 관련도만, 0이면 다양성만 고려)
+CONTEXT_MMR_LAMBDA = float(os.getenv("CONTEXT_MMR_LAMBDA", "0.7"))
+# 이미 선택된 글과 이 값 이상으로 비슷한 글은 중복으로 보고 제외
+CONTEXT_DUPLICATE_SIMILARITY = float(os.getenv("CONTEXT_DUPLICATE_SIMILARITY", "0.9"))
+
+# 게시물 한 건에 사용하는 본문 길이 (generate_report와 동일)
+CONTENT_PREVIEW_CHARS = 150
+# 관련도 계산 시 질문 유사도와 수집 순위(최신/정확도순)의 비중
+_QUERY_WEIGHT = 0.7
+
+
+def estimate_tokens(text):
+    """
+    텍스트의 토큰 수를 대략적으로 추정합니다. (UTF-8 바이트 수 / 4)
+    한글은 한 글자가 3바이트이므로 글자당 약 0.75토큰으로 계산됩니다.
+    """
+    return max(1, -(-len(text.encode('utf-8')) // 4))
+
+
+def format_post_line(post_id, title, content):
+    """보고서 프롬프트에 들어가는 게시물 한 줄을 만듭니다. (ID는 1부터 시작)"""
+    return f"[ID: {post_id}] {title}: {str(content)[:CONTENT_PREVIEW_CHARS]}\n"
+
+
+def _post_columns(df):
+    cols = {c.lower(): c for c in df.columns}
+    return cols.get('title', 'Title'), cols.get('content', 'Content')
+
+
+def select_context(df, query="", token_budget=CONTEXT_TOKEN_BUDGET, max_posts=CONTEXT_MAX_POSTS,
+                   mmr_lambda=CONTEXT_MMR_LAMBDA, duplicate_similarity=CONTEXT_DUPLICATE_SIMILARITY,
+                   token_counter=estimate_tokens):
+    """
+    보고서 프롬프트에 넣을 게시물을 관련도와 다양성 기준으로 골라냅니다. (MMR)
+
+    후보 게시물(제목 + 본문)을 문자 n-gram TF-IDF로 벡터화한 뒤,
+    질문과의 유사도 및 수집 순위로 관련도를 매기고, 이미 고른 글과 비슷한 글에는 벌점을 주며 한 건씩 선택합니다.
+    선택한 글의 요약 줄이 token_budget을 넘으면 건너뛰므로, 고정된 건수 대신 프롬프트 크기 기준으로 근거를 채웁니다.
+    반환되는 DataFrame은 원래 순서를 유지하고 인덱스가 0부터 다시 매겨지므로,
+    generate_report가 부여하는 ID(1부터)와 reference_ids → iloc[ID - 1] 매핑이 그대로 맞습니다.
+
+    Args:
+        df (pd.DataFrame): 후보 게시물 (앞쪽일수록 우선순위가 높은 순서)
+        query (str): 사용자 질문/검색 키워드
+        token_budget (int): 게시물 요약 전체의 토큰 예산
+        max_posts (int): 최대 선택 건수
+        mmr_lambda (float): 관련도 비중 (0~1)
+        duplicate_similarity (float): 중복으로 간주할 유사도 기준
+        token_counter (callable): 텍스트 → 토큰 수 함수
+
+    Returns:
+        tuple: (선택된 DataFrame, 통계 dict)
+               통계 키: candidates, selected, tokens, token_budget, skipped_duplicates, skipped_budget
+    """
+    stats = {
+        'candidates': len(df),
+        'selected': 0,
+        'tokens': 0,
+        'token_budget': token_budget,
+        'skipped_duplicates': 0,
+        'skipped_budget': 0,
+    }
+    if df.empty:
+        return df, stats
+
+    title_col, content_col = _post_columns(df)
+    titles = df[title_col].fillna("").astype(str).tolist() if title_col in df.columns else [""] * len(df)
+    contents = df[content_col].fillna("").astype(str).tolist() if content_col in df.columns else [""] * len(df)
+    n = len(df)
+
+    # 토큰 수는 ID 자릿수에 거의 영향을 받지 않으므로 후보 순번으로 미리 계산
+    line_tokens = [token_counter(format_post_line(i + 1, titles[i], contents[i])) for i in range(n)]
+    rank_prior = 1.0 - np.arange(n) / n
+
+    texts = [f"{titles[i]} {contents[i][:CONTENT_PREVIEW_CHARS]}" for i in range(n)]
+    try:
+        vectorizer = TfidfVectorizer(analyzer='char_wb', ngram_range=(2, 3), sublinear_tf=True)
+        matrix = vectorizer.fit_transform(texts + [query or ""])
+        posts, query_vec = matrix[:n], matrix[n]
+        similarity = (posts @ posts.T).toarray()
+        query_sim = (posts @ query_vec.T).toarray().ravel()
+        if query_sim.max() > 0:
+            relevance = _QUERY_WEIGHT * query_sim / query_sim.max() + (1 - _QUERY_WEIGHT) * rank_prior
+        else:
+            relevance = rank_prior
+    except ValueError:
+        # 어휘가 비어 있으면(빈 텍스트뿐인 경우) 수집 순서대로만 선택
+        similarity = np.zeros((n, n))
+        relevance = rank_prior
+
+    selected = []
+    max_sim = np.zeros(n)
+    remaining = set(range(n))
+    while remaining and len(selected) < max_posts:
+        candidates = sorted(remaining)
+        scores = mmr_lambda * relevance[candidates] - (1 - mmr_lambda) * max_sim[candidates]
+        best = candidates[int(np.argmax(scores))]
+        remaining.discard(best)
+
+        if selected and max_sim[best] >= duplicate_similarity:
+            stats['skipped_duplicates'] += 1
+            continue
+        if stats['tokens'] + line_tokens[best] > token_budget:
+            stats['skipped_budget'] += 1
+            continue
+
+        selected.append(best)
+        stats['tokens'] += line_tokens[best]
+        max_sim = np.maximum(max_sim, similarity[best])
+
+    selected.sort()
+    stats['selected'] = len(selected)
+    print(f"[정보] 보고서 근거 선정: 후보 {n}건 중 {len(selected)}건 선택 (약 {stats['tokens']}/{token_budget} 토큰, 중복 제외 {stats['skipped_duplicates']}건, 예산 초과 {stats['skipped_budget']}건)")
+    return df.iloc[selected].reset_index(drop=True), stats
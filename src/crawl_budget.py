@@ -0,0 +1,269 @@
+import os
+import time
+import random
+import threading
+import concurrent.futures
+
+import pandas as pd
+
+# 예산 기반 크롤링: 전체 목표 게시물 수 (0이면 사용하지 않고 모든 크롤링이 끝날 때까지 대기)
+# 필터링으로 일부가 제거되므로 보고서 표본(30건)보다 여유 있게 설정
+CRAWL_TARGET_POSTS = int(os.getenv("CRAWL_TARGET_POSTS", "0"))
+# 예산 기반 크롤링: 전체 제한 시간(초, 0이면 제한 없음)
+CRAWL_DEADLINE = float(os.getenv("CRAWL_DEADLINE", "0"))
+
+
+def polite_delay(stop_event=None, low=1.5, high=3.5):
+    """
+    게시물 요청 사이의 무작위 대기입니다. stop_event가 주어지면 대기 중에도 중단 요청에 바로 반응합니다.
+
+    Returns:
+        bool: 대기 중 중단 요청이 있었으면 True
+    """
+    delay = random.uniform(low, high)
+    if stop_event is None:
+        time.sleep(delay)
+        return False
+    return stop_event.wait(delay)
+
+
+def crawl_stopped(stop_event, collected, max_posts):
+    """중단 요청이 있었거나 수집한 게시물 수가 max_posts에 도달했는지 확인합니다."""
+    if stop_event is not None and stop_event.is_set():
+        return True
+    return max_posts is not None and collected >= max_posts
+
+
+class CrawlBudget:
+    """
+    여러 소스의 크롤링에 전체 목표 게시물 수와 제한 시간을 적용하는 공유 예산입니다.
+
+    목표 수는 소스별로 공평하게 나누어(나머지는 앞 소스부터 1개씩) 할당하고, 소스가 할당량을 채우면 해당 소스만 중단합니다.
+    할당량을 채우지 못하고 끝난 소스의 남은 몫은 아직 실행 중인 소스에 다시 나누어 줍니다.
+    (할당량 도달로 중단 요청을 받은 소스도 아직 종료 전이면 요청이 철회되어 계속 수집합니다.)
+    전체 목표를 채우거나 제한 시간이 지나면 모든 소스에 중단을 요청합니다. (크롤러는 다음 게시물 요청 전에 중단)
+    """
+    def __init__(self, n_sources, target_posts, deadline=None):
+        self.target_posts = target_posts
+        self.deadline = deadline
+        self.counts = [0] * n_sources
+        self.rows = [[] for _ in range(n_sources)]
+        self.stop_events = [threading.Event() for _ in range(n_sources)]
+        self.stop_reason = None
+        self._finished = set()
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        if n_sources == 0:
+            self._done.set()
+
+    def _quotas(self):
+        """실행 중인 소스별 현재 할당량 {소스 인덱스: 할당량}을 계산합니다. (lock 안에서 호출)"""
+        running = [i for i in range(len(self.counts)) if i not in self._finished]
+        if not running or self.target_posts is None:
+            return {}
+        spare = max(0, self.target_posts - sum(self.counts[i] for i in self._finished))
+        share, extra = divmod(spare, len(running))
+        return {i: share + (1 if rank < extra else 0) for rank, i in enumerate(running)}
+
+    def _stop_all(self, reason):
+        if self.stop_reason is None:
+            self.stop_reason = reason
+        for event in self.stop_events:
+            event.set()
+        self._done.set()
+
+    def on_post(self, source):
+        """소스별 게시물 수집 콜백을 반환합니다. (크롤러의 on_post 인자로 전달)"""
+        def callback(row):
+            with self._lock:
+                self.rows[source].append(row)
+                self.counts[source] += 1
+                if self.target_posts is None:
+                    return
+                if sum(self.counts) >= self.target_posts:
+                    self._stop_all('target')
+                elif self.counts[source] >= self._quotas().get(source, 0):
+                    self.stop_events[source].set()
+        return callback
+
+    def finish(self, source, df=None):
+        """
+        소스의 크롤링 종료를 기록합니다.
+        크롤러가 반환한 DataFrame(중복 제거 완료)이 있으면 콜백으로 모은 행 대신 사용합니다.
+        """
+        with self._lock:
+            if df is not None and not df.empty:
+                self.rows[source] = df.to_dict('records')
+                self.counts[source] = len(df)
+            self._finished.add(source)
+            if len(self._finished) == len(self.counts):
+                self._done.set()
+            elif self.stop_reason is None:
+                # 남은 몫이 늘어난 소스는 할당량 도달로 중단 요청했던 것을 철회 (이미 종료했다면 영향 없음)
+                for i, quota in self._quotas().items():
+                    if self.counts[i] < quota:
+                        self.stop_events[i].clear()
+
+    def stop(self, reason):
+        """모든 소스에 중단을 요청합니다."""
+        with self._lock:
+            self._stop_all(reason)
+
+    def wait(self):
+        """목표 달성, 모든 소스 종료, 제한 시간 중 먼저 일어나는 것까지 대기합니다."""
+        timeout = None if self.deadline is None else max(0.0, self.deadline - time.monotonic())
+        if not self._done.wait(timeout):
+            self.stop('deadline')
+
+    def snapshot(self):
+        """소스별로 지금까지 수집된 행 리스트의 복사본을 반환합니다."""
+        with self._lock:
+            return [list(rows) for rows in self.rows]
+
+
+def interleave_by_rank(frames):
+    """
+    소스별 DataFrame을 순위 기준으로 섞습니다. (1위끼리, 2위끼리 모이도록 정렬, 예: DC 1위 -> Arca 1위 -> DC 2위 ...)
+    """
+    frames = [df.assign(__rank=range(len(df))) for df in frames if not df.empty]
+    if not frames:
+        return pd.DataFrame()
+    merged = pd.concat(frames, ignore_index=True)
+    return merged.sort_values('__rank', kind='stable').drop(columns=['__rank']).reset_index(drop=True)
+
+
+def crawl_with_budget(tasks, search_fn, target_posts, deadline_seconds=None, extra_options=None, executor=None):
+    """
+    검색 계획(tasks)을 병렬로 실행하되, 전체 목표 게시물 수나 제한 시간에 도달하면 진행 중인 크롤링을 중단하고
+    그때까지 수집된 결과를 순위 기준으로 섞어 반환합니다. 느린 소스가 전체 응답을 붙잡지 않습니다.
+
+    Args:
+        tasks (list): {'target_source', 'keyword', 'options'} 리스트
+        search_fn (callable): search_community와 같은 형태의 크롤링 함수 (stop_event, max_posts, on_post 인자 지원)
+        target_posts (int): 전체 목표 게시물 수 (소스별로 공평하게 할당, None이면 제한 시간만 적용)
+        deadline_seconds (float): 제한 시간(초, None이면 제한 없음)
+        extra_options (dict): 모든 태스크에 추가로 전달할 옵션 (예: title_prescreen)
+        executor: 크롤링 작업을 제출할 실행기 (예: crawl_executor.CrawlExecutor.session(...), None이면 요청 전용 스레드 풀)
+
+    Returns:
+        (pd.DataFrame, dict): (결과, 통계 {'stop_reason', 'elapsed', 'counts'})
+    """
+    start = time.monotonic()
+    deadline = start + deadline_seconds if deadline_seconds else None
+    budget = CrawlBudget(len(tasks), target_posts, deadline)
+
+    # 중단된 스레드가 끝나기를 기다리지 않고 반환하므로 with 문 대신 shutdown(wait=False) 사용
+    own_executor = executor is None
+    if own_executor:
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, len(tasks)))
+    futures = []
+    try:
+        for i, task in enumerate(tasks):
+            options = {
+                **task.get("options", {}),
+                **(extra_options or {}),
+                "stop_event": budget.stop_events[i],
+                "max_posts": target_posts,
+                "on_post": budget.on_post(i),
+            }
+            print(f"[DEBUG] Crawling Task: {task.get('target_source')} - {task.get('keyword')} (전체 목표 {target_posts or '제한 없음'})")
+            future = executor.submit(search_fn, task.get("target_source"), task.get("keyword"), **options)
+            future.add_done_callback(lambda f, i=i: budget.finish(i, None if f.cancelled() or f.exception() is not None else f.result()))
+            futures.append(future)
+        budget.wait()
+    finally:
+        # 아직 시작하지 않은 작업(공유 실행기 대기열)은 취소
+        for future in futures:
+            future.cancel()
+        if own_executor:
+            executor.shutdown(wait=False)
+
+    collected = budget.snapshot()
+    frames = []
+    for task, rows in zip(tasks, collected):
+        df = pd.DataFrame(rows)
+        if df.empty:
+            continue
+        if {'GalleryID', 'PostID'} <= set(df.columns):
+            df = df.drop_duplicates(subset=['GalleryID', 'PostID'], keep='first')
+        df["Source"] = task.get("target_source")
+        df["Keyword"] = task.get("keyword")
+        frames.append(df)
+
+    stats = {
+        'stop_reason': budget.stop_reason or 'completed',
+        'elapsed': time.monotonic() - start,
+        'counts': {f"{task.get('target_source')}:{task.get('keyword')}": len(rows) for task, rows in zip(tasks, collected)},
+    }
+    print(f"[결과] 예산 크롤링 종료 ({stats['stop_reason']}, {stats['elapsed']:.1f}초): {stats['counts']}")
+    return interleave_by_rank(frames), stats
+
+
+def crawl_and_filter(tasks, search_fn, filter_fn, extra_options=None, executor=None):
+    """
+    검색 계획(tasks)을 병렬로 실행하면서, 소스별 크롤링이 끝나는 대로(as_completed) 해당 결과를 바로 필터링합니다.
+    가장 느린 크롤러를 기다리는 동안 먼저 끝난 소스의 필터링이 진행되므로, 전체 지연 시간은 대략 (가장 느린 크롤링 + 마지막 소스 필터링)입니다.
+    필터링은 모델 세션을 공유하므로 전용 스레드 하나에서 순서대로 수행합니다.
+
+    Args:
+        filter_fn (callable): 소스별 DataFrame을 받아 (필터링된 DataFrame, 통계 dict)를 반환하는 함수 (예: filter_hate_speech_lazy)
+        extra_options (dict): 모든 태스크에 추가로 전달할 옵션 (예: title_prescreen)
+        executor: 크롤링 작업을 제출할 실행기 (crawl_with_budget과 같음)
+
+    Returns:
+        (pd.DataFrame, pd.DataFrame, dict): (순위 기준으로 섞은 원본, 순위 기준으로 섞은 필터링 결과, 통계 {'filter_stats', 'errors', 'elapsed'})
+            필터링에 실패한 소스는 원본을 그대로 사용하고 errors에 기록합니다.
+    """
+    start = time.monotonic()
+    raw_frames = [pd.DataFrame()] * len(tasks)
+    filtered_frames = [pd.DataFrame()] * len(tasks)
+    filter_stats = []
+    errors = []
+
+    own_executor = executor is None
+    crawl_pool = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, len(tasks))) if own_executor else executor
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as filter_pool:
+        crawl_futures = {}
+        try:
+            for i, task in enumerate(tasks):
+                print(f"[DEBUG] Crawling Task: {task.get('target_source')} - {task.get('keyword')}")
+                options = {**task.get("options", {}), **(extra_options or {})}
+                crawl_futures[crawl_pool.submit(search_fn, task.get("target_source"), task.get("keyword"), **options)] = i
+        except Exception:
+            # 일부만 제출된 상태에서 실패하면(예: 대기열 초과) 제출된 작업을 취소하고 오류 전달
+            for future in crawl_futures:
+                future.cancel()
+            raise
+        finally:
+            if own_executor:
+                crawl_pool.shutdown(wait=False)
+
+        filter_futures = {}
+        for future in concurrent.futures.as_completed(crawl_futures):
+            i = crawl_futures[future]
+            task = tasks[i]
+            try:
+                df = future.result()
+            except Exception as e:
+                print(f"[DEBUG] Error: {e}", flush=True)
+                continue
+            print(f"[DEBUG] Crawling result for {task.get('target_source')}: {len(df)} rows ({time.monotonic() - start:.1f}초)")
+            if df.empty:
+                continue
+            df["Source"] = task.get("target_source")
+            df["Keyword"] = task.get("keyword")
+            raw_frames[i] = df
+            filter_futures[filter_pool.submit(filter_fn, df.copy())] = i
+
+        for future, i in filter_futures.items():
+            try:
+                filtered_frames[i], stats = future.result()
+                filter_stats.append(stats)
+            except Exception as e:
+                print(f"[경고] {tasks[i].get('target_source')} 결과 필터링 실패, 원본을 사용합니다: {e}")
+                errors.append(f"{tasks[i].get('target_source')}: {e}")
+                filtered_frames[i] = raw_frames[i]
+
+    elapsed = time.monotonic() - start
+    print(f"[결과] 크롤링/필터링 완료 ({elapsed:.1f}초)")
+    return interleave_by_rank(raw_frames), interleave_by_rank(filtered_frames), {'filter_stats': filter_stats, 'errors': errors, 'elapsed': elapsed}
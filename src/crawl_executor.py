@@ -0,0 +1,202 @@
+import os
+import math
+import time
+import threading
+import concurrent.futures
+from collections import OrderedDict, deque
+
+# 프로세스 전체에서 동시에 실행할 크롤링 작업 수 (작업마다 Chrome을 하나씩 띄우므로 동시 브라우저 수 상한)
+CRAWL_MAX_CONCURRENCY = int(os.getenv("CRAWL_MAX_CONCURRENCY", str(min(4, os.cpu_count() or 1))))
+# 대기열 최대 작업 수 (넘으면 새 요청을 거절, 0이면 제한 없음)
+CRAWL_MAX_QUEUE = int(os.getenv("CRAWL_MAX_QUEUE", "16"))
+# 실행 기록이 없을 때 사용하는 작업당 예상 소요 시간(초)
+CRAWL_DEFAULT_DURATION = float(os.getenv("CRAWL_DEFAULT_DURATION", "60"))
+
+# 작업 소요 시간 이동 평균의 가중치 (최근 작업 비중)
+_DURATION_ALPHA = 0.2
+
+
+class CrawlRejected(RuntimeError):
+    """대기열이 가득 차서 크롤링 작업을 받을 수 없을 때 발생합니다."""
+    def __init__(self, message, queue_depth, estimated_wait):
+        super().__init__(message)
+        self.queue_depth = queue_depth
+        self.estimated_wait = estimated_wait
+
+
+class _Job:
+    __slots__ = ('future', 'fn', 'args', 'kwargs', 'enqueued_at')
+
+    def __init__(self, fn, args, kwargs):
+        self.future = concurrent.futures.Future()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.enqueued_at = time.monotonic()
+
+
+class CrawlExecutor:
+    """
+    프로세스 전체가 공유하는 크롤링 작업 실행기입니다.
+
+    사용자 요청마다 제한 없는 스레드 풀을 만들면 동시 사용자 수만큼 Chrome이 늘어나므로,
+    고정된 수(max_concurrency)의 워커 스레드가 대기열의 작업을 꺼내 실행합니다.
+    대기열은 세션별로 나뉘어 있고 워커는 세션을 번갈아(round-robin) 꺼내므로, 작업이 많은 세션이 다른 세션을 굶기지 않습니다.
+    대기열이 max_queue를 넘으면 submit이 CrawlRejected를 발생시키며, admit()으로 제출 전에 수용 여부와 예상 대기 시간을 확인할 수 있습니다.
+    """
+    def __init__(self, max_concurrency=CRAWL_MAX_CONCURRENCY, max_queue=CRAWL_MAX_QUEUE, default_duration=CRAWL_DEFAULT_DURATION):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max_queue
+        self._cond = threading.Condition()
+        self._queues = OrderedDict()
+        self._workers = []
+        self._running = 0
+        self._avg_duration = default_duration
+        self._recent_waits = deque(maxlen=200)
+        self._counters = {'submitted': 0, 'completed': 0, 'failed': 0, 'cancelled': 0, 'rejected': 0}
+
+    def _queue_depth(self):
+        return sum(len(jobs) for jobs in self._queues.values())
+
+    def _estimate_wait(self, n_jobs):
+        """
+        새 작업 n_jobs개가 모두 시작될 때까지의 예상 대기 시간(초)입니다. (lock 안에서 호출)
+        앞선 작업이 모두 먼저 실행된다고 가정하므로, round-robin으로 순서가 앞당겨지는 경우보다 보수적인 값입니다.
+        """
+        free_slots = max(0, self.max_concurrency - self._running)
+        position = self._queue_depth() + n_jobs
+        if position <= free_slots:
+            return 0.0
+        return math.ceil((position - free_slots) / self.max_concurrency) * self._avg_duration
+
+    def admit(self, n_jobs=1):
+        """
+        작업 n_jobs개를 지금 제출할 수 있는지와 예상 대기 시간을 반환합니다. (실제 제출은 하지 않음)
+
+        Returns:
+            dict: {'accepted', 'queue_depth', 'running', 'estimated_wait'}
+        """
+        with self._cond:
+            depth = self._queue_depth()
+            return {
+                'accepted': not self.max_queue or depth + n_jobs <= self.max_queue,
+                'queue_depth': depth,
+                'running': self._running,
+                'estimated_wait': self._estimate_wait(n_jobs),
+            }
+
+    def submit(self, session_id, fn, *args, **kwargs):
+        """
+        세션의 대기열에 작업을 추가하고 concurrent.futures.Future를 반환합니다.
+        대기 중인 Future는 cancel()로 취소할 수 있습니다. (실행 중인 작업은 취소되지 않음)
+
+        Raises:
+            CrawlRejected: 대기열이 가득 찬 경우
+        """
+        with self._cond:
+            depth = self._queue_depth()
+            if self.max_queue and depth >= self.max_queue:
+                self._counters['rejected'] += 1
+                wait = self._estimate_wait(1)
+                raise CrawlRejected(f"크롤링 대기열이 가득 찼습니다. (대기 {depth}건, 예상 대기 {wait:.0f}초)", depth, wait)
+            job = _Job(fn, args, kwargs)
+            self._queues.setdefault(session_id, deque()).append(job)
+            self._counters['submitted'] += 1
+            self._ensure_workers()
+            self._cond.notify()
+        return job.future
+
+    def session(self, session_id):
+        """세션 ID가 고정된 Executor 호환 객체를 반환합니다. (submit(fn, *args, **kwargs)만 지원)"""
+        return _SessionExecutor(self, session_id)
+
+    def _ensure_workers(self):
+        # 워커 스레드는 첫 작업이 들어올 때 생성 (lock 안에서 호출)
+        while len(self._workers) < self.max_concurrency:
+            worker = threading.Thread(target=self._work, name=f"crawl-worker-{len(self._workers)}", daemon=True)
+            self._workers.append(worker)
+            worker.start()
+
+    def _next_job(self):
+        # 맨 앞 세션의 작업을 하나 꺼내고, 작업이 남은 세션은 맨 뒤로 보냄 (lock 안에서 호출)
+        session_id, jobs = next(iter(self._queues.items()))
+        job = jobs.popleft()
+        if jobs:
+            self._queues.move_to_end(session_id)
+        else:
+            del self._queues[session_id]
+        return job
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._queues:
+                    self._cond.wait()
+                job = self._next_job()
+                if not job.future.set_running_or_notify_cancel():
+                    self._counters['cancelled'] += 1
+                    continue
+                self._running += 1
+                self._recent_waits.append(time.monotonic() - job.enqueued_at)
+
+            start = time.monotonic()
+            try:
+                result = job.fn(*job.args, **job.kwargs)
+            except BaseException as e:
+                job.future.set_exception(e)
+                failed = True
+            else:
+                job.future.set_result(result)
+                failed = False
+            duration = time.monotonic() - start
+
+            with self._cond:
+                self._running -= 1
+                self._counters['failed' if failed else 'completed'] += 1
+                self._avg_duration += _DURATION_ALPHA * (duration - self._avg_duration)
+
+    def metrics(self):
+        """
+        대기열 상태와 대기 시간 지표를 반환합니다.
+
+        Returns:
+            dict: queue_depth, running, max_concurrency, max_queue, sessions(세션별 대기 작업 수),
+                  avg_wait/p95_wait(최근 작업의 대기 시간, 초), avg_duration(작업 소요 시간 이동 평균, 초), 누적 카운터
+        """
+        with self._cond:
+            waits = sorted(self._recent_waits)
+            return {
+                'queue_depth': self._queue_depth(),
+                'running': self._running,
+                'max_concurrency': self.max_concurrency,
+                'max_queue': self.max_queue,
+                'sessions': {session_id: len(jobs) for session_id, jobs in self._queues.items()},
+                'avg_wait': sum(waits) / len(waits) if waits else 0.0,
+                'p95_wait': waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0,
+                'avg_duration': self._avg_duration,
+                **self._counters,
+            }
+
+
+class _SessionExecutor:
+    """CrawlExecutor를 세션 하나에 묶은 Executor 호환 객체입니다. (crawl_budget 함수의 executor 인자로 전달)"""
+    def __init__(self, executor, session_id):
+        self._executor = executor
+        self.session_id = session_id
+
+    def submit(self, fn, *args, **kwargs):
+        return self._executor.submit(self.session_id, fn, *args, **kwargs)
+
+
+# 프로세스 전역 크롤링 실행기
+_crawl_executor = None
+_crawl_executor_lock = threading.Lock()
+
+
+def get_crawl_executor():
+    """프로세스 전역 크롤링 실행기를 반환합니다. (최초 호출 시 생성)"""
+    global _crawl_executor
+    with _crawl_executor_lock:
+        if _crawl_executor is None:
+            _crawl_executor = CrawlExecutor()
+        return _crawl_executor
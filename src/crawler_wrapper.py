@@ -26,6 +26,8 @@ def search_community(
         **kwargs: 커뮤니티별 추가 옵션.
             - arca: 'channel_id' (기본값 'breaking')
             - dc: 'gallery_id', 'gallery_type', 'search_option', 'sort_type' 등
+            - 공통: 'title_prescreen' (목록 단계 제목 사전 필터, preprocessor.TitlePrescreen 등)
+            - 공통: 'stop_event', 'max_posts', 'on_post' (예산 기반 크롤링의 중단 신호/최대 수집 수/수집 콜백, crawl_budget 참고)
         
     Returns:
         pd.DataFrame: 수집된 게시물 데이터 (컬럼: Site, PostID, Title, Content, Comments, GalleryID, PostURL)
@@ -44,7 +46,11 @@ def search_community(
                 channel_id=channel,
                 search_keyword=keyword,
                 start_page=start_page,
-                end_page=end_page
+                end_page=end_page,
+                title_prescreen=kwargs.get('title_prescreen'),
+                stop_event=kwargs.get('stop_event'),
+                max_posts=kwargs.get('max_posts'),
+                on_post=kwargs.get('on_post')
             )
             
         # 2. 디시인사이드 (DCInside)
@@ -1,19 +1,15 @@
-import time
 import random
 import re
 import pandas as pd
 import urllib.parse
 
-# Selenium 관련 Import
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, WebDriverException, UnexpectedAlertPresentException
-
 # BeautifulSoup Import
 from bs4 import BeautifulSoup
 
+# Selenium/webdriver_manager는 임포트 비용이 크므로 실제로 브라우저를 사용하는 함수 안에서 임포트합니다.
+from .driver_manager import chrome_service, prewarm_driver, take_spare_driver
+from .crawl_budget import polite_delay, crawl_stopped
+
 # -----------------------------------------------------------
 # 설정 및 상수 정의
 # -----------------------------------------------------------
@@ -35,10 +31,27 @@ USER_AGENT_LIST = [
     'Mozilla/5.0 (Macintosh; Intel Mac OS X 14_2_1) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
 ]
 
+# 제목/본문에서 제거할 URL 패턴
+URL_PATTERN = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$\-@\.&+:/?=]|[!*\(\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
+
 def get_driver():
-    """Selenium WebDriver 설정을 초기화하고 드라이버 객체를 반환합니다."""
-    from selenium.webdriver.chrome.service import Service
-    from webdriver_manager.chrome import ChromeDriverManager
+    """
+    Selenium WebDriver 설정을 초기화하고 드라이버 객체를 반환합니다.
+    워밍업(prewarm)으로 미리 띄워 둔 드라이버가 있으면 그것을 먼저 사용합니다.
+    """
+    driver = take_spare_driver()
+    if driver is not None:
+        print("[DEBUG] DC WebDriver 재사용 (워밍업)")
+        return driver
+    return _create_driver()
+
+def prewarm():
+    """첫 검색 전에 DC용 WebDriver를 미리 띄워 둡니다. (성공 시 True)"""
+    return prewarm_driver(_create_driver)
+
+def _create_driver():
+    """새 WebDriver를 생성합니다. (실패 시 None)"""
+    from selenium import webdriver
     
     options = webdriver.ChromeOptions()
     options.add_argument('headless')
@@ -76,8 +89,7 @@ def get_driver():
     options.add_experimental_option('useAutomationExtension', False)
     
     try:
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
+        driver = webdriver.Chrome(service=chrome_service(), options=options)
         driver.set_page_load_timeout(30)
         print("[DEBUG] DC WebDriver 초기화 성공")
         return driver
@@ -115,7 +127,12 @@ def extract_comments(soup):
 # -----------------------------------------------------------
 # 1. 일반 갤러리 크롤링 함수 (Selenium 적용)
 # -----------------------------------------------------------
-def get_regular_post_data(gallery_id: str, gallery_type: str = "minor", search_keyword: str = "", search_option: int = 0, start_page: int = 1, end_page: int = 1) -> pd.DataFrame:
+def get_regular_post_data(gallery_id: str, gallery_type: str = "minor", search_keyword: str = "", search_option: int = 0, start_page: int = 1, end_page: int = 1, title_prescreen=None,
+                          stop_event=None, max_posts=None, on_post=None) -> pd.DataFrame:
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException, UnexpectedAlertPresentException
     
     data_list = []
     BASE_URL = "https://gall.dcinside.com"
@@ -152,6 +169,8 @@ def get_regular_post_data(gallery_id: str, gallery_type: str = "minor", search_k
 
     try:
         for i in range(int(start_page), int(end_page) + 1):
+            if crawl_stopped(stop_event, len(data_list), max_posts):
+                break
             
             # --- 1단계: 목록 페이지 URL 구성 ---
             params = {'id': gallery_id, 'page': i}
@@ -206,7 +225,8 @@ def get_regular_post_data(gallery_id: str, gallery_type: str = "minor", search_k
 
             print(f"-> [DC 일반] 페이지 {i}에서 {len(valid_rows)}개의 게시물 발견.")
 
-            # --- 2단계: 개별 게시물 순회 ---
+            # --- 2단계: 게시물 후보(ID, 제목, URL) 추출 ---
+            candidates = []
             for row in valid_rows:
                 title_tag = row.select_one('a[href*="&no="]')
                 if not title_tag: continue
@@ -224,12 +244,31 @@ def get_regular_post_data(gallery_id: str, gallery_type: str = "minor", search_k
                 else:
                     post_full_url = BASE_URL + relative_url
 
-                # 랜덤 딜레이
-                time.sleep(random.uniform(1.5, 3.5))
-
-                # --- 3단계: 본문 및 댓글 수집 ---
+                candidates.append({
+                    'Site': 'DCINSIDE',
+                    'PostID': post_id,
+                    'Title': re.sub(URL_PATTERN, '', title_raw).strip(),
+                    'GalleryID': gallery_id,
+                    'PostURL': post_full_url
+                })
+
+            # 제목 사전 필터: 어차피 제거될 게시물은 본문 요청을 생략
+            if title_prescreen is not None:
+                candidates = title_prescreen(candidates)
+
+            # --- 3단계: 개별 게시물 순회 ---
+            for candidate in candidates:
+                post_id = candidate['PostID']
+                post_full_url = candidate['PostURL']
+                title_clean = candidate['Title']
+
+                # 랜덤 딜레이 (대기 중 중단 요청이 오면 바로 종료)
+                if crawl_stopped(stop_event, len(data_list), max_posts) or polite_delay(stop_event):
+                    break
+
+                # --- 4단계: 본문 및 댓글 수집 ---
                 try:
-                    print(f"   -> [DC 일반] 게시물 접속: {title_raw[:20]}... (ID: {post_id}, 갤러리: {gallery_id})")
+                    print(f"   -> [DC 일반] 게시물 접속: {title_clean[:20]}... (ID: {post_id}, 갤러리: {gallery_id})")
                     driver.get(post_full_url)
                     
                     # 1. 가장 중요한 본문이 뜰 때까지 확실히 기다림 (필수)
@@ -256,9 +295,7 @@ def get_regular_post_data(gallery_id: str, gallery_type: str = "minor", search_k
                     comments_text = extract_comments(post_soup)
                     
                     # C. 데이터 클리닝
-                    url_pattern = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$\-@\.&+:/?=]|[!*\(\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
-                    title_clean = re.sub(url_pattern, '', title_raw).strip()
-                    content_clean = re.sub(url_pattern, '', content_text).strip()
+                    content_clean = re.sub(URL_PATTERN, '', content_text).strip()
                     content_clean = content_clean.replace('- dc official App', '').replace('- dc App', '').strip()
                     
                     if content_clean:
@@ -271,6 +308,8 @@ def get_regular_post_data(gallery_id: str, gallery_type: str = "minor", search_k
                             'GalleryID': gallery_id,
                             'PostURL': post_full_url
                         })
+                        if on_post is not None:
+                            on_post(data_list[-1])
 
                 except Exception as e:
                     print(f"   -> [DC 일반] 상세 수집 실패: {e}")
@@ -294,7 +333,12 @@ def get_regular_post_data(gallery_id: str, gallery_type: str = "minor", search_k
 # -----------------------------------------------------------
 # 2. 통합 검색 크롤링 함수 (Selenium 적용)
 # -----------------------------------------------------------
-def get_integrated_search_data(search_keyword: str, sort_type: str = "latest", start_page: int = 1, end_page: int = 1) -> pd.DataFrame:
+def get_integrated_search_data(search_keyword: str, sort_type: str = "latest", start_page: int = 1, end_page: int = 1, title_prescreen=None,
+                               stop_event=None, max_posts=None, on_post=None) -> pd.DataFrame:
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
     
     data_list = []
     SEARCH_BASE_URL = "https://search.dcinside.com/post/"
@@ -309,6 +353,8 @@ def get_integrated_search_data(search_keyword: str, sort_type: str = "latest", s
 
     try:
         for i in range(int(start_page), int(end_page) + 1):
+            if crawl_stopped(stop_event, len(data_list), max_posts):
+                break
             
             # 검색 URL 구성
             full_search_url = f"{SEARCH_BASE_URL}p/{i}/{sort_path}q/{encoded_keyword}"
@@ -330,7 +376,8 @@ def get_integrated_search_data(search_keyword: str, sort_type: str = "latest", s
                 print("[DC 통합] 검색 결과가 없습니다.")
                 break
                 
-            # 결과 아이템 순회
+            # 결과 아이템에서 게시물 후보 추출
+            candidates = []
             for item in result_items:
                 link_tag = item.select_one('a.tit_txt')
                 if not link_tag: continue
@@ -355,11 +402,30 @@ def get_integrated_search_data(search_keyword: str, sort_type: str = "latest", s
                 else:
                     continue
 
-                # 상세 페이지 진입
-                time.sleep(random.uniform(1.5, 3.5))
+                candidates.append({
+                    'Site': 'DCINSIDE',
+                    'PostID': post_id,
+                    'Title': re.sub(URL_PATTERN, '', title_raw).strip(),
+                    'GalleryID': gallery_name,
+                    'PostURL': post_url
+                })
+
+            # 제목 사전 필터: 어차피 제거될 게시물은 본문 요청을 생략
+            if title_prescreen is not None:
+                candidates = title_prescreen(candidates)
+
+            for candidate in candidates:
+                post_id = candidate['PostID']
+                post_url = candidate['PostURL']
+                title_clean = candidate['Title']
+                gallery_name = candidate['GalleryID']
+
+                # 상세 페이지 진입 (대기 중 중단 요청이 오면 바로 종료)
+                if crawl_stopped(stop_event, len(data_list), max_posts) or polite_delay(stop_event):
+                    break
                 
                 try:
-                    print(f"   -> [DC 통합] 검색 게시물 접속: {title_raw[:20]}... (ID: {post_id}, 갤러리: {gallery_name})")
+                    print(f"   -> [DC 통합] 검색 게시물 접속: {title_clean[:20]}... (ID: {post_id}, 갤러리: {gallery_name})")
                     driver.get(post_url)
                     
                     # 1. 가장 중요한 본문이 뜰 때까지 확실히 기다림 (필수)
@@ -384,9 +450,7 @@ def get_integrated_search_data(search_keyword: str, sort_type: str = "latest", s
                     comments_text = extract_comments(post_soup)
                     
                     # 클리닝
-                    url_pattern = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$\-@\.&+:/?=]|[!*\(\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
-                    title_clean = re.sub(url_pattern, '', title_raw).strip()
-                    content_clean = re.sub(url_pattern, '', content_text).strip()
+                    content_clean = re.sub(URL_PATTERN, '', content_text).strip()
                     content_clean = content_clean.replace('- dc official App', '').replace('- dc App', '').strip()
                     
                     data_list.append({
@@ -398,6 +462,8 @@ def get_integrated_search_data(search_keyword: str, sort_type: str = "latest", s
                         'GalleryID': gallery_name,
                         'PostURL': post_url
                     })
+                    if on_post is not None:
+                        on_post(data_list[-1])
                     
                 except Exception as e:
                     print(f"   -> [DC 통합] 상세 수집 실패: {e}")
@@ -434,6 +500,10 @@ def search_dc_inside(search_keyword: str, start_page: int = 1, end_page: int = 1
             - gallery_type (str): 갤러리 타입 (기본 'minor')
             - search_option (int): 검색 옵션 (기본 0)
             - sort_type (str): 통합 검색 정렬 방식 (기본 'latest')
+            - title_prescreen (callable): 제목 사전 필터 (선택, 예: preprocessor.TitlePrescreen)
+            - stop_event (threading.Event): 설정되면 다음 게시물 요청 전에 수집 중단 (선택)
+            - max_posts (int): 수집할 최대 게시물 수 (선택)
+            - on_post (callable): 게시물 하나를 수집할 때마다 해당 행(dict)으로 호출 (선택)
     """
     
     # 1. gallery_id가 인자에 있으면 -> 특정 갤러리 검색
@@ -441,6 +511,7 @@ def search_dc_inside(search_keyword: str, start_page: int = 1, end_page: int = 1
         gallery_id = kwargs['gallery_id']
         gallery_type = kwargs.get('gallery_type', 'minor')
         search_option = kwargs.get('search_option', 0)
+        title_prescreen = kwargs.get('title_prescreen')
         
         print(f"🚀 [DC Wrapper] '{gallery_id}' 갤러리 검색 모드로 진입")
         return get_regular_post_data(
@@ -449,16 +520,25 @@ def search_dc_inside(search_keyword: str, start_page: int = 1, end_page: int = 1
             search_keyword=search_keyword,
             search_option=search_option,
             start_page=start_page,
-            end_page=end_page
+            end_page=end_page,
+            title_prescreen=title_prescreen,
+            stop_event=kwargs.get('stop_event'),
+            max_posts=kwargs.get('max_posts'),
+            on_post=kwargs.get('on_post')
         )
         
     # 2. gallery_id가 없으면 -> DC 전체 통합 검색
     else:
         sort_type = kwargs.get('sort_type', 'latest')
+        title_prescreen = kwargs.get('title_prescreen')
         print(f"🚀 [DC Wrapper] 통합 검색 모드로 진입")
         return get_integrated_search_data(
             search_keyword=search_keyword,
             sort_type=sort_type,
             start_page=start_page,
-            end_page=end_page
+            end_page=end_page,
+            title_prescreen=title_prescreen,
+            stop_event=kwargs.get('stop_event'),
+            max_posts=kwargs.get('max_posts'),
+            on_post=kwargs.get('on_post')
         )
\ No newline at end of file
@@ -0,0 +1,85 @@
+import atexit
+import threading
+
+# ChromeDriver 실행 파일 경로 (프로세스당 한 번만 확인)
+_chromedriver_path = None
+_chromedriver_lock = threading.Lock()
+
+# 미리 띄워 둔 WebDriver (워밍업 시 생성, 다음 크롤링에서 한 번 사용)
+_spare_driver = None
+_spare_lock = threading.Lock()
+
+
+def chromedriver_path():
+    """
+    ChromeDriver 경로를 반환합니다.
+    ChromeDriverManager().install()은 호출할 때마다 최신 버전을 조회하므로, 결과를 프로세스 단위로 재사용합니다.
+    selenium/webdriver_manager는 이 함수가 처음 호출될 때 임포트됩니다.
+    """
+    global _chromedriver_path
+    with _chromedriver_lock:
+        if _chromedriver_path is None:
+            from webdriver_manager.chrome import ChromeDriverManager
+            _chromedriver_path = ChromeDriverManager().install()
+        return _chromedriver_path
+
+
+def chrome_service():
+    """캐시된 ChromeDriver 경로로 Selenium Service 객체를 생성합니다."""
+    from selenium.webdriver.chrome.service import Service
+    return Service(chromedriver_path())
+
+
+def prewarm_driver(factory):
+    """
+    factory()로 WebDriver를 하나 미리 띄워 보관합니다. (이미 보관 중이면 아무것도 하지 않음)
+    브라우저 첫 실행 비용(드라이버 확인, Chrome 프로세스 기동)을 첫 검색 전에 미리 치르기 위해 사용합니다.
+
+    Returns:
+        bool: 보관 중인 드라이버가 있으면 True
+    """
+    global _spare_driver
+    with _spare_lock:
+        if _spare_driver is not None:
+            return True
+    driver = factory()
+    if driver is None:
+        return False
+    with _spare_lock:
+        if _spare_driver is None:
+            _spare_driver = driver
+            return True
+    # 다른 스레드가 먼저 보관한 경우 새로 띄운 드라이버는 종료
+    driver.quit()
+    return True
+
+
+def take_spare_driver():
+    """미리 띄워 둔 WebDriver를 꺼내 반환합니다. (없거나 이미 종료된 경우 None)"""
+    global _spare_driver
+    with _spare_lock:
+        driver, _spare_driver = _spare_driver, None
+    if driver is None:
+        return None
+    try:
+        # 세션이 살아 있는지 확인 (브라우저가 종료되었다면 예외 발생)
+        driver.current_url
+        return driver
+    except Exception:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        return None
+
+
+@atexit.register
+def _quit_spare_driver():
+    global _spare_driver
+    with _spare_lock:
+        driver, _spare_driver = _spare_driver, None
+    if driver is not None:
+        try:
+            driver.quit()
+        except Exception:
+            pass
@@ -0,0 +1,160 @@
+import re
+import threading
+import numpy as np
+from scipy import sparse
+
+try:
+    from .model_artifact import _row_square_sums, _check_supported
+except ImportError:
+    # 스크립트로 직접 실행하는 경우 (python src/preprocessor.py)
+    from model_artifact import _row_square_sums, _check_supported
+
+# 토큰별 분해 결과 메모 최대 항목 수 (형태소 종류는 많지 않으므로 대부분 적중)
+TOKEN_MEMO_SIZE = 500000
+
+
+class FusedTfidf:
+    """
+    Okt 형태소 토큰에서 TF-IDF 희소 행렬을 바로 만드는 특성 추출기입니다.
+
+    기존 경로는 형태소를 공백으로 이어 붙인 문자열을 만든 뒤 벡터라이저가 token_pattern 정규식으로 다시 나누지만,
+    token_pattern은 공백을 넘어서 일치할 수 없으므로 형태소마다 따로 적용한 결과를 이어 붙인 것과 같습니다.
+    따라서 형태소별 (소문자화 -> token_pattern 추출) 결과를 메모해 두고, n-gram 생성 -> 어휘 인덱스 -> 빈도 x idf -> L2 정규화를
+    바로 수행하여 중간 문자열과 두 번째 토큰화를 생략합니다. 결과는 vectorizer.transform(" ".join(tokens))와 비트 단위까지 같습니다.
+    sklearn TfidfVectorizer와 압축 아티팩트의 CompactVectorizer 모두 사용할 수 있습니다.
+    """
+    def __init__(self, vectorizer):
+        if hasattr(vectorizer, 'get_params'):
+            _check_supported(vectorizer)
+            if np.dtype(getattr(vectorizer, 'dtype', np.float64)) != np.float64:
+                raise ValueError(f"float64가 아닌 벡터라이저 dtype은 지원하지 않습니다. (dtype={vectorizer.dtype!r})")
+        if not getattr(vectorizer, 'token_pattern', None):
+            raise ValueError("token_pattern이 없는 벡터라이저는 지원하지 않습니다.")
+
+        self.vocabulary = vectorizer.vocabulary_
+        self.idf = np.asarray(vectorizer.idf_, dtype=np.float64)
+        self.n_features = len(self.vocabulary)
+        self.lowercase = vectorizer.lowercase
+        self.ngram_range = tuple(vectorizer.ngram_range)
+        self.norm = vectorizer.norm
+        self.sublinear_tf = vectorizer.sublinear_tf
+        self._findall = re.compile(vectorizer.token_pattern).findall
+        # n-gram 어휘의 첫 단어 집합 (n별): 첫 단어가 여기에 없으면 n-gram 문자열을 만들지 않아도 어휘에 없음이 확실함
+        self._ngram_heads = {}
+        for term in self.vocabulary:
+            words = term.split(" ")
+            if len(words) > 1:
+                self._ngram_heads.setdefault(len(words), set()).add(words[0])
+        self._memo = {}
+        self._memo_lock = threading.Lock()
+
+    def _token_parts(self, token):
+        """형태소 하나를 (소문자화 -> token_pattern 추출)한 결과를 반환합니다. (메모 사용)"""
+        parts = self._memo.get(token)
+        if parts is None:
+            parts = tuple(self._findall(token.lower() if self.lowercase else token))
+            with self._memo_lock:
+                if len(self._memo) >= TOKEN_MEMO_SIZE:
+                    self._memo.clear()
+                self._memo[token] = parts
+        return parts
+
+    def _words(self, doc):
+        if isinstance(doc, str):
+            doc = doc.split()
+        memo_get = self._memo.get
+        words = []
+        for token in doc:
+            parts = memo_get(token)
+            words.extend(self._token_parts(token) if parts is None else parts)
+        return words
+
+    def terms(self, doc):
+        """
+        문서 하나의 n-gram 어휘 리스트를 반환합니다. (벡터라이저 analyzer와 같은 순서)
+        doc은 형태소 토큰 시퀀스 또는 공백으로 연결된 형태소 문자열입니다.
+        """
+        words = self._words(doc)
+
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return words
+        n_words = len(words)
+        terms = list(words) if min_n == 1 else []
+        for n in range(max(min_n, 2), min(max_n, n_words) + 1):
+            for i in range(n_words - n + 1):
+                terms.append(" ".join(words[i:i + n]))
+        return terms
+
+    def term_indices(self, doc):
+        """문서 하나에 등장한 어휘의 인덱스 리스트를 반환합니다. (등장 순서, 중복 포함, 어휘에 없는 항목 제외)"""
+        lookup = self.vocabulary.get
+        words = self._words(doc)
+        min_n, max_n = self.ngram_range
+        indices = [idx for idx in map(lookup, words) if idx is not None] if min_n == 1 else []
+        n_words = len(words)
+        for n in range(max(min_n, 2), min(max_n, n_words) + 1):
+            heads = self._ngram_heads.get(n)
+            if not heads:
+                continue
+            for i in range(n_words - n + 1):
+                if words[i] in heads:
+                    idx = lookup(" ".join(words[i:i + n]))
+                    if idx is not None:
+                        indices.append(idx)
+        return indices
+
+    def transform(self, docs):
+        """
+        형태소 토큰 시퀀스(또는 공백으로 연결된 형태소 문자열) 리스트를 TF-IDF CSR 행렬로 변환합니다.
+        """
+        # 모든 문서의 어휘 인덱스를 한 배열로 모은 뒤 (행, 열) 키 기준으로 한 번에 빈도 집계
+        # (키 정렬 순서 = 행 순서, 행 안에서는 열 인덱스 오름차순으로 sklearn의 sort_indices 결과와 같음)
+        flat = []
+        lengths = np.zeros(len(docs), dtype=np.int64)
+        for i, doc in enumerate(docs):
+            doc_indices = self.term_indices(doc)
+            flat.extend(doc_indices)
+            lengths[i] = len(doc_indices)
+
+        rows = np.repeat(np.arange(len(docs), dtype=np.int64), lengths)
+        keys, counts = np.unique(rows * self.n_features + np.asarray(flat, dtype=np.int64), return_counts=True)
+        indices = (keys % self.n_features).astype(np.int32)
+        indptr = np.zeros(len(docs) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys // self.n_features, minlength=len(docs)), out=indptr[1:])
+        data = counts.astype(np.float64)
+        if self.sublinear_tf:
+            np.log(data, out=data)
+            data += 1.0
+        data *= self.idf[indices]
+
+        if self.norm == 'l2' and len(data):
+            norms = np.sqrt(_row_square_sums(data, indptr))
+            norms[norms == 0.0] = 1.0
+            data /= np.repeat(norms, np.diff(indptr))
+
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(docs), self.n_features))
+
+
+# 벡터라이저별 특성 추출기 (프로세스 전역, 지원하지 않는 설정이면 None)
+_extractors = {}
+_extractors_lock = threading.Lock()
+
+
+def get_feature_extractor(vectorizer):
+    """
+    벡터라이저에 대응하는 FusedTfidf를 반환합니다. (최초 호출 시 생성)
+    결과를 같게 재현할 수 없는 벡터라이저 설정이면 None을 반환하며, 호출 측은 vectorizer.transform을 사용합니다.
+    """
+    key = id(vectorizer)
+    with _extractors_lock:
+        entry = _extractors.get(key)
+        if entry is not None and entry[0] is vectorizer:
+            return entry[1]
+        try:
+            extractor = FusedTfidf(vectorizer)
+        except (ValueError, AttributeError) as e:
+            print(f"[정보] 결합 특성 추출을 사용할 수 없어 벡터라이저 변환을 사용합니다: {e}")
+            extractor = None
+        _extractors[key] = (vectorizer, extractor)
+        return extractor
@@ -0,0 +1,244 @@
+import os
+import numpy as np
+from scipy import sparse
+from scipy.special import expit
+
+# --- 경로 설정 ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# H2O GLM 모델에서 추출한 계수를 저장하는 파일명
+COEF_FILENAME = "glm_coefficients.npz"
+
+# 고정 샘플에 대한 H2O 예측(p1) 기록 파일: JVM 없이 NativeGLMScorer와의 동일성을 확인할 때 사용
+H2O_FIXTURE_PATH = os.path.join(BASE_DIR, 'fixtures', 'h2o_glm_p1.npz')
+# 고정 샘플: 아래 문장과, 벡터라이저 어휘에서 시드로 고른 형태소를 이어 붙인 문장 (기록 시 텍스트도 함께 저장)
+FIXTURE_TEXTS = [
+    "오늘 날씨 좋네요",
+    "이번 업데이트 괜찮은 듯",
+    "가격이 너무 비싸다",
+    "운영진 일 좀 제대로 해라",
+    "패치 이후로 밸런스가 엉망이네",
+    "",
+]
+FIXTURE_SEED = 20240101
+FIXTURE_VOCAB_TEXTS = 200
+
+
+class NativeGLMScorer:
+    """
+    H2O 이항(binomial) GLM 모델을 JVM 없이 NumPy/SciPy만으로 예측하는 스코어러입니다.
+
+    이항 GLM의 예측 확률은 sigmoid(X @ beta + b) 이므로, 모델에서 계수(beta)와 절편(b)을
+    한 번 추출해 두면 TF-IDF 희소 행렬에 바로 곱하여 혐오 확률을 계산할 수 있습니다.
+    계수 배열의 i번째 값은 벡터라이저 vocabulary의 i번째 특성(feature_{i})에 대응합니다.
+    """
+    def __init__(self, beta, intercept):
+        self.beta = np.asarray(beta, dtype=np.float64)
+        self.intercept = float(intercept)
+
+    @property
+    def n_features(self):
+        return self.beta.shape[0]
+
+    @classmethod
+    def from_h2o(cls, model, n_features):
+        """
+        H2O GLM 모델에서 계수와 절편을 추출합니다.
+
+        Args:
+            model: h2o.load_model()로 로드한 이항 GLM 모델
+            n_features (int): 벡터라이저의 특성 수 (len(vectorizer.vocabulary_))
+
+        Returns:
+            NativeGLMScorer: 벡터라이저 특성 순서에 맞춰 정렬된 스코어러
+        """
+        family = model.actual_params.get('family') if hasattr(model, 'actual_params') else None
+        if family is not None and family != 'binomial':
+            raise ValueError(f"이항(binomial) GLM 모델만 지원합니다. (family={family})")
+
+        # coef()는 표준화 이전(원본 스케일)의 계수를 반환하므로 TF-IDF 값에 바로 적용 가능
+        coefs = model.coef()
+        beta = np.zeros(n_features, dtype=np.float64)
+        intercept = 0.0
+        for name, value in coefs.items():
+            if name == 'Intercept':
+                intercept = value
+            elif name.startswith('feature_'):
+                idx = int(name[len('feature_'):])
+                if idx >= n_features:
+                    raise ValueError(f"모델 특성 '{name}'이 벡터라이저 특성 수({n_features})를 초과합니다.")
+                beta[idx] = value
+
+        # 계수는 응답 도메인의 두 번째 클래스(p1) 기준이므로,
+        # 'hate'가 첫 번째 클래스라면 부호를 반전하여 항상 혐오 확률을 계산하도록 맞춤
+        try:
+            domain = model._model_json['output']['domains'][-1]
+        except Exception:
+            domain = None
+        if domain and 'hate' in domain and domain.index('hate') == 0:
+            beta = -beta
+            intercept = -intercept
+
+        return cls(beta, intercept)
+
+    @classmethod
+    def load(cls, path):
+        """save()로 저장한 계수 파일(.npz)을 로드합니다."""
+        with np.load(path) as data:
+            return cls(data['beta'], data['intercept'])
+
+    def save(self, path):
+        """계수와 절편을 .npz 파일로 저장합니다."""
+        np.savez(path, beta=self.beta, intercept=np.float64(self.intercept))
+        print(f"[정보] GLM 계수 저장 완료: {path}")
+
+    def decision_function(self, X):
+        """선형 결합 값(X @ beta + b)을 계산합니다. X는 희소/밀집 행렬 모두 가능합니다."""
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"특성 수 불일치: 입력 {X.shape[1]}, 모델 {self.n_features}")
+        if sparse.issparse(X):
+            return np.asarray(X @ self.beta).ravel() + self.intercept
+        return np.asarray(X, dtype=np.float64) @ self.beta + self.intercept
+
+    def predict_proba(self, X):
+        """혐오 확률(sigmoid(X @ beta + b))을 1차원 배열로 반환합니다."""
+        return expit(self.decision_function(X))
+
+
+def _import_preprocessor():
+    # preprocessor가 이 모듈을 임포트하므로 함수 안에서 임포트 (스크립트로 직접 실행하는 경우도 지원)
+    try:
+        from . import preprocessor
+    except ImportError:
+        import preprocessor
+    return preprocessor
+
+
+def verify_against_h2o(texts, model, vectorizer, scorer, atol=1e-6):
+    """
+    동일한 텍스트에 대해 H2O 예측과 NativeGLMScorer 예측이 일치하는지 확인합니다. (JVM 필요)
+
+    Returns:
+        float: 두 결과의 최대 절대 오차
+    """
+    batch_predict = _import_preprocessor().batch_predict
+
+    h2o_probs = np.asarray(batch_predict(texts, model, vectorizer), dtype=np.float64)
+    native_probs = np.asarray(batch_predict(texts, scorer, vectorizer), dtype=np.float64)
+    max_diff = float(np.max(np.abs(h2o_probs - native_probs))) if len(texts) else 0.0
+
+    if max_diff <= atol:
+        print(f"[정보] H2O/Native 예측 일치 확인 ({len(texts)}개, 최대 오차 {max_diff:.2e})")
+    else:
+        print(f"[오류] H2O/Native 예측 불일치 ({len(texts)}개, 최대 오차 {max_diff:.2e}, 허용 {atol:.0e})")
+    return max_diff
+
+
+def fixture_texts(vectorizer, n_vocab_texts=FIXTURE_VOCAB_TEXTS, seed=FIXTURE_SEED):
+    """
+    H2O 기록용 고정 샘플을 만듭니다.
+    FIXTURE_TEXTS에 더해, 어휘 전체를 고르게 덮도록 시드로 고른 어휘 5개씩을 이어 붙인 문장을 추가합니다.
+    """
+    terms = sorted(vectorizer.vocabulary_)
+    rng = np.random.default_rng(seed)
+    texts = list(FIXTURE_TEXTS)
+    for _ in range(n_vocab_texts):
+        texts.append(" ".join(terms[i] for i in rng.choice(len(terms), size=5, replace=False)))
+    return texts
+
+
+def record_h2o_fixture(texts, model, vectorizer, path=H2O_FIXTURE_PATH):
+    """
+    텍스트의 TF-IDF 특성 행렬과 H2O 예측 확률(p1)을 고정 기록 파일로 저장합니다. (JVM 필요)
+    특성 행렬과 추출한 계수를 함께 저장하므로, 이후 확인(check_h2o_fixture)에는 Okt/H2O가 필요하지 않습니다.
+    """
+    preprocessor = _import_preprocessor()
+    texts = list(dict.fromkeys(preprocessor.normalize_text(text) for text in texts))
+    X = sparse.csr_matrix(preprocessor.vectorize_tokens(preprocessor.tokenize_texts(texts, as_tokens=True), vectorizer))
+    p1 = np.asarray(preprocessor.batch_predict(texts, model, vectorizer), dtype=np.float64)
+    scorer = NativeGLMScorer.from_h2o(model, len(vectorizer.vocabulary_))
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez_compressed(
+        path, texts=np.asarray(texts, dtype=str), data=X.data, indices=X.indices, indptr=X.indptr,
+        shape=np.asarray(X.shape), p1=p1, beta=scorer.beta, intercept=np.float64(scorer.intercept)
+    )
+    print(f"[정보] H2O 예측 기록 저장 완료: {path} ({len(texts)}개)")
+
+
+def check_h2o_fixture(scorer=None, path=H2O_FIXTURE_PATH, atol=1e-6):
+    """
+    기록된 H2O 예측(p1)과 NativeGLMScorer 예측이 atol 이내로 일치하는지 확인합니다. (JVM 불필요)
+    scorer를 지정하지 않으면 기록 시 H2O 모델에서 추출한 계수를 사용합니다.
+
+    Returns:
+        float: 최대 절대 오차
+
+    Raises:
+        FileNotFoundError: 기록 파일이 없는 경우 (python -m src.glm_scorer --h2o --record-fixture로 생성)
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"H2O 예측 기록 파일이 없습니다: {path} (H2O 환경에서 python -m src.glm_scorer --h2o --record-fixture로 생성)")
+    with np.load(path) as fixture:
+        X = sparse.csr_matrix((fixture['data'], fixture['indices'], fixture['indptr']), shape=tuple(fixture['shape']))
+        p1 = fixture['p1']
+        if scorer is None:
+            scorer = NativeGLMScorer(fixture['beta'], fixture['intercept'])
+
+    native_probs = scorer.predict_proba(X)
+    max_diff = float(np.max(np.abs(native_probs - p1))) if len(p1) else 0.0
+    if max_diff <= atol:
+        print(f"[정보] 기록된 H2O 예측과 일치 ({len(p1)}개, 최대 오차 {max_diff:.2e})")
+    else:
+        print(f"[오류] 기록된 H2O 예측과 불일치 ({len(p1)}개, 최대 오차 {max_diff:.2e}, 허용 {atol:.0e})")
+    return max_diff
+
+
+# --- 실행 예시: python -m src.glm_scorer [--coef src/models/glm_coefficients.npz] / python -m src.glm_scorer --h2o [--record-fixture] ---
+if __name__ == "__main__":
+    import sys
+    import glob
+    import argparse
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="H2O GLM 계수 추출 및 NativeGLMScorer 동일성 확인")
+    parser.add_argument("--h2o", action='store_true', help="H2O 모델에서 계수를 추출하고 실제 H2O 예측과 비교 (JVM 필요)")
+    parser.add_argument("--record-fixture", action='store_true', help="--h2o와 함께 사용: 고정 샘플의 H2O 예측(p1)을 기록 파일로 저장")
+    parser.add_argument("--coef", default=None, help="기록된 예측과 비교할 계수 파일 (기본: 기록 시 추출한 계수)")
+    parser.add_argument("--fixture", default=H2O_FIXTURE_PATH)
+    parser.add_argument("--atol", type=float, default=1e-6)
+    args = parser.parse_args()
+
+    if not args.h2o:
+        # JVM 없이 기록된 H2O 예측과 비교
+        try:
+            diff = check_h2o_fixture(NativeGLMScorer.load(args.coef) if args.coef else None, args.fixture, args.atol)
+        except FileNotFoundError as e:
+            print(f"[오류] {e}")
+            sys.exit(2)
+        sys.exit(0 if diff <= args.atol else 1)
+
+    preprocessor = _import_preprocessor()
+    # 스크립트로 직접 실행하면 이 파일이 __main__과 glm_scorer로 두 번 로드되므로, preprocessor가 사용하는 클래스로 통일
+    NativeGLMScorer = preprocessor.NativeGLMScorer
+
+    preprocessor.init_h2o()
+    h2o_model, tfidf = preprocessor.load_resources(preprocessor.MODEL_PATH, preprocessor.VECTORIZER_PATH)
+    native = NativeGLMScorer.from_h2o(h2o_model, len(tfidf.vocabulary_))
+    native.save(preprocessor.COEF_PATH)
+
+    # 검증용 텍스트: logs 폴더의 감사 로그(혐오 판정 텍스트)와 정상 텍스트가 섞인 샘플
+    sample_texts = []
+    for log_path in sorted(glob.glob(os.path.join(BASE_DIR, 'logs', '*.csv')))[:5]:
+        log_df = pd.read_csv(log_path)
+        for col in ['Title', 'Content', 'Comment']:
+            if col in log_df.columns:
+                sample_texts.extend(log_df[col].dropna().astype(str).tolist())
+    sample_texts.extend(["오늘 날씨 좋네요", "이번 업데이트 괜찮은 듯", "가격이 너무 비싸다"])
+
+    diff = verify_against_h2o(sample_texts[:500], h2o_model, tfidf, native, args.atol)
+
+    if args.record_fixture:
+        record_h2o_fixture(fixture_texts(tfidf), h2o_model, tfidf, args.fixture)
+        check_h2o_fixture(native, args.fixture, args.atol)
+    sys.exit(0 if diff <= args.atol else 1)
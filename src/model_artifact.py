@@ -0,0 +1,325 @@
+import os
+import re
+import json
+import shutil
+import functools
+from collections.abc import Mapping
+import numpy as np
+from scipy import sparse
+
+try:
+    from .glm_scorer import NativeGLMScorer
+except ImportError:
+    # 스크립트로 직접 실행하는 경우 (python src/preprocessor.py)
+    from glm_scorer import NativeGLMScorer
+
+# 압축 모델 아티팩트 형식 버전 (파일 구성이 바뀌면 올려서 기존 아티팩트를 다시 생성)
+ARTIFACT_VERSION = 1
+# 압축 모델 아티팩트가 저장되는 폴더명 (모델 폴더 아래)
+ARTIFACT_DIRNAME = "compact_model"
+
+# 지원하는 벡터라이저 설정 (이 외의 옵션은 변환 결과를 동일하게 재현할 수 없음)
+_SUPPORTED_DEFAULTS = {
+    'analyzer': 'word',
+    'tokenizer': None,
+    'preprocessor': None,
+    'stop_words': None,
+    'strip_accents': None,
+    'binary': False,
+    'use_idf': True,
+}
+
+
+class SortedTermTable(Mapping):
+    """
+    정렬된 어휘를 UTF-8 바이트 배열(blob)과 오프셋 배열로 보관하는 문자열 테이블입니다.
+
+    i번째 어휘는 blob[offsets[i]:offsets[i + 1]] 이며, 어휘는 UTF-8 바이트 순(= 유니코드 코드포인트 순)으로
+    정렬되어 있으므로 이진 탐색으로 인덱스를 찾습니다. 두 배열 모두 메모리 맵으로 열 수 있어
+    Python 딕셔너리를 만들지 않고도 벡터라이저의 vocabulary_ 처럼 사용할 수 있습니다.
+    """
+    def __init__(self, blob, offsets, lookup_cache_size=200000):
+        self._blob = blob
+        self._offsets = offsets
+        self._size = len(offsets) - 1
+        # 같은 토큰이 반복해서 조회되므로 탐색 결과를 LRU로 메모
+        self.get = functools.lru_cache(maxsize=lookup_cache_size)(self._search)
+
+    @classmethod
+    def build(cls, terms):
+        """어휘 리스트로 (blob, offsets) 배열을 생성합니다. 어휘는 미리 정렬되어 있어야 합니다."""
+        encoded = [term.encode('utf-8') for term in terms]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return blob, offsets
+
+    def term_bytes(self, idx):
+        return self._blob[self._offsets[idx]:self._offsets[idx + 1]].tobytes()
+
+    def term(self, idx):
+        """idx번째 어휘 문자열을 반환합니다."""
+        return self.term_bytes(idx).decode('utf-8')
+
+    def _search(self, term, default=None):
+        key = term.encode('utf-8')
+        lo, hi = 0, self._size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.term_bytes(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._size and self.term_bytes(lo) == key:
+            return lo
+        return default
+
+    def __getitem__(self, term):
+        idx = self.get(term)
+        if idx is None:
+            raise KeyError(term)
+        return idx
+
+    def __contains__(self, term):
+        return self.get(term) is not None
+
+    def __iter__(self):
+        for idx in range(self._size):
+            yield self.term(idx)
+
+    def __len__(self):
+        return self._size
+
+
+class CompactVectorizer:
+    """
+    압축 아티팩트로부터 복원한 TF-IDF 벡터라이저입니다.
+
+    sklearn TfidfVectorizer(analyzer='word')와 같은 순서로 전처리(소문자화) -> token_pattern 추출 ->
+    n-gram 생성 -> 단어 빈도 x idf -> L2 정규화를 수행하므로 transform() 결과가 원본과 같습니다.
+    (열 순서는 어휘 정렬 순서이며, sklearn이 학습한 벡터라이저의 특성 순서와 동일합니다.)
+    vocabulary_, idf_, build_analyzer(), transform()을 제공하여 기존 벡터라이저 자리에 그대로 사용할 수 있습니다.
+    """
+    def __init__(self, vocabulary, idf, meta):
+        self.vocabulary_ = vocabulary
+        self.idf_ = idf
+        self.lowercase = meta['lowercase']
+        self.token_pattern = meta['token_pattern']
+        self.ngram_range = tuple(meta['ngram_range'])
+        self.norm = meta['norm']
+        self.sublinear_tf = meta['sublinear_tf']
+        self._token_regex = re.compile(self.token_pattern)
+
+    def build_analyzer(self):
+        """문서 하나를 n-gram 어휘 리스트로 변환하는 함수를 반환합니다. (sklearn과 동일한 규칙)"""
+        findall = self._token_regex.findall
+        lowercase = self.lowercase
+        min_n, max_n = self.ngram_range
+
+        def analyze(doc):
+            if lowercase:
+                doc = doc.lower()
+            tokens = findall(doc)
+            if max_n == 1:
+                return tokens
+            n_tokens = len(tokens)
+            terms = list(tokens) if min_n == 1 else []
+            for n in range(max(min_n, 2), min(max_n, n_tokens) + 1):
+                for i in range(n_tokens - n + 1):
+                    terms.append(" ".join(tokens[i:i + n]))
+            return terms
+
+        return analyze
+
+    def transform(self, raw_documents):
+        """토큰화된 문서 리스트를 L2 정규화된 TF-IDF CSR 행렬로 변환합니다."""
+        analyze = self.build_analyzer()
+        lookup = self.vocabulary_.get
+        indptr = [0]
+        indices = []
+        counts = []
+        for doc in raw_documents:
+            row_counts = {}
+            for term in analyze(doc):
+                idx = lookup(term)
+                if idx is not None:
+                    row_counts[idx] = row_counts.get(idx, 0) + 1
+            for idx in sorted(row_counts):
+                indices.append(idx)
+                counts.append(row_counts[idx])
+            indptr.append(len(indices))
+
+        indices = np.asarray(indices, dtype=np.int32)
+        data = np.asarray(counts, dtype=np.float64)
+        if self.sublinear_tf:
+            np.log(data, out=data)
+            data += 1.0
+        data *= self.idf_[indices]
+
+        indptr = np.asarray(indptr, dtype=np.int64)
+        if self.norm == 'l2' and len(data):
+            row_lengths = np.diff(indptr)
+            norms = np.sqrt(_row_square_sums(data, indptr))
+            norms[norms == 0.0] = 1.0
+            data /= np.repeat(norms, row_lengths)
+
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, len(self.vocabulary_)))
+
+
+def _row_square_sums(data, indptr):
+    """
+    CSR 행별 제곱합을 계산합니다.
+    sklearn의 L2 정규화와 비트 단위까지 같은 값을 얻기 위해 각 행 안에서는 앞에서부터 순서대로 더하고,
+    여러 행은 같은 위치의 원소끼리 한 번에 벡터 연산으로 처리합니다. (반복 횟수 = 가장 긴 행의 길이)
+    """
+    starts = indptr[:-1]
+    row_lengths = np.diff(indptr)
+    sums = np.zeros(len(starts), dtype=np.float64)
+    for k in range(int(row_lengths.max(initial=0))):
+        rows = np.flatnonzero(row_lengths > k)
+        values = data[starts[rows] + k]
+        sums[rows] += values * values
+    return sums
+
+
+def _check_supported(vectorizer):
+    params = vectorizer.get_params()
+    for name, expected in _SUPPORTED_DEFAULTS.items():
+        if params.get(name, expected) != expected:
+            raise ValueError(f"압축 아티팩트가 지원하지 않는 벡터라이저 설정입니다: {name}={params.get(name)!r}")
+    if params.get('norm') not in ('l2', None):
+        raise ValueError(f"압축 아티팩트는 norm='l2' 또는 None만 지원합니다. (norm={params.get('norm')!r})")
+
+
+def export_compact_model(vectorizer, scorer, artifact_dir, source_fingerprint=None):
+    """
+    TF-IDF 벡터라이저와 GLM 계수를 메모리 맵으로 열 수 있는 압축 아티팩트로 저장합니다.
+
+    저장 구성:
+        terms.npy / offsets.npy : 정렬된 어휘 문자열 테이블 (UTF-8 바이트 + 오프셋)
+        idf.npy                 : 어휘별 idf
+        coef_index.npy / coef_value.npy : 0이 아닌 GLM 계수만 (인덱스, 값) 형태로 저장
+        meta.json               : 절편, 토큰 패턴, n-gram 범위 등 변환 설정
+
+    계수가 0인 어휘는 점수에 직접 기여하지 않으므로 계수 배열에서 제외합니다.
+    단, L2 정규화의 분모에는 계수와 무관하게 문서에 등장한 모든 어휘가 포함되므로
+    어휘 테이블과 idf는 전체를 유지해야 원본과 같은 점수가 나옵니다.
+
+    Args:
+        vectorizer: 학습된 sklearn TfidfVectorizer
+        scorer (NativeGLMScorer): 벡터라이저 특성 순서에 맞춘 GLM 계수
+        artifact_dir (str): 저장할 폴더 경로 (기존 폴더는 교체됨)
+        source_fingerprint (str): 원본 모델/벡터라이저 지문 (변경 감지용)
+    """
+    _check_supported(vectorizer)
+    vocabulary = vectorizer.vocabulary_
+    if scorer.n_features != len(vocabulary):
+        raise ValueError(f"GLM 계수({scorer.n_features})와 벡터라이저 특성 수({len(vocabulary)})가 일치하지 않습니다.")
+
+    # 어휘를 UTF-8 바이트 순으로 정렬하고 idf/계수도 같은 순서로 재배열
+    terms = sorted(vocabulary, key=lambda term: term.encode('utf-8'))
+    order = np.fromiter((vocabulary[term] for term in terms), dtype=np.int64, count=len(terms))
+    idf = np.asarray(vectorizer.idf_, dtype=np.float64)[order]
+    beta = scorer.beta[order]
+    coef_index = np.flatnonzero(beta).astype(np.int32)
+    blob, offsets = SortedTermTable.build(terms)
+
+    meta = {
+        'version': ARTIFACT_VERSION,
+        'n_features': len(terms),
+        'n_nonzero_coef': int(len(coef_index)),
+        'intercept': scorer.intercept,
+        'lowercase': bool(vectorizer.lowercase),
+        'token_pattern': vectorizer.token_pattern,
+        'ngram_range': list(vectorizer.ngram_range),
+        'norm': vectorizer.norm,
+        'sublinear_tf': bool(vectorizer.sublinear_tf),
+        'source_fingerprint': source_fingerprint,
+    }
+
+    # 임시 폴더에 모두 기록한 뒤 교체하여, 읽는 쪽이 반쯤 쓰인 아티팩트를 보지 않도록 함
+    tmp_dir = f"{artifact_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    np.save(os.path.join(tmp_dir, 'terms.npy'), blob)
+    np.save(os.path.join(tmp_dir, 'offsets.npy'), offsets)
+    np.save(os.path.join(tmp_dir, 'idf.npy'), idf)
+    np.save(os.path.join(tmp_dir, 'coef_index.npy'), coef_index)
+    np.save(os.path.join(tmp_dir, 'coef_value.npy'), beta[coef_index])
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    if os.path.exists(artifact_dir):
+        shutil.rmtree(artifact_dir)
+    os.replace(tmp_dir, artifact_dir)
+    print(f"[정보] 압축 모델 저장 완료: {artifact_dir} (어휘 {len(terms)}개, 0이 아닌 계수 {len(coef_index)}개)")
+    return artifact_dir
+
+
+def read_artifact_meta(artifact_dir):
+    """아티팩트의 meta.json을 읽어 반환합니다. (없거나 형식 버전이 다르면 None)"""
+    meta_path = os.path.join(artifact_dir, 'meta.json')
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('version') != ARTIFACT_VERSION:
+        return None
+    return meta
+
+
+def load_compact_model(artifact_dir, mmap=True):
+    """
+    압축 아티팩트를 로드하여 (NativeGLMScorer, CompactVectorizer)를 반환합니다.
+
+    mmap=True이면 어휘 테이블과 idf를 메모리 맵으로 열기 때문에 로드가 즉시 끝나고,
+    같은 아티팩트를 여는 여러 프로세스가 운영체제 페이지 캐시를 공유합니다.
+    (스코어러의 계수 벡터는 희소 저장된 값으로부터 특성 수 길이의 배열로 복원합니다.)
+    """
+    meta = read_artifact_meta(artifact_dir)
+    if meta is None:
+        raise FileNotFoundError(f"압축 모델 아티팩트를 찾을 수 없거나 형식 버전이 다릅니다: {artifact_dir}")
+
+    mmap_mode = 'r' if mmap else None
+    load = lambda name: np.load(os.path.join(artifact_dir, name), mmap_mode=mmap_mode)
+    vocabulary = SortedTermTable(load('terms.npy'), load('offsets.npy'))
+    vectorizer = CompactVectorizer(vocabulary, load('idf.npy'), meta)
+
+    beta = np.zeros(meta['n_features'], dtype=np.float64)
+    beta[load('coef_index.npy')] = load('coef_value.npy')
+    scorer = NativeGLMScorer(beta, meta['intercept'])
+    return scorer, vectorizer
+
+
+# --- 실행 예시: 압축 아티팩트 생성 및 원본 벡터라이저와의 동일성 검증 ---
+if __name__ == "__main__":
+    import glob
+    import time
+    import pandas as pd
+    from .preprocessor import (
+        load_native_scorer, tokenize_texts, model_fingerprint,
+        MODEL_PATH, VECTORIZER_PATH, COMPACT_MODEL_DIR, BASE_DIR
+    )
+
+    scorer, tfidf = load_native_scorer(MODEL_PATH, VECTORIZER_PATH)
+    export_compact_model(tfidf, scorer, COMPACT_MODEL_DIR, model_fingerprint(MODEL_PATH, VECTORIZER_PATH))
+
+    start = time.perf_counter()
+    compact_scorer, compact_vectorizer = load_compact_model(COMPACT_MODEL_DIR)
+    print(f"[정보] 압축 모델 로드 시간: {(time.perf_counter() - start) * 1000:.2f}ms")
+
+    sample_texts = []
+    for log_path in sorted(glob.glob(os.path.join(BASE_DIR, 'logs', '*.csv')))[:5]:
+        log_df = pd.read_csv(log_path)
+        for col in ['Title', 'Content', 'Comment']:
+            if col in log_df.columns:
+                sample_texts.extend(log_df[col].dropna().astype(str).tolist())
+    sample_texts.extend(["오늘 날씨 좋네요", "이번 업데이트 괜찮은 듯", "가격이 너무 비싸다"])
+    tokenized = tokenize_texts(sample_texts[:500])
+
+    X_original = tfidf.transform(tokenized)
+    X_compact = compact_vectorizer.transform(tokenized)
+    max_diff = abs(X_original - X_compact).max() if X_original.nnz else 0.0
+    prob_diff = float(np.max(np.abs(scorer.predict_proba(X_original) - compact_scorer.predict_proba(X_compact))))
+    status = "[정보]" if max_diff <= 1e-12 and prob_diff <= 1e-12 else "[오류]"
+    print(f"{status} 원본/압축 벡터라이저 비교 ({len(tokenized)}개): 특성 최대 오차 {max_diff:.2e}, 확률 최대 오차 {prob_diff:.2e}")
@@ -0,0 +1,175 @@
+import os
+import json
+import shutil
+from datetime import datetime
+
+try:
+    from .glm_scorer import NativeGLMScorer, COEF_FILENAME
+    from .token_cache import normalize_text
+except ImportError:
+    # 스크립트로 직접 실행하는 경우 (python src/preprocessor.py)
+    from glm_scorer import NativeGLMScorer, COEF_FILENAME
+    from token_cache import normalize_text
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 학습된 모델 변형(variant)이 저장되는 폴더 (버전별 하위 폴더 + index.json)
+# 주의: 'models' 폴더를 만들면 preprocessor의 MODEL_DIR이 바뀌므로 별도 이름 사용
+REGISTRY_DIR = os.getenv("HATE_MODEL_REGISTRY_DIR", os.path.join(BASE_DIR, 'model_registry'))
+INDEX_FILENAME = "index.json"
+VECTORIZER_FILENAME = "vectorizer.joblib"
+META_FILENAME = "meta.json"
+
+# 특성 종류별 입력 형태: 'tokens'(Okt 형태소 문자열, JVM 필요) | 'text'(정규화된 원문, JVM 불필요)
+FEATURE_INPUTS = {
+    'okt-tfidf': 'tokens',
+    'char-tfidf': 'text',
+    'hashing': 'text',
+}
+
+
+class RawTextFeatures:
+    """
+    원문 텍스트를 바로 입력받는 특성 변환기(문자 n-gram TF-IDF, 해싱 벡터라이저)를 감싸는 클래스입니다.
+    input_kind가 'text'이므로 preprocessor는 Okt 토큰화 없이 transform()에 원문을 전달합니다.
+    """
+    input_kind = 'text'
+
+    def __init__(self, vectorizer):
+        self.vectorizer = vectorizer
+
+    def transform(self, texts):
+        """텍스트 리스트를 정규화(공백 정리) 후 특성 행렬로 변환합니다."""
+        return self.vectorizer.transform([normalize_text(text) for text in texts])
+
+
+def _read_json(path, default=None):
+    if not os.path.exists(path):
+        return default
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_json(path, payload):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def register_model(variant, vectorizer, scorer, meta, registry_dir=REGISTRY_DIR, promote=False):
+    """
+    학습된 (벡터라이저, NativeGLMScorer)를 새 버전으로 레지스트리에 저장합니다.
+
+    Args:
+        variant (str): 특성 종류 ('okt-tfidf' | 'char-tfidf' | 'hashing')
+        meta (dict): 학습 설정/데이터 지문/평가 결과 등 함께 저장할 정보
+        promote (bool): True이면 이 버전을 해당 변형의 기본 버전으로 지정
+
+    Returns:
+        str: 저장된 버전 ID (<변형>-<시각(마이크로초 포함)>)
+    """
+    import joblib
+
+    if variant not in FEATURE_INPUTS:
+        raise ValueError(f"알 수 없는 모델 변형입니다: {variant} (지원: {', '.join(FEATURE_INPUTS)})")
+
+    # 같은 변형을 연달아 등록해도 학습이 끝난 뒤 버전 폴더가 겹치지 않도록 마이크로초까지 포함하고, 이미 있으면 다시 생성
+    while True:
+        created_at = datetime.now()
+        version = f"{variant}-{created_at.strftime('%Y%m%d_%H%M%S_%f')}"
+        version_dir = os.path.join(registry_dir, version)
+        tmp_dir = f"{version_dir}.tmp"
+        if not os.path.exists(version_dir) and not os.path.exists(tmp_dir):
+            break
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    joblib.dump(vectorizer, os.path.join(tmp_dir, VECTORIZER_FILENAME))
+    scorer.save(os.path.join(tmp_dir, COEF_FILENAME))
+    _write_json(os.path.join(tmp_dir, META_FILENAME), {
+        **meta,
+        'version': version,
+        'variant': variant,
+        'input': FEATURE_INPUTS[variant],
+        'n_features': scorer.n_features,
+        'created_at': created_at.isoformat(timespec='microseconds'),
+    })
+    os.replace(tmp_dir, version_dir)
+
+    if promote:
+        promote_model(version, registry_dir)
+    print(f"[정보] 모델 등록 완료: {version}{' (기본 버전으로 지정)' if promote else ''}")
+    return version
+
+
+def promote_model(version, registry_dir=REGISTRY_DIR):
+    """버전을 해당 변형의 기본 버전으로 지정합니다. (HATE_MODEL_VARIANT=<변형>으로 선택됨)"""
+    meta = _read_json(os.path.join(registry_dir, version, META_FILENAME))
+    if meta is None:
+        raise FileNotFoundError(f"등록된 모델 버전을 찾을 수 없습니다: {version}")
+    index_path = os.path.join(registry_dir, INDEX_FILENAME)
+    index = _read_json(index_path, {'promoted': {}})
+    index['promoted'][meta['variant']] = version
+    _write_json(index_path, index)
+
+
+def list_models(registry_dir=REGISTRY_DIR):
+    """등록된 모든 버전의 메타데이터를 생성 순서대로 반환합니다. (기본 버전 여부 포함)"""
+    if not os.path.isdir(registry_dir):
+        return []
+    promoted = set(_read_json(os.path.join(registry_dir, INDEX_FILENAME), {'promoted': {}})['promoted'].values())
+    models = []
+    for name in sorted(os.listdir(registry_dir)):
+        meta = _read_json(os.path.join(registry_dir, name, META_FILENAME))
+        if meta is not None:
+            models.append({**meta, 'promoted': name in promoted})
+    return sorted(models, key=lambda meta: meta.get('created_at', ''))
+
+
+def resolve_variant(name, registry_dir=REGISTRY_DIR):
+    """
+    변형 이름(기본 버전) 또는 버전 ID를 버전 폴더 경로로 변환합니다.
+
+    Raises:
+        FileNotFoundError: 해당 변형/버전이 레지스트리에 없는 경우
+    """
+    if os.path.isdir(os.path.join(registry_dir, name)):
+        return os.path.join(registry_dir, name)
+    promoted = _read_json(os.path.join(registry_dir, INDEX_FILENAME), {'promoted': {}})['promoted']
+    if name in promoted:
+        return os.path.join(registry_dir, promoted[name])
+    raise FileNotFoundError(f"레지스트리({registry_dir})에서 모델 변형 '{name}'을 찾을 수 없습니다. 먼저 src/train_model.py로 학습/등록해주세요.")
+
+
+def load_model(version_dir):
+    """
+    버전 폴더에서 (NativeGLMScorer, 특성 변환기)를 로드합니다.
+    원문 입력 변형은 RawTextFeatures로 감싸서 반환하므로, 호출 측은 input_kind로 토큰화 여부를 판단합니다.
+    """
+    import joblib
+
+    meta = _read_json(os.path.join(version_dir, META_FILENAME))
+    if meta is None:
+        raise FileNotFoundError(f"모델 메타데이터가 없습니다: {version_dir}")
+    vectorizer = joblib.load(os.path.join(version_dir, VECTORIZER_FILENAME))
+    scorer = NativeGLMScorer.load(os.path.join(version_dir, COEF_FILENAME))
+    if meta['input'] == 'text':
+        vectorizer = RawTextFeatures(vectorizer)
+    print(f"[정보] 레지스트리 모델 로드 완료: {meta['version']} (특성 {scorer.n_features}개, 입력 {meta['input']})")
+    return scorer, vectorizer
+
+
+# --- 실행 예시: python -m src.model_registry [promote <버전>] ---
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) == 3 and sys.argv[1] == "promote":
+        promote_model(sys.argv[2])
+        print(f"[완료] 기본 버전 지정: {sys.argv[2]}")
+    else:
+        for item in list_models():
+            metrics = item.get('metrics', {})
+            mark = "*" if item['promoted'] else " "
+            print(f"{mark} {item['version']:<32} 입력={item['input']:<6} F1={metrics.get('f1', float('nan')):.4f} "
+                  f"AUC={metrics.get('roc_auc', float('nan')):.4f} 처리량={metrics.get('texts_per_sec', float('nan')):.0f}/초")
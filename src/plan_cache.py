@@ -0,0 +1,139 @@
+import os
+import re
+import json
+import time
+import hashlib
+import unicodedata
+
+try:
+    from .sqlite_store import SqliteTTLStore, process_singleton
+except ImportError:
+    from sqlite_store import SqliteTTLStore, process_singleton
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 검색 계획 캐시 사용 여부와 저장 경로
+PLAN_CACHE_ENABLED = os.getenv("PLAN_CACHE", "1").lower() in ("1", "true", "yes")
+PLAN_CACHE_PATH = os.path.join(BASE_DIR, 'cache', 'plan_cache.sqlite')
+# 계획 유효 시간(초): 커뮤니티 은어/약칭이 바뀔 수 있으므로 기본 하루
+PLAN_CACHE_TTL = float(os.getenv("PLAN_CACHE_TTL", "86400"))
+# 최대 저장 항목 수 (초과 시 가장 오래 사용되지 않은 항목부터 삭제)
+PLAN_CACHE_MAX_ENTRIES = int(os.getenv("PLAN_CACHE_MAX_ENTRIES", "1000"))
+# 유사 질문 재사용 기준 (문자 bigram 자카드 유사도, 0이면 정확히 같은 질문만 재사용)
+PLAN_CACHE_SIMILARITY = float(os.getenv("PLAN_CACHE_SIMILARITY", "0"))
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_DIGITS = re.compile(r"\d+")
+
+
+def normalize_prompt(text):
+    """
+    질문을 캐시 키용으로 정규화합니다.
+    유니코드 정규화(NFKC), 소문자화, 문장 부호 제거, 연속 공백 정리를 수행하므로
+    "롤드컵 반응 알려줘!"와 "롤드컵  반응 알려줘"는 같은 키가 됩니다.
+    """
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    return " ".join(_PUNCTUATION.sub(" ", text).split())
+
+
+def _bigrams(normalized):
+    compact = normalized.replace(" ", "")
+    if len(compact) < 2:
+        return {compact} if compact else set()
+    return {compact[i:i + 2] for i in range(len(compact) - 1)}
+
+
+def prompt_similarity(a, b):
+    """
+    정규화된 두 질문의 문자 bigram 자카드 유사도를 반환합니다. (0~1)
+    숫자가 다르면 다른 대상을 묻는 질문이므로(예: 아이폰 15 / 아이폰 16) 유사도는 0입니다.
+    """
+    if _DIGITS.findall(a) != _DIGITS.findall(b):
+        return 0.0
+    grams_a, grams_b = _bigrams(a), _bigrams(b)
+    if not grams_a or not grams_b:
+        return 0.0
+    return len(grams_a & grams_b) / len(grams_a | grams_b)
+
+
+def plan_namespace(model_name, system_instruction):
+    """
+    모델 이름과 시스템 지시문으로 캐시 네임스페이스를 만듭니다.
+    모델이나 지시문이 바뀌면 네임스페이스가 달라지므로 이전 계획은 자동으로 조회되지 않습니다.
+    """
+    digest = hashlib.sha256(system_instruction.encode('utf-8')).hexdigest()[:12]
+    return f"{model_name}:{digest}"
+
+
+class PlanCache:
+    """
+    (정규화된 질문, 모델 네임스페이스) 단위로 LLM 검색 계획을 저장하는 로컬 SQLite 저장소입니다.
+
+    같거나 거의 같은 질문(추천 질문 버튼 포함)마다 긴 시스템 지시문으로 LLM을 다시 호출하지 않도록
+    한 번 수립한 계획을 TTL 동안 재사용합니다. 항목 수가 max_entries를 넘으면 가장 오래 사용되지 않은 항목부터 삭제합니다. (SqliteTTLStore)
+    similarity가 0보다 크면 정확히 같은 질문이 없을 때 유사도가 기준 이상인 가장 비슷한 질문의 계획을 재사용합니다.
+    """
+    def __init__(self, path=PLAN_CACHE_PATH, ttl=PLAN_CACHE_TTL, max_entries=PLAN_CACHE_MAX_ENTRIES, similarity=PLAN_CACHE_SIMILARITY, clock=time.time):
+        self.path = path
+        self.similarity = similarity
+        self._store = SqliteTTLStore(path, 'plan_entries', ttl, max_entries, clock)
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    def get(self, prompt, namespace):
+        """
+        질문에 대한 저장된 계획을 반환합니다. (없거나 만료되었으면 None)
+
+        Returns:
+            dict | None: 검색 계획
+        """
+        key = normalize_prompt(prompt)
+        row = self._store.get(namespace, key)
+        if row is None and self.similarity > 0:
+            scored = [(prompt_similarity(key, cached), cached, plan) for cached, plan, _ in self._store.items(namespace)]
+            best = max(scored, default=None)
+            if best is not None and best[0] >= self.similarity:
+                self._store.touch(namespace, best[1])
+                row = (best[2],)
+                self.similar_hits += 1
+
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, prompt, namespace, plan):
+        """계획을 저장하고, 만료된 항목과 최대 항목 수를 넘는 오래된 항목을 정리합니다."""
+        self._store.put(namespace, normalize_prompt(prompt), json.dumps(plan, ensure_ascii=False))
+
+    def clear(self):
+        """저장된 모든 계획을 삭제합니다."""
+        self._store.clear()
+
+    def stats(self):
+        """캐시 적중 통계를 반환합니다."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'similar_hits': self.similar_hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': self._store.size(),
+            'path': self.path,
+        }
+
+    def close(self):
+        self._store.close()
+
+
+# 프로세스 전역 계획 캐시
+_shared_plan_cache = process_singleton(PlanCache)
+
+
+def get_plan_cache():
+    """프로세스 전역 검색 계획 캐시를 반환합니다. (PLAN_CACHE=0이면 None)"""
+    if not PLAN_CACHE_ENABLED:
+        return None
+    return _shared_plan_cache()
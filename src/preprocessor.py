@@ -1,12 +1,39 @@
-import h2o
+import numpy as np
 import pandas as pd
 import os
+import sys
 import pickle
+import threading
+import atexit
+import time
 from datetime import datetime
-from konlpy.tag import Okt
 from sklearn.feature_extraction.text import TfidfVectorizer
 import joblib 
 
+try:
+    from .glm_scorer import NativeGLMScorer, COEF_FILENAME
+    from .tokenizer_pool import get_tokenizer_pool
+    from .token_cache import TokenCache, normalize_text, text_hash
+    from .score_cache import ScoreCache, model_fingerprint
+    from .cascade import HateCascade
+    from .fused_features import get_feature_extractor
+    from .model_artifact import export_compact_model, load_compact_model, read_artifact_meta, ARTIFACT_DIRNAME
+    from .audit_store import get_audit_store
+    from .scoring_server import ScoringClient, SCORING_URL
+    from .model_registry import resolve_variant, load_model as load_registry_model, VECTORIZER_FILENAME as REGISTRY_VECTORIZER_FILENAME
+except ImportError:
+    # 스크립트로 직접 실행하는 경우 (python src/preprocessor.py)
+    from glm_scorer import NativeGLMScorer, COEF_FILENAME
+    from tokenizer_pool import get_tokenizer_pool
+    from token_cache import TokenCache, normalize_text, text_hash
+    from score_cache import ScoreCache, model_fingerprint
+    from cascade import HateCascade
+    from fused_features import get_feature_extractor
+    from model_artifact import export_compact_model, load_compact_model, read_artifact_meta, ARTIFACT_DIRNAME
+    from audit_store import get_audit_store
+    from scoring_server import ScoringClient, SCORING_URL
+    from model_registry import resolve_variant, load_model as load_registry_model, VECTORIZER_FILENAME as REGISTRY_VECTORIZER_FILENAME
+
 # --- 경로 및 환경 설정 ---
 # 스크립트가 위치한 디렉토리를 기준으로 경로를 설정합니다.
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -25,12 +52,78 @@ VECTORIZER_FILENAME = "tfidf_vectorizer.pkl"
 # 전체 경로 구성
 MODEL_PATH = os.path.join(MODEL_DIR, MODEL_FILENAME)
 VECTORIZER_PATH = os.path.join(MODEL_DIR, VECTORIZER_FILENAME)
+COEF_PATH = os.path.join(MODEL_DIR, COEF_FILENAME)
+COMPACT_MODEL_DIR = os.path.join(MODEL_DIR, ARTIFACT_DIRNAME)
+
+# 예측 엔진 선택: 'h2o' (기본, H2O JVM 사용) | 'native' (추출한 GLM 계수로 NumPy/SciPy 직접 계산)
+#               | 'compact' (native와 같은 계산을 메모리 맵 압축 아티팩트로 수행, 벡터라이저 pickle 로드 생략)
+SCORING_ENGINE = os.getenv("HATE_SCORING_ENGINE", "h2o").lower()
+
+# 모델 변형 선택: 비어 있으면 기존 GLM_Classification_Model + tfidf_vectorizer.pkl 사용
+# 'okt-tfidf' | 'char-tfidf' | 'hashing' (레지스트리의 기본 버전) 또는 버전 ID (src/train_model.py로 학습/등록)
+MODEL_VARIANT = os.getenv("HATE_MODEL_VARIANT", "").strip()
 
 # 혐오 판단 임계값 (해당 수치 이상이면 혐오로 간주)
 HATE_THRESHOLD = 0.88 
 
-# 형태소 분석기 전역 인스턴스
-okt = Okt()
+# 예측 청크 크기: 한 번에 토큰화/벡터화/예측할 텍스트 수 (메모리 사용량 상한 결정)
+PREDICT_CHUNK_SIZE = int(os.getenv("HATE_PREDICT_CHUNK_SIZE", "2000"))
+
+# 토큰화 워커 프로세스 수 (0 또는 1: 현재 프로세스에서 순차 처리)
+TOKENIZER_WORKERS = int(os.getenv("HATE_TOKENIZER_WORKERS", "0"))
+# 이보다 적은 텍스트는 프로세스 간 전송 비용이 더 크므로 순차 처리
+TOKENIZER_POOL_MIN_TEXTS = 200
+
+# 묶음 토큰화: Okt 한 번의 호출에 구분 토큰으로 이어 붙여 보낼 최대 텍스트 수 (0 또는 1: 텍스트마다 호출)
+TOKENIZE_BATCH_SIZE = int(os.getenv("HATE_TOKENIZE_BATCH_SIZE", "256"))
+# 묶음 하나의 최대 문자 수 (JVM 문자열/결과 배열 크기 제한)
+TOKENIZE_BATCH_MAX_CHARS = 200000
+
+# 결합 특성 추출: 형태소 토큰에서 TF-IDF 행렬을 바로 생성 (중간 문자열/재토큰화 생략, 결과는 vectorizer.transform과 같음)
+FUSED_FEATURES = os.getenv("HATE_FUSED_FEATURES", "1").lower() in ("1", "true", "yes")
+
+# 토큰화 캐시: 메모리 LRU 최대 항목 수 (0이면 캐시 사용 안 함)
+TOKEN_CACHE_SIZE = int(os.getenv("HATE_TOKEN_CACHE_SIZE", "100000"))
+# 토큰화 캐시 디스크 계층 사용 여부 (재시작 후에도 유지)
+TOKEN_CACHE_DISK = os.getenv("HATE_TOKEN_CACHE_DISK", "0").lower() in ("1", "true", "yes")
+TOKEN_CACHE_PATH = os.path.join(BASE_DIR, 'cache', 'token_cache.sqlite')
+
+# 혐오 점수 캐시 사용 여부: (텍스트 해시, 모델 지문) 단위로 계산된 점수를 재사용
+SCORE_CACHE_ENABLED = os.getenv("HATE_SCORE_CACHE", "1").lower() in ("1", "true", "yes")
+SCORE_CACHE_PATH = os.path.join(BASE_DIR, 'cache', 'score_cache.sqlite')
+
+# 2단계 캐스케이드 사용 여부: 점수 상한이 임계값에 못 미치는 텍스트는 벡터화/예측을 생략
+CASCADE_ENABLED = os.getenv("HATE_CASCADE", "1").lower() in ("1", "true", "yes")
+
+# 감사 로그 형식: 'parquet' (기본, 날짜별 파티션 저장소에 백그라운드 기록) | 'csv' (실행마다 CSV 파일 하나)
+AUDIT_FORMAT = os.getenv("HATE_AUDIT_FORMAT", "parquet").lower()
+
+# 지연 필터링(filter_hate_speech_lazy)에서 한 번에 검사할 최소 행 수 (남은 필요 행 수와 관측된 통과율로 늘어남)
+LAZY_MIN_WINDOW = int(os.getenv("HATE_LAZY_MIN_WINDOW", "32"))
+
+# 형태소 분석기 전역 인스턴스 (JVM을 띄우므로 첫 토큰화 시점에 생성)
+okt = None
+# Okt(JVM) 인스턴스는 스레드 안전하지 않으므로 생성과 동시 호출을 직렬화
+_okt_lock = threading.Lock()
+
+def _import_h2o():
+    """
+    h2o 모듈을 임포트하여 반환합니다.
+    h2o 임포트는 무겁고 native/compact 엔진에서는 필요 없으므로, 실제로 H2O를 사용하는 시점까지 미룹니다.
+    """
+    import h2o
+    return h2o
+
+def _get_okt():
+    """
+    Okt 인스턴스를 반환합니다. (최초 호출 시 JVM과 함께 생성)
+    호출 측에서 _okt_lock을 잡은 상태로 호출해야 합니다.
+    """
+    global okt
+    if okt is None:
+        from konlpy.tag import Okt
+        okt = Okt()
+    return okt
 
 def init_h2o(max_mem_size="4G"):
     """
@@ -41,12 +134,34 @@ def init_h2o(max_mem_size="4G"):
         max_mem_size (str): H2O 인스턴스 최대 메모리 사용량 (기본 "1G")
     """
     try:
+        h2o = _import_h2o()
         h2o.init(max_mem_size=max_mem_size)
         print("[정보] H2O 클러스터가 성공적으로 초기화되었습니다.")
     except Exception as e:
         print(f"[오류] H2O 초기화 실패: {e}")
         raise
 
+def load_vectorizer(vectorizer_path):
+    """
+    저장된 TF-IDF 벡터라이저를 로드합니다.
+    """
+    if not os.path.exists(vectorizer_path):
+        raise FileNotFoundError(f"벡터라이저 파일을 찾을 수 없습니다: {vectorizer_path}")
+
+    with open(vectorizer_path, 'rb') as f:
+        try:
+            vectorizer = pickle.load(f)
+        except Exception:
+            # pickle 로딩 실패 시 joblib 시도 (호환성 확보)
+            try:
+                f.seek(0)
+                vectorizer = joblib.load(f)
+            except Exception:
+                raise IOError("Vectorizer 로딩에 실패했습니다 (pickle/joblib 모두 실패).")
+
+    print(f"[정보] 벡터라이저 로드 완료: {os.path.basename(vectorizer_path)}")
+    return vectorizer
+
 def load_resources(model_path, vectorizer_path):
     """
     저장된 H2O 모델(Binary)과 TF-IDF 벡터라이저를 로드합니다.
@@ -59,78 +174,295 @@ def load_resources(model_path, vectorizer_path):
 
     try:
         # H2O Binary 모델 로드
-        model = h2o.load_model(model_path)
+        model = _import_h2o().load_model(model_path)
         print(f"[정보] 모델 로드 완료: {os.path.basename(model_path)}")
         
         # Vectorizer 로드
-        with open(vectorizer_path, 'rb') as f:
-            try:
-                vectorizer = pickle.load(f)
-            except Exception:
-                # pickle 로딩 실패 시 joblib 시도 (호환성 확보)
-                try:
-                    vectorizer = joblib.load(f)
-                except Exception:
-                    raise IOError("Vectorizer 로딩에 실패했습니다 (pickle/joblib 모두 실패).")
-
-        print(f"[정보] 벡터라이저 로드 완료: {os.path.basename(vectorizer_path)}")
+        vectorizer = load_vectorizer(vectorizer_path)
         
         return model, vectorizer
     except Exception as e:
         print(f"[오류] 리소스 로드 중 문제 발생: {e}")
         raise
 
-def tokenize(text):
+def load_native_scorer(model_path, vectorizer_path, coef_path=COEF_PATH):
     """
-    KoNLPy Okt를 사용하여 텍스트를 토큰화합니다.
+    JVM 없이 예측하기 위한 NativeGLMScorer와 벡터라이저를 로드합니다.
+    계수 파일이 없으면 H2O 모델에서 한 번 추출하여 저장한 뒤 사용합니다.
+    """
+    vectorizer = load_vectorizer(vectorizer_path)
+    n_features = len(vectorizer.vocabulary_)
+
+    if os.path.exists(coef_path):
+        scorer = NativeGLMScorer.load(coef_path)
+        print(f"[정보] GLM 계수 로드 완료: {os.path.basename(coef_path)}")
+    else:
+        print(f"[정보] GLM 계수 파일이 없어 H2O 모델에서 추출합니다: {os.path.basename(coef_path)}")
+        init_h2o()
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"모델 파일을 찾을 수 없습니다: {model_path}")
+        scorer = NativeGLMScorer.from_h2o(_import_h2o().load_model(model_path), n_features)
+        scorer.save(coef_path)
+
+    if scorer.n_features != n_features:
+        raise ValueError(f"GLM 계수({scorer.n_features})와 벡터라이저 특성 수({n_features})가 일치하지 않습니다. 계수 파일을 다시 추출해주세요.")
+    return scorer, vectorizer
+
+def load_compact_resources(model_path, vectorizer_path, artifact_dir=COMPACT_MODEL_DIR):
+    """
+    메모리 맵 압축 아티팩트에서 (NativeGLMScorer, CompactVectorizer)를 로드합니다.
+    아티팩트가 없거나 원본 모델/벡터라이저 파일이 바뀐 경우 원본에서 한 번 다시 생성합니다.
+    """
+    fingerprint = model_fingerprint(model_path, vectorizer_path)
+    meta = read_artifact_meta(artifact_dir)
+    if meta is None or meta.get('source_fingerprint') != fingerprint:
+        print(f"[정보] 압축 모델 아티팩트가 없거나 원본과 달라 새로 생성합니다: {artifact_dir}")
+        scorer, vectorizer = load_native_scorer(model_path, vectorizer_path)
+        export_compact_model(vectorizer, scorer, artifact_dir, fingerprint)
+
+    scorer, vectorizer = load_compact_model(artifact_dir)
+    print(f"[정보] 압축 모델 로드 완료: {os.path.basename(artifact_dir)} (어휘 {len(vectorizer.vocabulary_)}개)")
+    return scorer, vectorizer
+
+# 토큰화에서 제외할 품사 (조사, 어미, 구두점)
+EXCLUDE_POS = frozenset(['Josa', 'Eomi', 'Punctuation'])
+# 묶음 토큰화 구분 토큰: Okt는 공백으로 나뉜 로마자 덩어리를 그대로 하나의 'Alpha' 토큰으로 반환함
+_BATCH_SEPARATOR = "QXHATESEPARATORQX"
+
+def tokenize_tokens(text):
+    """
+    KoNLPy Okt를 사용하여 텍스트를 형태소 토큰 튜플로 변환합니다.
     조사, 어미, 구두점을 제외하고 어간(Stem)을 추출합니다.
     """
     if pd.isna(text) or not isinstance(text, str):
-        return ""
+        return ()
     
-    EXCLUDE_POS = ['Josa', 'Eomi', 'Punctuation']
     try:
         # stem=True 옵션으로 어간 추출
-        tokens = [word for word, pos in okt.pos(text, stem=True) if pos not in EXCLUDE_POS]
-        return " ".join(tokens)
+        with _okt_lock:
+            morphs = _get_okt().pos(text, stem=True)
+        return tuple(word for word, pos in morphs if pos not in EXCLUDE_POS)
     except Exception as e:
-        # 에러 발생 시 빈 문자열 반환 및 로그 출력
+        # 에러 발생 시 빈 결과 반환 및 로그 출력
         print(f"[경고] 토큰화 오류 (텍스트: '{text[:20]}...'): {e}")
-        return ""
+        return ()
 
-def batch_predict(texts, model, vectorizer):
+def tokenize(text):
     """
-    여러 텍스트 리스트를 입력받아 일괄(Batch)로 혐오 확률을 예측합니다.
-    속도 향상을 위해 H2O의 병렬 처리를 활용합니다.
+    KoNLPy Okt를 사용하여 텍스트를 토큰화합니다.
+    조사, 어미, 구두점을 제외하고 어간(Stem)을 추출한 형태소를 공백으로 연결하여 반환합니다.
     """
-    if not texts:
-        return []
+    return " ".join(tokenize_tokens(text))
+
+def _tokenize_batch(texts):
+    """
+    여러 텍스트를 구분 토큰으로 이어 붙여 Okt를 한 번만 호출하고, 결과를 구분 토큰 기준으로 다시 나눕니다.
+    Okt는 공백으로 나뉜 덩어리 단위로 형태소를 분석하므로, 공백으로 둘러싼 구분 토큰은 앞뒤 텍스트의 분석 결과에 영향을 주지 않습니다.
+    JPype 경계를 넘는 호출과 결과 변환이 텍스트 수만큼이 아니라 묶음당 한 번으로 줄어듭니다.
+
+    Returns:
+        list | None: 텍스트별 형태소 토큰 튜플 리스트 (구분 토큰 수가 맞지 않는 등 결과를 나눌 수 없으면 None)
+    """
+    joined = f" {_BATCH_SEPARATOR} ".join(texts)
+    try:
+        with _okt_lock:
+            morphs = _get_okt().pos(joined, stem=True)
+    except Exception:
+        return None
+
+    results = []
+    tokens = []
+    for word, pos in morphs:
+        if word == _BATCH_SEPARATOR:
+            results.append(tuple(tokens))
+            tokens = []
+        elif pos not in EXCLUDE_POS:
+            tokens.append(word)
+    results.append(tuple(tokens))
+    return results if len(results) == len(texts) else None
+
+def tokenize_serial_tokens(texts, batch_size=None):
+    """
+    현재 프로세스의 Okt 인스턴스로 텍스트 리스트를 순차 토큰화하여 텍스트별 형태소 토큰 튜플 리스트를 반환합니다.
+    batch_size(기본값 TOKENIZE_BATCH_SIZE)개씩 묶어 Okt를 한 번에 호출하며, 결과는 tokenize_tokens()를 텍스트마다 호출한 것과 같습니다.
+    묶음 결과를 나눌 수 없거나 구분 토큰이 포함된 텍스트는 텍스트마다 tokenize_tokens()로 처리합니다.
+    """
+    batch_size = TOKENIZE_BATCH_SIZE if batch_size is None else batch_size
+    if batch_size <= 1:
+        return [tokenize_tokens(text) for text in texts]
+
+    results = [()] * len(texts)
+    batch_positions = []
+    for i, text in enumerate(texts):
+        if isinstance(text, str) and _BATCH_SEPARATOR not in text:
+            batch_positions.append(i)
+        else:
+            results[i] = tokenize_tokens(text)
+
+    start = 0
+    while start < len(batch_positions):
+        # 묶음 크기와 문자 수 제한 안에서 묶음 구성
+        end = start
+        n_chars = 0
+        while end < len(batch_positions) and end - start < batch_size:
+            n_chars += len(texts[batch_positions[end]]) + len(_BATCH_SEPARATOR) + 2
+            if end > start and n_chars > TOKENIZE_BATCH_MAX_CHARS:
+                break
+            end += 1
+
+        positions = batch_positions[start:end]
+        batch = [texts[i] for i in positions]
+        tokenized = _tokenize_batch(batch) if len(batch) > 1 else None
+        if tokenized is None:
+            tokenized = [tokenize_tokens(text) for text in batch]
+        for i, tokens in zip(positions, tokenized):
+            results[i] = tokens
+        start = end
+
+    return results
+
+def tokenize_serial(texts, batch_size=None):
+    """현재 프로세스의 Okt 인스턴스로 텍스트 리스트를 순차 토큰화합니다. (형태소를 공백으로 연결한 문자열 리스트)"""
+    return [" ".join(tokens) for tokens in tokenize_serial_tokens(texts, batch_size)]
+
+_token_cache = None
+_token_cache_lock = threading.Lock()
+
+def get_token_cache():
+    """프로세스 전역 토큰화 캐시를 반환합니다. (캐시를 사용하지 않으면 None)"""
+    global _token_cache
+    if TOKEN_CACHE_SIZE <= 0:
+        return None
+    with _token_cache_lock:
+        if _token_cache is None:
+            _token_cache = TokenCache(TOKEN_CACHE_SIZE, TOKEN_CACHE_PATH if TOKEN_CACHE_DISK else None)
+        return _token_cache
+
+def set_tokenizer_workers(workers):
+    """
+    기본 토큰화 워커 프로세스 수(TOKENIZER_WORKERS)를 변경하고 이전 값을 반환합니다.
+    일괄 처리처럼 여러 스레드가 동시에 토큰화하는 경우, 공유 Okt(_okt_lock)에서 직렬화되지 않도록 워커 풀을 켤 때 사용합니다.
+    """
+    global TOKENIZER_WORKERS
+    previous, TOKENIZER_WORKERS = TOKENIZER_WORKERS, max(0, int(workers))
+    return previous
+
+def _tokenize_uncached(texts, workers=None):
+    workers = TOKENIZER_WORKERS if workers is None else workers
+    if workers > 1 and len(texts) >= TOKENIZER_POOL_MIN_TEXTS:
+        try:
+            return get_tokenizer_pool(workers).map(texts)
+        except Exception as e:
+            print(f"[경고] 토큰화 워커 풀 오류, 순차 처리로 전환합니다: {e}")
+    return tokenize_serial_tokens(texts)
+
+def tokenize_texts(texts, workers=None, as_tokens=False):
+    """
+    텍스트 리스트를 토큰화합니다. 결과 순서는 입력과 같습니다.
+    
+    텍스트는 정규화(공백 정리) 후 해시 키로 토큰화 캐시를 먼저 조회하며,
+    배치 내 중복 텍스트와 캐시에 없는 텍스트만 실제로 형태소 분석합니다.
+    워커 수가 2 이상이고 텍스트가 충분히 많으면 토큰화 워커 풀(프로세스별 Okt)에서 병렬로 처리합니다.
     
-    # 1. 일괄 토큰화 (가장 시간이 많이 소요되는 작업)
-    print(f"[진행] {len(texts)}개 텍스트 항목 토큰화 중...")
-    tokenized_texts = [tokenize(text) for text in texts]
+    Args:
+        texts (list): 토큰화할 텍스트 리스트
+        workers (int): 워커 프로세스 수 (기본값 TOKENIZER_WORKERS)
+        as_tokens (bool): True이면 형태소 토큰 튜플 리스트를, False이면 공백으로 연결한 문자열 리스트를 반환
+    """
+    normalized = [normalize_text(text) for text in texts]
+    cache = get_token_cache()
+    if cache is None:
+        unique_texts = list(dict.fromkeys(normalized))
+        token_map = dict(zip(unique_texts, _tokenize_uncached(unique_texts, workers)))
+        results = [token_map[text] for text in normalized]
+    else:
+        # 배치 내 중복 제거 (키 -> 정규화 텍스트)
+        key_to_text = {}
+        keys = []
+        for text in normalized:
+            key = text_hash(text)
+            keys.append(key)
+            key_to_text.setdefault(key, text)
+
+        token_map = cache.get_many(list(key_to_text))
+        missing_keys = [key for key in key_to_text if key not in token_map]
+        if missing_keys:
+            tokenized = _tokenize_uncached([key_to_text[key] for key in missing_keys], workers)
+            new_items = list(zip(missing_keys, tokenized))
+            cache.put_many(new_items)
+            token_map.update(new_items)
+        results = [token_map[key] for key in keys]
+
+    if as_tokens:
+        return results
+    return [" ".join(tokens) for tokens in results]
+
+def vectorize_tokens(tokenized_texts, vectorizer):
+    """
+    형태소 토큰 튜플 리스트를 TF-IDF 희소 행렬로 변환합니다.
+    결합 특성 추출(FUSED_FEATURES)을 사용하면 토큰에서 어휘 인덱스로 바로 변환하고(fused_features),
+    사용하지 않거나 지원하지 않는 벡터라이저 설정이면 공백으로 연결한 문자열을 vectorizer.transform으로 변환합니다. (두 결과는 같음)
+    """
+    extractor = get_feature_extractor(vectorizer) if FUSED_FEATURES else None
+    if extractor is not None:
+        return extractor.transform(tokenized_texts)
+    return vectorizer.transform([tokens if isinstance(tokens, str) else " ".join(tokens) for tokens in tokenized_texts])
+
+def _predict_chunk(texts, model, vectorizer):
+    """
+    하나의 청크(텍스트 리스트)에 대해 토큰화 -> 벡터화 -> 예측을 수행합니다.
+    """
+    # 원문 입력 모델 변형(문자 n-gram, 해싱)은 Okt 토큰화 없이 원문에서 바로 특성 추출
+    if getattr(vectorizer, 'input_kind', 'tokens') == 'text':
+        try:
+            return _predict_matrix(vectorizer.transform(texts), model)
+        except Exception as e:
+            print(f"[오류] 벡터화 변환 실패: {e}")
+            return [0.0] * len(texts)
+
+    # 1. 일괄 토큰화 (가장 시간이 많이 소요되는 작업, 워커 풀 사용 시 병렬 처리)
+    tokenized_texts = tokenize_texts(texts, as_tokens=True)
     
     # 2. 벡터화 (Sparse Matrix 생성)
-    # 데이터가 매우 클 경우 메모리 이슈가 있을 수 있으나, 일반적인 CSV 규모에서는 문제없음
     try:
-        X_vec = vectorizer.transform(tokenized_texts)
+        X_vec = vectorize_tokens(tokenized_texts, vectorizer)
     except Exception as e:
         print(f"[오류] 벡터화 변환 실패: {e}")
         return [0.0] * len(texts)
+
+    # 3~5. 예측
+    return _predict_matrix(X_vec, model)
+
+def _predict_matrix(X_vec, model):
+    """
+    TF-IDF 희소 행렬(X_vec)의 행별 혐오 확률 리스트를 반환합니다.
+    """
+    # Native 엔진: sigmoid(X @ beta + b)를 희소 행렬 그대로 계산 (JVM 불필요)
+    if isinstance(model, NativeGLMScorer):
+        return model.predict_proba(X_vec).tolist()
         
     # 3. H2OFrame 변환 준비
     # feature_names는 학습 때와 동일해야 함
     feature_names = [f'feature_{i}' for i in range(X_vec.shape[1])]
     
     # Sparse Matrix -> Dense DataFrame -> H2OFrame
-    # (참고: 대용량 처리 시 이 부분에서 메모리 최적화가 필요할 수 있음)
+    # (H2O의 희소 업로드는 SVMLight 파싱 시 첫 열을 응답으로, 열 수를 최대 인덱스로 결정하므로
+    #  학습 때와 같은 열 구성을 보장할 수 없습니다. 대신 청크 단위로만 밀집 변환하여 메모리를 제한합니다.)
+    h2o = _import_h2o()
     X_df = pd.DataFrame(X_vec.toarray(), columns=feature_names)
     hf = h2o.H2OFrame(X_df)
+    del X_df
     
     # 4. H2O 예측 실행
-    print("[진행] H2O 모델 예측 수행 중...")
     predictions = model.predict(hf)
     result = predictions.as_data_frame(use_multi_thread=True)
+
+    # 청크마다 생성된 프레임은 클러스터 메모리에서 즉시 제거
+    for frame in (hf, predictions):
+        try:
+            h2o.remove(frame)
+        except Exception:
+            pass
     
     # 5. 결과 추출 (혐오일 확률)
     # 모델에 따라 확률 컬럼명이 다를 수 있으므로 순차적으로 확인
@@ -142,156 +474,654 @@ def batch_predict(texts, model, vectorizer):
     # 컬럼을 찾지 못한 경우 디버깅 정보를 출력합니다.
     print(f"[오류] 예측 결과에 확률 컬럼('hate' 또는 'p1')이 없습니다.")
     print(f"      발견된 컬럼 목록: {result.columns.tolist()}")
-    return [0.0] * len(texts)
+    return [0.0] * X_vec.shape[0]
 
-def filter_hate_speech(df, model_path=MODEL_PATH, vectorizer_path=VECTORIZER_PATH):
+def _batch_predict_unique(texts, model, vectorizer, chunk_size=None):
     """
-    데이터프레임의 Title, Content, Comments를 검사하여 혐오 표현을 필터링합니다.
-    모든 텍스트를 모아서 배치 처리를 수행하므로 속도가 빠릅니다.
+    중복이 제거된 텍스트 리스트를 청크 단위로 예측하고 청크별 처리량을 출력합니다.
     """
-    # 🌟🌟🌟 수정 지점: h2o.init 옵션을 여기에 직접 전달합니다. 🌟🌟🌟
-    # ip와 start_h2o 옵션을 init_h2o 함수에 전달하여 H2O 클러스터에 연결을 시도합니다.
-    init_h2o()
+    chunk_size = max(1, int(chunk_size or PREDICT_CHUNK_SIZE))
+    n_chunks = (len(texts) + chunk_size - 1) // chunk_size
+    engine_name = "Native GLM" if isinstance(model, NativeGLMScorer) else "H2O"
+    print(f"[진행] {len(texts)}개 텍스트 항목 {engine_name} 예측 중... (청크 {n_chunks}개, 청크 크기 {chunk_size})")
+
+    hate_probs = []
+    for chunk_idx, start in enumerate(range(0, len(texts), chunk_size), start=1):
+        chunk = texts[start:start + chunk_size]
+        chunk_start = time.perf_counter()
+        hate_probs.extend(_predict_chunk(chunk, model, vectorizer))
+        elapsed = time.perf_counter() - chunk_start
+        rate = len(chunk) / elapsed if elapsed > 0 else float('inf')
+        print(f"      청크 {chunk_idx}/{n_chunks}: {len(chunk)}개, {elapsed:.2f}초 ({rate:.1f} rows/sec)")
+
+    cache = get_token_cache()
+    if cache is not None and getattr(vectorizer, 'input_kind', 'tokens') != 'text':
+        stats = cache.stats()
+        print(f"[정보] 토큰화 캐시 적중률 {stats['hit_rate']:.1%} (메모리 {stats['memory_hits']}, 디스크 {stats['disk_hits']}, 미적중 {stats['misses']})")
+
+    return hate_probs
+
+def batch_predict(texts, model, vectorizer, chunk_size=None):
+    """
+    여러 텍스트 리스트를 입력받아 일괄(Batch)로 혐오 확률을 예측합니다.
+    속도 향상을 위해 H2O의 병렬 처리를 활용합니다.
+    model이 NativeGLMScorer인 경우 H2O 없이 희소 행렬에서 바로 확률을 계산합니다.
     
-    model, vectorizer = load_resources(model_path, vectorizer_path)
+    입력은 chunk_size 단위로 나누어 처리하므로, 입력 크기와 무관하게
+    한 번에 메모리에 올라가는 토큰/특성 행렬은 청크 하나 분량으로 제한됩니다.
     
-    # 1. 모든 텍스트 수집 및 인덱싱
-    all_texts_to_predict = []
-    text_map = [] # (행 인덱스, 항목 타입, 댓글 인덱스)
-
-    for index, row in df.iterrows():
-        # 제목 (Title)
-        all_texts_to_predict.append(row.get('Title', ''))
-        text_map.append((index, 'Title', None))
-
-        # 본문 (Content)
-        all_texts_to_predict.append(row.get('Content', ''))
-        text_map.append((index, 'Content', None))
-
-        # 댓글 (Comments) - ' ||| '로 구분됨
-        comments_str = row.get('Comments', '')
-        if pd.notna(comments_str) and comments_str:
-            comment_list = comments_str.split(' ||| ')
-            for c_idx, comment in enumerate(comment_list):
-                comment = comment.strip()
-                # 빈 댓글이나 http 링크는 예측에서 제외 (속도 최적화)
-                if comment and not comment.lower().startswith('http'):
-                    all_texts_to_predict.append(comment)
-                    text_map.append((index, 'Comment', c_idx))
+    Args:
+        texts (list): 예측할 텍스트 리스트
+        model: H2O 모델 또는 NativeGLMScorer
+        vectorizer: TF-IDF 벡터라이저
+        chunk_size (int): 청크 크기 (기본값 PREDICT_CHUNK_SIZE)
+    """
+    if not texts:
+        return []
+
+    # 정규화 기준으로 중복 텍스트를 하나로 합쳐서 예측한 뒤 원래 순서로 펼침
+    normalized = [normalize_text(text) for text in texts]
+    unique_texts = list(dict.fromkeys(normalized))
+    if len(unique_texts) < len(texts):
+        print(f"[정보] 중복 텍스트 {len(texts) - len(unique_texts)}개를 제외하고 {len(unique_texts)}개만 예측합니다.")
+    prob_map = dict(zip(unique_texts, _batch_predict_unique(unique_texts, model, vectorizer, chunk_size)))
+    return [prob_map[text] for text in normalized]
+
+class HateModelSession:
+    """
+    프로세스 단위로 유지되는 혐오 분류 모델 세션입니다.
     
-    if not all_texts_to_predict:
-        print("[정보] 분석할 텍스트가 없습니다.")
-        return df
-        
-    # 2. 배치 예측 실행
-    print(f"[시작] 총 {len(all_texts_to_predict)}개 항목에 대한 배치 분석 시작...")
-    # 수정된 batch_predict 호출 ('hate' 또는 'p1' 컬럼 값 자동 감지)
-    hate_probs = batch_predict(all_texts_to_predict, model, vectorizer)
-    print("[완료] 배치 예측 완료.")
+    H2O 클러스터 연결과 모델/벡터라이저를 최초 1회만 로드하여 보관하고,
+    이후 호출에서는 바로 예측만 수행합니다. 여러 스레드(Streamlit 세션)에서 동시에 사용해도
+    안전하도록 로드/재연결 과정을 잠금으로 보호하며, 클러스터가 종료된 경우 자동으로 재연결합니다.
+    클러스터 종료는 프로세스 종료 시(atexit)에만 수행됩니다.
+    engine='native'이면 H2O 대신 NativeGLMScorer를 사용하므로 JVM을 띄우지 않습니다.
+    engine='compact'이면 같은 계산을 메모리 맵 압축 아티팩트(model_artifact)로 수행합니다.
+    engine='registry'이면 model_path의 레지스트리 버전 폴더에서 학습된 모델 변형(model_registry)을 로드합니다.
+    """
+    def __init__(self, model_path=MODEL_PATH, vectorizer_path=VECTORIZER_PATH, max_mem_size="4G", engine=None):
+        self.model_path = model_path
+        self.vectorizer_path = vectorizer_path
+        self.max_mem_size = max_mem_size
+        self.engine = (engine or SCORING_ENGINE).lower()
+        self._model = None
+        self._vectorizer = None
+        self._cascade = None
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _cluster_alive():
+        # h2o를 한 번도 임포트하지 않았다면 이 프로세스에 연결된 클러스터도 없음
+        h2o = sys.modules.get('h2o')
+        if h2o is None:
+            return False
+        try:
+            cluster = h2o.cluster()
+            return cluster is not None and cluster.is_running()
+        except Exception:
+            return False
 
-    # 3. 예측 결과를 구조화
-    # 인덱스별로 결과를 그룹화하여 쉽게 조회할 수 있게 만듭니다.
-    prediction_results = list(zip(text_map, hate_probs))
+    def get(self):
+        """
+        로드된 (모델, 벡터라이저)를 반환합니다. 필요한 경우에만 초기화/재연결합니다.
+        """
+        with self._lock:
+            if self.engine == 'native':
+                if self._model is None:
+                    self._model, self._vectorizer = load_native_scorer(self.model_path, self.vectorizer_path)
+                return self._model, self._vectorizer
+
+            if self.engine == 'compact':
+                if self._model is None:
+                    self._model, self._vectorizer = load_compact_resources(self.model_path, self.vectorizer_path)
+                return self._model, self._vectorizer
+
+            if self.engine == 'registry':
+                if self._model is None:
+                    self._model, self._vectorizer = load_registry_model(self.model_path)
+                return self._model, self._vectorizer
+
+            if self._model is not None and self._cluster_alive():
+                return self._model, self._vectorizer
+
+            if self._model is not None:
+                print("[경고] H2O 클러스터 연결이 끊어졌습니다. 재연결 후 모델을 다시 로드합니다.")
+
+            init_h2o(self.max_mem_size)
+            if self._vectorizer is None:
+                self._model, self._vectorizer = load_resources(self.model_path, self.vectorizer_path)
+            else:
+                # 벡터라이저는 JVM과 무관하므로 재사용하고 모델만 다시 로드
+                self._model = _import_h2o().load_model(self.model_path)
+                print(f"[정보] 모델 재로드 완료: {os.path.basename(self.model_path)}")
+            return self._model, self._vectorizer
+
+    def get_cascade(self, threshold=None):
+        """
+        점수 상한 계산용 HateCascade를 반환합니다. (최초 호출 시 GLM 계수로 생성)
+        H2O 엔진에서는 추출된 계수 파일을 사용하고, 없으면 로드된 H2O 모델에서 계수를 추출합니다.
+        원문 입력 모델 변형은 어휘 기반 상한을 계산할 수 없으므로 None을 반환합니다.
+        """
+        threshold = HATE_THRESHOLD if threshold is None else threshold
+        model, vectorizer = self.get()
+        if getattr(vectorizer, 'input_kind', 'tokens') == 'text':
+            return None
+        with self._lock:
+            if self._cascade is None or self._cascade.threshold != threshold:
+                if isinstance(model, NativeGLMScorer):
+                    scorer = model
+                elif os.path.exists(COEF_PATH):
+                    scorer = NativeGLMScorer.load(COEF_PATH)
+                else:
+                    scorer = NativeGLMScorer.from_h2o(model, len(vectorizer.vocabulary_))
+                self._cascade = HateCascade(vectorizer, scorer.beta, scorer.intercept, threshold)
+                print(f"[정보] 캐스케이드 준비 완료: 양수 계수 어휘 {len(self._cascade.positive_terms)}개")
+            return self._cascade
+
+    @property
+    def fingerprint(self):
+        """모델/벡터라이저 파일 내용 기반 지문 (파일이 바뀌면 값도 바뀜)"""
+        return model_fingerprint(self.model_path, self.vectorizer_path)
+
+    def invalidate(self):
+        """모델 참조를 무효화하여 다음 호출 시 재연결하도록 합니다."""
+        with self._lock:
+            self._model = None
+
+    def predict(self, texts, chunk_size=None):
+        """
+        텍스트 리스트의 혐오 확률을 예측합니다.
+        예측 도중 클러스터 연결 오류가 발생하면 한 번 재연결 후 다시 시도합니다.
+        """
+        model, vectorizer = self.get()
+        try:
+            return batch_predict(texts, model, vectorizer, chunk_size=chunk_size)
+        except Exception as e:
+            print(f"[경고] 예측 중 오류 발생, 재연결 후 재시도합니다: {e}")
+            self.invalidate()
+            model, vectorizer = self.get()
+            return batch_predict(texts, model, vectorizer, chunk_size=chunk_size)
+
+    def shutdown(self):
+        """이 프로세스가 시작한 H2O 클러스터를 종료합니다."""
+        with self._lock:
+            self._model = None
+            h2o = sys.modules.get('h2o')
+            if h2o is None:
+                return
+            try:
+                # 다른 프로세스가 띄운 클러스터에 연결만 한 경우에는 종료하지 않음
+                connection = h2o.connection()
+                if connection is not None and getattr(connection, 'local_server', None) is not None:
+                    if self._cluster_alive():
+                        h2o.cluster().shutdown()
+            except Exception as e:
+                print(f"[경고] H2O 클러스터 종료 중 오류: {e}")
+
+# 경로별 모델 세션 저장소 (프로세스 전역)
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+def get_model_session(model_path=MODEL_PATH, vectorizer_path=VECTORIZER_PATH):
+    """
+    (모델 경로, 벡터라이저 경로)에 해당하는 프로세스 전역 모델 세션을 반환합니다.
+    처음 호출될 때 세션을 생성하며, 실제 로드는 첫 예측 시점에 이루어집니다.
+    기본 경로로 호출했고 MODEL_VARIANT(HATE_MODEL_VARIANT)가 설정되어 있으면 레지스트리의 해당 모델 변형을 사용합니다.
+    """
+    engine = None
+    if MODEL_VARIANT and model_path == MODEL_PATH and vectorizer_path == VECTORIZER_PATH:
+        model_path = resolve_variant(MODEL_VARIANT)
+        vectorizer_path = os.path.join(model_path, REGISTRY_VECTORIZER_FILENAME)
+        engine = 'registry'
+
+    key = (os.path.abspath(model_path), os.path.abspath(vectorizer_path))
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = HateModelSession(model_path, vectorizer_path, engine=engine)
+            _sessions[key] = session
+        return session
+
+@atexit.register
+def _shutdown_sessions():
+    # 프로세스 종료 시에만 H2O 클러스터를 정리
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+    for session in sessions:
+        session.shutdown()
+
+_score_cache = None
+_score_cache_lock = threading.Lock()
+
+def get_score_cache():
+    """프로세스 전역 혐오 점수 캐시를 반환합니다."""
+    global _score_cache
+    with _score_cache_lock:
+        if _score_cache is None:
+            _score_cache = ScoreCache(SCORE_CACHE_PATH)
+        return _score_cache
+
+def score_texts(texts, session, chunk_size=None, use_cache=None, use_cascade=None):
+    """
+    텍스트 리스트의 혐오 확률을 반환합니다.
     
-    # 기본값 설정
-    row_data = {index: {'Title': 0.0, 'Content': 0.0, 'Comments': {}} for index in df.index}
+    점수 캐시를 사용하면 (텍스트 해시, 모델 지문)으로 저장된 점수를 먼저 일괄 조회하고,
+    캐시에 없는 텍스트만 토큰화/예측한 뒤 새 점수를 한 번에 저장합니다.
     
-    for (r_idx, item_type, c_idx), p_score in prediction_results:
-        if item_type == 'Title':
-            row_data[r_idx]['Title'] = p_score
-        elif item_type == 'Content':
-            row_data[r_idx]['Content'] = p_score
-        elif item_type == 'Comment':
-            row_data[r_idx]['Comments'][c_idx] = p_score
-
-    # 4. 필터링 로직 적용
-    filtered_rows = []
-    dropped_rows = []
+    Args:
+        texts (list): 예측할 텍스트 리스트
+        session (HateModelSession): 예측에 사용할 모델 세션
+        chunk_size (int): 예측 청크 크기
+        use_cache (bool): 점수 캐시 사용 여부 (기본값 SCORE_CACHE_ENABLED)
+        use_cascade (bool): 캐스케이드(점수 상한 기반 예측 생략) 사용 여부 (기본값 CASCADE_ENABLED)
+            생략된 텍스트의 점수는 실제 점수 대신 보수적인 상한값으로 반환됩니다.
+    """
+    use_cache = SCORE_CACHE_ENABLED if use_cache is None else use_cache
+    use_cascade = CASCADE_ENABLED if use_cascade is None else use_cascade
+    if not texts:
+        return []
+
+    cache = None
+    fingerprint = None
+    if use_cache:
+        try:
+            cache = get_score_cache()
+            fingerprint = session.fingerprint
+        except Exception as e:
+            print(f"[경고] 점수 캐시를 사용할 수 없어 전체 예측을 수행합니다: {e}")
+            cache = None
+
+    keys = [text_hash(normalize_text(text)) for text in texts]
+    score_map = cache.get_many(dict.fromkeys(keys), fingerprint) if cache is not None else {}
+
+    # 캐시에 없는 텍스트만 (중복 없이) 예측
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in score_map and key not in missing:
+            missing[key] = text
+    if cache is not None:
+        print(f"[정보] 점수 캐시: {len(texts)}개 중 {len(texts) - sum(1 for k in keys if k in missing)}개 적중, {len(missing)}개 예측 필요")
+
+    if missing:
+        missing_keys = list(missing.keys())
+        missing_texts = list(missing.values())
+        bound_map = {}
+
+        # 1단계: 점수 상한이 임계값에 못 미치는 텍스트는 전체 예측을 생략
+        # (원문 입력 모델 변형은 상한을 계산할 수 없어 get_cascade()가 None)
+        cascade = None
+        if use_cascade:
+            try:
+                cascade = session.get_cascade()
+            except Exception as e:
+                print(f"[경고] 캐스케이드 준비 실패, 전체 예측을 수행합니다: {e}")
+        if cascade is not None:
+            try:
+                needs_full, bounds = cascade.split(tokenize_texts(missing_texts, as_tokens=True))
+                for key, bound, full in zip(missing_keys, bounds, needs_full):
+                    if not full:
+                        bound_map[key] = float(bound)
+                skipped = len(bound_map)
+                print(f"[정보] 캐스케이드: {len(missing_keys)}개 중 {skipped}개({skipped / len(missing_keys):.1%})는 상한이 임계값 미만이라 예측 생략")
+                missing_keys = [key for key in missing_keys if key not in bound_map]
+                missing_texts = [missing[key] for key in missing_keys]
+            except Exception as e:
+                print(f"[경고] 캐스케이드 적용 실패, 전체 예측을 수행합니다: {e}")
+
+        # 2단계: 나머지 텍스트만 전체 예측 후 점수 캐시에 저장
+        # (생략된 텍스트는 실제 점수가 아닌 상한이므로 캐시에 저장하지 않음)
+        if missing_texts:
+            new_scores = session.predict(missing_texts, chunk_size=chunk_size)
+            new_items = list(zip(missing_keys, new_scores))
+            if cache is not None:
+                cache.put_many(new_items, fingerprint)
+            score_map.update(new_items)
+
+        # 생략된 텍스트에는 보수적인 점수(상한)를 부여
+        score_map.update(bound_map)
+
+    return [score_map[key] for key in keys]
+
+def score_via_server_or_local(texts, session, chunk_size=None, use_cache=None, scoring_url=None):
+    """
+    점수 서버 주소(scoring_url, 기본값 HATE_SCORING_URL)가 설정되어 있으면 로컬 점수 서버에 예측을 요청하고,
+    설정되어 있지 않거나 서버 요청이 실패하면 이 프로세스의 모델 세션으로 직접 예측합니다.
+    """
+    url = SCORING_URL if scoring_url is None else scoring_url
+    if url:
+        try:
+            return ScoringClient(url).score(texts)
+        except Exception as e:
+            print(f"[경고] 점수 서버({url}) 요청 실패, 로컬 모델로 예측합니다: {e}")
+    return score_texts(texts, session, chunk_size=chunk_size, use_cache=use_cache)
+
+def save_dropped_log(dropped_rows, prefix='dropped_hate_speech', stage='filter', store=None, log_dir=None):
+    """
+    필터링으로 제거된 항목들을 감사 로그로 저장합니다.
     
-    for index, row in df.iterrows():
-        original_row = row.copy()
-        current_data = row_data[index]
+    기본(AUDIT_FORMAT='parquet')은 날짜별로 파티션된 Parquet 감사 로그 저장소(audit_store)의
+    기록 대기열에 넣고 바로 반환하며, 파일 기록은 백그라운드 스레드가 수행합니다.
+    AUDIT_FORMAT='csv'이거나 pyarrow를 사용할 수 없으면 기존처럼 logs 폴더에 CSV 파일로 저장합니다.
+    
+    Args:
+        dropped_rows (list): {'reason', 'p_hate', 'data'} 형태의 딕셔너리 리스트
+        prefix (str): CSV 로그 파일명 접두사
+        stage (str): 제거 단계 ('filter' | 'prescreen')
+        store (AuditStore): 기록할 감사 로그 저장소 (기본값: 프로세스 전역 저장소)
+        log_dir (str): CSV 로그 저장 폴더 (기본값: src/logs)
         
-        # 4.1. 제목 및 본문 혐오 체크 (발견 시 행 전체 삭제)
-        if current_data['Title'] >= HATE_THRESHOLD:
-            dropped_rows.append({'reason': 'Title Hate', 'p_hate': current_data['Title'], 'data': original_row.to_dict()})
-            continue
-            
-        if current_data['Content'] >= HATE_THRESHOLD:
-            dropped_rows.append({'reason': 'Content Hate', 'p_hate': current_data['Content'], 'data': original_row.to_dict()})
-            continue
+    Returns:
+        str | None: 감사 로그 저장소 경로 또는 CSV 파일 경로 (저장할 항목이 없으면 None)
+    """
+    if not dropped_rows:
+        return None
+
+    if AUDIT_FORMAT == 'parquet':
+        try:
+            store = store or get_audit_store()
+            store.append(dropped_rows, stage)
+            print(f"[결과] {len(dropped_rows)}개의 혐오 콘텐츠가 필터링되었습니다.")
+            print(f"      감사 로그: {store.root} (백그라운드 기록)")
+            return store.root
+        except ImportError as e:
+            print(f"[경고] Parquet 감사 로그를 사용할 수 없어 CSV로 저장합니다: {e}")
 
-        # 4.2. 댓글 필터링 (혐오 댓글만 제거하고 행은 유지)
-        comments_str = row.get('Comments', '')
+    log_dir = log_dir or os.path.join(BASE_DIR, 'logs')
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
         
-        if pd.notna(comments_str) and comments_str:
-            comment_list = comments_str.split(' ||| ')
-            clean_comments_list = []
-            
-            # 예측 결과 맵
-            comment_predictions = current_data['Comments']
-
-            for c_idx, comment in enumerate(comment_list):
-                comment = comment.strip()
-                if not comment: continue
-
-                # 링크 필터링 (예측 건너뛴 항목)
-                if comment.lower().startswith('http'):
-                    continue
-
-                # 혐오 점수 확인 (예측을 수행하지 않은 항목은 0.0)
-                p_score = comment_predictions.get(c_idx, 0.0)
-                
-                if p_score >= HATE_THRESHOLD:
-                    # 혐오 댓글 기록
-                    dropped_rows.append({
-                        'reason': 'Comment Hate', 
-                        'p_hate': p_score, 
-                        'data': {'PostID': row.get('PostID'), 'Comment': comment}
-                    })
-                else:
-                    # 정상 댓글 유지
-                    clean_comments_list.append(comment)
-            
-            # 정제된 댓글로 업데이트
-            row['Comments'] = " ||| ".join(clean_comments_list)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    log_file = os.path.join(log_dir, f'{prefix}_{timestamp}.csv')
+    
+    log_df = pd.DataFrame([
+        {'Reason': item['reason'], 'PHate': item['p_hate'], **item['data']} 
+        for item in dropped_rows
+    ])
+    
+    # [수정] 오직 로그 파일(사람 확인용)에 대해서만 줄바꿈 제거 적용
+    # Title, Content, Comments, Comment 등 텍스트 컬럼이 존재하면 공백으로 치환
+    if not log_df.empty:
+        for col in ['Title', 'Content', 'Comments', 'Comment']: 
+            if col in log_df.columns:
+                log_df[col] = log_df[col].apply(lambda x: x.replace('\n', ' ') if isinstance(x, str) else x)
+
+    log_df.to_csv(log_file, index=False, encoding='utf-8-sig')
+    print(f"[결과] {len(dropped_rows)}개의 혐오 콘텐츠가 필터링되었습니다.")
+    print(f"      상세 로그: {log_file}")
+    return log_file
+
+class TitlePrescreen:
+    """
+    목록 페이지 단계에서 제목만으로 혐오 게시물을 미리 걸러내는 사전 필터입니다.
+    
+    filter_hate_speech는 제목 점수가 HATE_THRESHOLD 이상이면 행 전체를 삭제하므로,
+    같은 기준으로 제목을 먼저 검사하면 어차피 삭제될 게시물의 본문/댓글 요청을 생략할 수 있습니다.
+    크롤러에 `title_prescreen` 인자로 전달하며, 목록 페이지 단위로 제목을 한 번에 배치 예측합니다.
+    제거된 항목은 내부에 누적되었다가 flush_log() 호출 시 감사 로그로 저장됩니다.
+    """
+    def __init__(self, model_path=MODEL_PATH, vectorizer_path=VECTORIZER_PATH, threshold=None):
+        self.session = get_model_session(model_path, vectorizer_path)
+        self.threshold = HATE_THRESHOLD if threshold is None else threshold
+        self._lock = threading.Lock()
+        self.dropped_rows = []
+        self.screened_count = 0
+
+    def __call__(self, candidates):
+        """
+        목록 페이지에서 수집한 게시물 후보 중 제목이 혐오로 판단되지 않은 항목만 반환합니다.
         
-        filtered_rows.append(row)
+        Args:
+            candidates (list): 'Title'을 포함한 게시물 후보 딕셔너리 리스트
+                               (Site, PostID, Title, GalleryID, PostURL)
         
-    # 5. 결과 저장 및 로그 출력
-    filtered_df = pd.DataFrame(filtered_rows)
+        Returns:
+            list: 본문을 요청할 게시물 후보 리스트 (입력 순서 유지)
+        """
+        if not candidates:
+            return candidates
+
+        try:
+            hate_probs = score_via_server_or_local([c.get('Title', '') for c in candidates], self.session)
+        except Exception as e:
+            # 사전 필터 실패 시 크롤링은 계속 진행 (최종 필터링은 filter_hate_speech가 담당)
+            print(f"[경고] 제목 사전 필터 실패, 전체 게시물을 수집합니다: {e}")
+            return candidates
+
+        kept = []
+        with self._lock:
+            self.screened_count += len(candidates)
+            for candidate, p_score in zip(candidates, hate_probs):
+                if p_score >= self.threshold:
+                    self.dropped_rows.append({'reason': 'Title Hate', 'p_hate': p_score, 'data': dict(candidate)})
+                else:
+                    kept.append(candidate)
+
+        if len(kept) < len(candidates):
+            print(f"[정보] 제목 사전 필터: {len(candidates)}개 중 {len(candidates) - len(kept)}개 게시물 요청 생략")
+        return kept
+
+    def flush_log(self):
+        """누적된 사전 필터 제거 항목을 감사 로그로 저장하고 비웁니다."""
+        with self._lock:
+            dropped_rows, self.dropped_rows = self.dropped_rows, []
+        return save_dropped_log(dropped_rows, prefix='prescreen_dropped_hate_speech', stage='prescreen')
+
+def _text_column(df, column):
+    """컬럼이 없으면 빈 문자열로 채운 Series를 반환합니다. (row.get(column, '')과 동일)"""
+    if column in df.columns:
+        return df[column]
+    return pd.Series('', index=df.index, dtype=object)
+
+def _explode_comments(comments):
+    """
+    ' ||| '로 구분된 댓글 컬럼을 (행 위치, 댓글 인덱스, 댓글) 형태의 긴 프레임으로 펼칩니다.
+    댓글이 비어 있거나 결측인 행은 포함되지 않으며, 댓글 앞뒤 공백은 제거됩니다.
+    """
+    has_comments = (comments.notna() & (comments != '')).to_numpy()
+    positions = np.flatnonzero(has_comments)
+    if len(positions) == 0:
+        return has_comments, pd.DataFrame({'pos': pd.Series(dtype=np.int64), 'c_idx': pd.Series(dtype=np.int64), 'comment': pd.Series(dtype=object)})
+
+    split = pd.Series(comments.iloc[positions].to_numpy(), index=positions).str.split(' ||| ', regex=False).explode()
+    long_df = pd.DataFrame({'pos': split.index.to_numpy(dtype=np.int64), 'comment': split.to_numpy(dtype=object)})
+    long_df['c_idx'] = long_df.groupby('pos').cumcount()
+    long_df['comment'] = long_df['comment'].str.strip()
+    return has_comments, long_df
+
+def _collect_filter_texts(df):
+    """
+    필터링할 텍스트를 모읍니다.
+
+    Returns:
+        tuple: (parts, texts)
+            parts: _apply_hate_filter에 전달할 중간 결과 (Comments 컬럼, 댓글 보유 마스크, 펼친 댓글 프레임, 예측 대상 댓글 마스크)
+            texts: 예측할 텍스트 리스트 (제목, 본문, 예측 대상 댓글 순)
+    """
+    titles = _text_column(df, 'Title')
+    contents = _text_column(df, 'Content')
+    comments = _text_column(df, 'Comments')
+    has_comments, long_df = _explode_comments(comments)
+
+    # 빈 댓글이나 http 링크는 예측에서 제외 (속도 최적화)
+    scoreable = ((long_df['comment'] != '') & ~long_df['comment'].str.lower().str.startswith('http')).to_numpy(dtype=bool)
+    comment_texts = long_df['comment'].to_numpy(dtype=object)[scoreable]
+
+    texts = titles.tolist() + contents.tolist() + comment_texts.tolist()
+    return (comments, has_comments, long_df, scoreable), texts
+
+def _apply_hate_filter(df, parts, hate_probs):
+    """
+    _collect_filter_texts가 모은 텍스트의 혐오 확률(hate_probs)로 행/댓글을 제거합니다.
+
+    Returns:
+        tuple: (필터링된 DataFrame, 감사 로그 항목 리스트)
+    """
+    comments, has_comments, long_df, scoreable = parts
+    hate_probs = np.asarray(hate_probs, dtype=np.float64)
+    n_rows = len(df)
+
+    title_probs = hate_probs[:n_rows]
+    content_probs = hate_probs[n_rows:2 * n_rows]
+    comment_probs = np.zeros(len(long_df), dtype=np.float64)
+    comment_probs[scoreable] = hate_probs[2 * n_rows:]
+
+    # 3. 필터링 로직 적용 (배열 마스크)
+    # 3.1. 제목 및 본문 혐오 체크 (발견 시 행 전체 삭제, 제목이 우선)
+    title_hate = title_probs >= HATE_THRESHOLD
+    content_hate = ~title_hate & (content_probs >= HATE_THRESHOLD)
+    row_dropped = title_hate | content_hate
+
+    # 3.2. 댓글 필터링 (삭제되지 않은 행에서 혐오 댓글만 제거)
+    comment_pos = long_df['pos'].to_numpy(dtype=np.int64)
+    alive = ~row_dropped[comment_pos] if len(comment_pos) else np.zeros(0, dtype=bool)
+    comment_hate = alive & scoreable & (comment_probs >= HATE_THRESHOLD)
+    comment_kept = alive & scoreable & ~comment_hate
+
+    # 정상 댓글을 행별로 다시 연결 (댓글이 있던 행에서 남은 댓글이 없으면 빈 문자열)
+    rebuilt = long_df.loc[comment_kept].groupby('pos', sort=False)['comment'].agg(" ||| ".join)
+    new_comments = comments.to_numpy(dtype=object, copy=True)
+    rebuild_positions = np.flatnonzero(has_comments & ~row_dropped)
+    new_comments[rebuild_positions] = rebuilt.reindex(rebuild_positions, fill_value='').to_numpy(dtype=object)
+
+    filtered_df = df.copy()
+    if 'Comments' in filtered_df.columns:
+        filtered_df['Comments'] = new_comments
+    filtered_df = filtered_df.iloc[np.flatnonzero(~row_dropped)]
+
+    # 4. 감사 로그 구성 (기존과 같은 순서: 행 순서대로, 행 삭제 항목 다음에 해당 행의 댓글 삭제 항목)
+    drop_events = []
+    drop_positions = np.flatnonzero(row_dropped)
+    for pos, record in zip(drop_positions, df.iloc[drop_positions].to_dict('records')):
+        if title_hate[pos]:
+            item = {'reason': 'Title Hate', 'p_hate': float(title_probs[pos]), 'data': record}
+        else:
+            item = {'reason': 'Content Hate', 'p_hate': float(content_probs[pos]), 'data': record}
+        drop_events.append(((pos, -1), item))
+
+    hate_idx = np.flatnonzero(comment_hate)
+    if len(hate_idx):
+        post_ids = df['PostID'].to_numpy(dtype=object) if 'PostID' in df.columns else np.full(n_rows, None, dtype=object)
+        hate_comments = long_df['comment'].to_numpy(dtype=object)[hate_idx]
+        hate_c_idx = long_df['c_idx'].to_numpy(dtype=np.int64)[hate_idx]
+        for i, comment, c_idx in zip(hate_idx, hate_comments, hate_c_idx):
+            pos = comment_pos[i]
+            drop_events.append(((pos, c_idx), {
+                'reason': 'Comment Hate',
+                'p_hate': float(comment_probs[i]),
+                'data': {'PostID': post_ids[pos], 'Comment': comment}
+            }))
+
+    drop_events.sort(key=lambda event: event[0])
+    dropped_rows = [item for _, item in drop_events]
+    return filtered_df, dropped_rows
+
+def filter_hate_speech(df, model_path=MODEL_PATH, vectorizer_path=VECTORIZER_PATH, chunk_size=None, use_score_cache=None, scoring_url=None):
+    """
+    데이터프레임의 Title, Content, Comments를 검사하여 혐오 표현을 필터링합니다.
+    모든 텍스트를 모아서 배치 처리를 수행하므로 속도가 빠릅니다.
+    모델은 프로세스 전역 세션(get_model_session)에서 재사용되므로 호출마다 H2O를 초기화하지 않습니다.
+    chunk_size를 지정하면 예측을 해당 크기의 청크 단위로 나누어 메모리 사용량을 제한합니다.
+    이전에 계산된 점수는 로컬 점수 캐시(use_score_cache)에서 재사용합니다.
+    scoring_url(기본값 HATE_SCORING_URL)이 설정되어 있으면 모델을 직접 로드하지 않고 로컬 점수 서버(scoring_server)에 예측을 요청합니다.
     
-    # 제거된 항목 로그 저장
-    if dropped_rows:
-        log_dir = os.path.join(BASE_DIR, 'logs')
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
-            
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        log_file = os.path.join(log_dir, f'dropped_hate_speech_{timestamp}.csv')
-        
-        log_df = pd.DataFrame([
-            {'Reason': item['reason'], 'PHate': item['p_hate'], **item['data']} 
-            for item in dropped_rows
-        ])
+    행 단위 반복(iterrows) 없이 컬럼 단위로 처리합니다.
+    댓글은 (행 위치, 댓글 인덱스) 기준의 긴 프레임으로 펼쳐 한 번에 예측하고,
+    임계값 비교는 배열 마스크로, 정상 댓글 재조립은 groupby 집계로 수행합니다.
+    """
+    session = get_model_session(model_path, vectorizer_path)
+    
+    # 1. 모든 텍스트 수집 (제목, 본문, 펼친 댓글)
+    parts, all_texts_to_predict = _collect_filter_texts(df)
+    if not all_texts_to_predict:
+        print("[정보] 분석할 텍스트가 없습니다.")
+        return df
         
-        # [수정] 오직 로그 파일(사람 확인용)에 대해서만 줄바꿈 제거 적용
-        # Title, Content, Comments, Comment 등 텍스트 컬럼이 존재하면 공백으로 치환
-        if not log_df.empty:
-            for col in ['Title', 'Content', 'Comments', 'Comment']: 
-                if col in log_df.columns:
-                    log_df[col] = log_df[col].apply(lambda x: x.replace('\n', ' ') if isinstance(x, str) else x)
-
-        log_df.to_csv(log_file, index=False, encoding='utf-8-sig')
-        print(f"[결과] {len(dropped_rows)}개의 혐오 콘텐츠가 필터링되었습니다.")
-        print(f"      상세 로그: {log_file}")
+    # 2. 배치 예측 실행
+    print(f"[시작] 총 {len(all_texts_to_predict)}개 항목에 대한 배치 분석 시작...")
+    hate_probs = score_via_server_or_local(all_texts_to_predict, session, chunk_size=chunk_size, use_cache=use_score_cache, scoring_url=scoring_url)
+    print("[완료] 배치 예측 완료.")
+
+    # 3~4. 필터링 및 감사 로그 구성
+    filtered_df, dropped_rows = _apply_hate_filter(df, parts, hate_probs)
         
-    # H2O 리소스 정리
-    if h2o.cluster().get_status() == "running":
-        h2o.cluster().shutdown()
+    # 5. 제거된 항목 로그 저장
+    save_dropped_log(dropped_rows)
         
     return filtered_df
 
+def filter_hate_speech_lazy(df, limit, include_comments=False, model_path=MODEL_PATH, vectorizer_path=VECTORIZER_PATH,
+                            min_window=None, use_score_cache=None, scoring_url=None):
+    """
+    순위 순서(행 순서)대로 제목/본문만 검사하여 정상 행이 limit개 모이면 멈추는 지연 필터링입니다.
+    보고서처럼 상위 N건만 사용하는 경우, 전체 행과 모든 댓글을 예측하는 filter_hate_speech보다 예측 수가 크게 줄어듭니다.
+
+    행은 구간(window) 단위로 검사하며, 구간 크기는 남은 필요 행 수를 지금까지의 통과율로 나눈 값(최소 min_window)입니다.
+    댓글은 최종 선택된 행에 대해서만 마지막에 한 번 예측하며(include_comments=True),
+    include_comments=False이면 댓글을 예측하지 않고 검사되지 않은 댓글이 남지 않도록 Comments 컬럼을 제거합니다.
+    include_comments=True의 결과는 filter_hate_speech(df).head(limit)와 같습니다.
+
+    Returns:
+        tuple: (필터링된 DataFrame(최대 limit행), 통계 dict)
+            통계: scored_texts(실제 예측한 텍스트 수), scanned_rows, kept_rows, dropped_rows, dropped_comments, exhausted(행이 모자라 limit 미달)
+    """
+    session = get_model_session(model_path, vectorizer_path)
+    min_window = max(1, min_window or LAZY_MIN_WINDOW)
+    n_rows = len(df)
+    row_df = df.drop(columns=['Comments'], errors='ignore')
+
+    kept_positions = []
+    kept_probs = []
+    dropped_rows = []
+    scored_texts = 0
+    start = 0
+    while len(kept_positions) < limit and start < n_rows:
+        # 지금까지의 통과율로 남은 행을 채우는 데 필요한 구간 크기를 추정 (통과율 하한 10%)
+        remaining = limit - len(kept_positions)
+        pass_rate = max(len(kept_positions) / start, 0.1) if start else 1.0
+        end = min(n_rows, start + max(min_window, int(np.ceil(remaining / pass_rate))))
+
+        window_parts, window_texts = _collect_filter_texts(row_df.iloc[start:end])
+        probs = np.asarray(score_via_server_or_local(window_texts, session, use_cache=use_score_cache, scoring_url=scoring_url), dtype=np.float64)
+        scored_texts += len(window_texts)
+
+        # 행 삭제 판정과 감사 로그 항목은 filter_hate_speech와 같은 로직 사용 (로그에는 원래 행 전체를 기록)
+        _, window_dropped = _apply_hate_filter(df.iloc[start:end], window_parts, probs)
+        dropped_rows.extend(window_dropped)
+        n_window = end - start
+        title_probs, content_probs = probs[:n_window], probs[n_window:]
+        clean = ~((title_probs >= HATE_THRESHOLD) | (content_probs >= HATE_THRESHOLD))
+        for offset in np.flatnonzero(clean)[:remaining]:
+            kept_positions.append(start + offset)
+            kept_probs.append((title_probs[offset], content_probs[offset]))
+        start = end
+
+    result_df = df.iloc[kept_positions]
+    dropped_comments = 0
+    if include_comments and 'Comments' in df.columns and kept_positions:
+        # 선택된 행의 댓글만 예측 (제목/본문 점수는 이미 계산된 값 재사용)
+        parts, texts = _collect_filter_texts(result_df)
+        comment_texts = texts[2 * len(result_df):]
+        comment_probs = score_via_server_or_local(comment_texts, session, use_cache=use_score_cache, scoring_url=scoring_url) if comment_texts else []
+        scored_texts += len(comment_texts)
+        known = np.asarray(kept_probs, dtype=np.float64)
+        result_df, comment_dropped = _apply_hate_filter(result_df, parts, np.concatenate([known[:, 0], known[:, 1], np.asarray(comment_probs, dtype=np.float64)]))
+        dropped_comments = len(comment_dropped)
+        dropped_rows.extend(comment_dropped)
+    elif not include_comments:
+        result_df = result_df.drop(columns=['Comments'], errors='ignore')
+
+    stats = {
+        'scored_texts': scored_texts,
+        'scanned_rows': start,
+        'kept_rows': len(result_df),
+        'dropped_rows': len(dropped_rows) - dropped_comments,
+        'dropped_comments': dropped_comments,
+        'exhausted': len(result_df) < limit,
+    }
+    print(f"[결과] 지연 필터링: {n_rows}행 중 {start}행 검사, 정상 {len(result_df)}행 선택 (예측 {scored_texts}개)")
+    save_dropped_log(dropped_rows)
+    return result_df, stats
+
 # --- 실행 예시 (Github 업로드 시 사용자 가이드용) ---
 if __name__ == "__main__":
     # 데이터 폴더 경로 설정 (data 폴더가 없으면 생성하거나 경로 수정 필요)
@@ -0,0 +1,122 @@
+import os
+import hashlib
+import sqlite3
+import threading
+
+try:
+    from .token_cache import TOKENIZER_VERSION
+except ImportError:
+    from token_cache import TOKENIZER_VERSION
+
+# 파일 지문 계산 결과 메모 (경로, 크기, 수정 시각이 같으면 재계산하지 않음)
+_fingerprint_memo = {}
+_fingerprint_lock = threading.Lock()
+
+
+def _file_digest(path):
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _fingerprint_lock:
+        digest = _fingerprint_memo.get(memo_key)
+    if digest is not None:
+        return digest
+
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            hasher.update(block)
+    digest = hasher.hexdigest()
+    with _fingerprint_lock:
+        _fingerprint_memo[memo_key] = digest
+    return digest
+
+
+def model_fingerprint(*paths):
+    """
+    모델/벡터라이저 파일 내용으로 지문을 계산합니다.
+    파일이 바뀌면 지문이 달라지므로 이전 모델로 계산한 점수는 자동으로 조회되지 않습니다.
+    토큰화 방식(TOKENIZER_VERSION)도 점수에 영향을 주므로 함께 포함합니다.
+    """
+    hasher = hashlib.sha256(TOKENIZER_VERSION.encode('utf-8'))
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in sorted(os.walk(path)):
+                for name in sorted(files):
+                    hasher.update(_file_digest(os.path.join(root, name)).encode('ascii'))
+        else:
+            hasher.update(_file_digest(path).encode('ascii'))
+    return hasher.hexdigest()[:32]
+
+
+class ScoreCache:
+    """
+    (텍스트 해시, 모델 지문) 단위로 혐오 점수를 저장하는 로컬 SQLite 저장소입니다.
+
+    같은 제목/본문/댓글이 여러 검색 결과에 반복해서 등장하므로, 한 번 계산한 점수를
+    재사용하면 토큰화와 예측을 대부분 건너뛸 수 있습니다. 조회와 저장은 일괄(bulk)로 수행되며
+    여러 스레드와 프로세스에서 동시에 사용해도 안전합니다.
+    """
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS scores ("
+            " key TEXT NOT NULL, fingerprint TEXT NOT NULL, p_hate REAL NOT NULL,"
+            " PRIMARY KEY (key, fingerprint))"
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, keys, fingerprint):
+        """여러 텍스트 해시의 점수를 한 번에 조회하여 {키: 점수}로 반환합니다. (없는 키는 제외)"""
+        found = {}
+        keys = list(keys)
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, p_hate FROM scores WHERE fingerprint = ? AND key IN ({placeholders})",
+                    [fingerprint, *batch]
+                ).fetchall()
+                found.update(rows)
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items, fingerprint):
+        """(텍스트 해시, 점수) 쌍들을 한 번의 트랜잭션으로 저장합니다."""
+        rows = [(key, fingerprint, float(p_hate)) for key, p_hate in items]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO scores (key, fingerprint, p_hate) VALUES (?, ?, ?)", rows
+            )
+            self._conn.commit()
+
+    def purge_stale(self, fingerprint):
+        """현재 모델 지문과 다른(이전 모델의) 점수를 삭제하고 삭제된 개수를 반환합니다."""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM scores WHERE fingerprint != ?", (fingerprint,))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def stats(self):
+        """캐시 적중 통계를 반환합니다."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'path': self.path,
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,230 @@
+import os
+import json
+import time
+import queue
+import threading
+import urllib.request
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 점수 서버 주소/포트 (로컬 전용)
+SCORING_HOST = "127.0.0.1"
+SCORING_PORT = int(os.getenv("HATE_SCORING_PORT", "8765"))
+# 마이크로 배치 정책: 한 배치의 최대 텍스트 수, 첫 요청 이후 다른 요청을 기다리는 최대 시간(ms)
+SCORING_MAX_BATCH = int(os.getenv("HATE_SCORING_MAX_BATCH", "4096"))
+SCORING_MAX_WAIT_MS = float(os.getenv("HATE_SCORING_MAX_WAIT_MS", "10"))
+# 클라이언트 모드: 설정되어 있으면 filter_hate_speech가 로컬 모델 대신 이 주소의 점수 서버를 사용
+SCORING_URL = os.getenv("HATE_SCORING_URL", "")
+
+
+class MicroBatcher:
+    """
+    여러 스레드에서 동시에 들어오는 예측 요청을 하나의 배치로 모아 처리합니다.
+
+    첫 요청이 도착하면 최대 max_wait초 동안(또는 텍스트가 max_batch_size개 모일 때까지) 다른 요청을 더 받은 뒤,
+    모인 텍스트를 score_fn으로 한 번에 예측하고 결과를 요청별로 나누어 돌려줍니다.
+    요청이 몰릴수록 배치가 커져 토큰화/벡터화/예측의 고정 비용이 여러 요청에 분산됩니다.
+    """
+    def __init__(self, score_fn, max_batch_size=SCORING_MAX_BATCH, max_wait=SCORING_MAX_WAIT_MS / 1000.0):
+        self.score_fn = score_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait))
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.requests = 0
+        self.texts = 0
+        self.largest_batch = 0
+        self._thread = threading.Thread(target=self._loop, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, texts):
+        """텍스트 리스트를 대기열에 넣고 확률 리스트를 돌려줄 Future를 반환합니다."""
+        future = Future()
+        texts = list(texts)
+        if not texts:
+            future.set_result([])
+            return future
+        self._queue.put((texts, future))
+        return future
+
+    def score(self, texts, timeout=None):
+        """텍스트 리스트의 혐오 확률을 반환합니다. (다른 요청과 함께 배치 처리됨)"""
+        return self.submit(texts).result(timeout)
+
+    def _collect(self, first):
+        batch = [first]
+        n_texts = len(first[0])
+        deadline = time.monotonic() + self.max_wait
+        stop = False
+        while n_texts < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                stop = True
+                break
+            batch.append(item)
+            n_texts += len(item[0])
+        return batch, n_texts, stop
+
+    def _loop(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch, n_texts, stop = self._collect(first)
+
+            all_texts = [text for texts, _ in batch for text in texts]
+            try:
+                probs = self.score_fn(all_texts)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                offset = 0
+                for texts, future in batch:
+                    future.set_result([float(p) for p in probs[offset:offset + len(texts)]])
+                    offset += len(texts)
+
+            with self._stats_lock:
+                self.batches += 1
+                self.requests += len(batch)
+                self.texts += n_texts
+                self.largest_batch = max(self.largest_batch, n_texts)
+            if stop:
+                return
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'batches': self.batches,
+                'requests': self.requests,
+                'texts': self.texts,
+                'avg_requests_per_batch': self.requests / self.batches if self.batches else 0.0,
+                'largest_batch': self.largest_batch,
+                'queued': self._queue.qsize(),
+            }
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+
+class _ScoringHandler(BaseHTTPRequestHandler):
+    """POST /score: {"texts": [...]} -> {"p_hate": [...]} | GET /health: 서버/배치 상태"""
+    server_version = "HateScoring/1.0"
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._send_json(404, {'error': 'not found'})
+            return
+        self._send_json(200, {'status': 'ok', 'model': self.server.model_fingerprint, **self.server.batcher.stats()})
+
+    def do_POST(self):
+        if self.path != "/score":
+            self._send_json(404, {'error': 'not found'})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+            payload = json.loads(self.rfile.read(length).decode('utf-8'))
+            texts = payload['texts']
+            if not isinstance(texts, list):
+                raise ValueError("'texts'는 리스트여야 합니다.")
+        except Exception as e:
+            self._send_json(400, {'error': f"잘못된 요청: {e}"})
+            return
+
+        try:
+            probs = self.server.batcher.score(texts)
+        except Exception as e:
+            print(f"[오류] 점수 계산 실패: {e}")
+            self._send_json(500, {'error': str(e)})
+            return
+        self._send_json(200, {'p_hate': probs, 'model': self.server.model_fingerprint})
+
+    def log_message(self, format, *args):
+        # 요청마다 기본 접근 로그를 출력하지 않음 (배치 통계는 /health로 확인)
+        pass
+
+
+def create_server(session=None, host=SCORING_HOST, port=SCORING_PORT, max_batch_size=SCORING_MAX_BATCH, max_wait_ms=SCORING_MAX_WAIT_MS):
+    """
+    모델 세션 하나를 공유하는 로컬 점수 서버를 생성합니다. (serve_forever()로 실행)
+    예측은 preprocessor.score_texts를 사용하므로 점수 캐시와 캐스케이드도 그대로 적용됩니다.
+    """
+    from .preprocessor import get_model_session, score_texts
+
+    session = session or get_model_session()
+    session.get()  # 첫 요청 전에 모델을 미리 로드
+
+    server = ThreadingHTTPServer((host, port), _ScoringHandler)
+    server.daemon_threads = True
+    server.batcher = MicroBatcher(lambda texts: score_texts(texts, session), max_batch_size, max_wait_ms / 1000.0)
+    server.model_fingerprint = session.fingerprint
+    return server
+
+
+class ScoringClient:
+    """
+    로컬 점수 서버(scoring_server)의 클라이언트입니다.
+    텍스트가 많으면 max_texts_per_request 단위로 나누어 요청하며, 결과 순서는 입력과 같습니다.
+    """
+    def __init__(self, url=SCORING_URL, timeout=120, max_texts_per_request=20000):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.max_texts_per_request = max(1, int(max_texts_per_request))
+
+    def _post(self, texts):
+        body = json.dumps({'texts': texts}, ensure_ascii=False).encode('utf-8')
+        request = urllib.request.Request(
+            f"{self.url}/score", data=body, headers={"Content-Type": "application/json; charset=utf-8"}, method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read().decode('utf-8'))['p_hate']
+
+    def score(self, texts):
+        """텍스트 리스트의 혐오 확률 리스트를 반환합니다."""
+        texts = [text if isinstance(text, str) else "" for text in texts]
+        probs = []
+        for start in range(0, len(texts), self.max_texts_per_request):
+            probs.extend(self._post(texts[start:start + self.max_texts_per_request]))
+        return probs
+
+    def health(self):
+        with urllib.request.urlopen(f"{self.url}/health", timeout=self.timeout) as response:
+            return json.loads(response.read().decode('utf-8'))
+
+
+# --- 실행 예시: python -m src.scoring_server [--port 8765] [--max-batch-size 4096] [--max-wait-ms 10] ---
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="혐오 분류 로컬 점수 서버")
+    parser.add_argument("--port", type=int, default=SCORING_PORT)
+    parser.add_argument("--max-batch-size", type=int, default=SCORING_MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=SCORING_MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    scoring_server = create_server(port=args.port, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+    print(f"[정보] 점수 서버 시작: http://{SCORING_HOST}:{args.port} (최대 배치 {args.max_batch_size}, 최대 대기 {args.max_wait_ms}ms)")
+    print(f"      클라이언트 설정: HATE_SCORING_URL=http://{SCORING_HOST}:{args.port}")
+    try:
+        scoring_server.serve_forever()
+    except KeyboardInterrupt:
+        print("[정보] 점수 서버를 종료합니다.")
+    finally:
+        scoring_server.server_close()
+        scoring_server.batcher.close()
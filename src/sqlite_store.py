@@ -0,0 +1,117 @@
+import os
+import time
+import sqlite3
+import threading
+
+
+class SqliteTTLStore:
+    """
+    (네임스페이스, 키) → 문자열 값을 저장하는 로컬 SQLite 저장소입니다. (검색 계획/분석 결과 캐시가 공유)
+
+    여러 프로세스가 같은 파일을 공유할 수 있도록 WAL 모드로 열고,
+    created_at 기준으로 ttl이 지난 항목은 조회되지 않으며, 저장할 때 만료된 항목과
+    max_entries를 넘는 가장 오래 사용되지 않은(last_used) 항목을 함께 삭제합니다.
+    """
+    def __init__(self, path, table, ttl, max_entries, clock=time.time):
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+            " created_at REAL NOT NULL, last_used REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        self._conn.commit()
+
+    def now(self):
+        return self._clock()
+
+    def get(self, namespace, key):
+        """
+        만료되지 않은 값을 조회하고 사용 시각을 갱신합니다.
+
+        Returns:
+            tuple | None: (값, 저장 시각)
+        """
+        now = self._clock()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, created_at FROM {self.table} WHERE namespace = ? AND key = ? AND created_at >= ?",
+                (namespace, key, now - self.ttl)
+            ).fetchone()
+            if row is not None:
+                self._touch(namespace, key, now)
+        return row
+
+    def items(self, namespace):
+        """네임스페이스의 만료되지 않은 (키, 값, 저장 시각) 목록을 반환합니다. (사용 시각은 갱신하지 않음)"""
+        now = self._clock()
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT key, value, created_at FROM {self.table} WHERE namespace = ? AND created_at >= ?",
+                (namespace, now - self.ttl)
+            ).fetchall()
+
+    def touch(self, namespace, key):
+        """항목의 사용 시각을 갱신합니다. (LRU 정리 순서에 반영)"""
+        with self._lock:
+            self._touch(namespace, key, self._clock())
+
+    def _touch(self, namespace, key, now):
+        # lock 안에서 호출
+        self._conn.execute(
+            f"UPDATE {self.table} SET last_used = ? WHERE namespace = ? AND key = ?", (now, namespace, key)
+        )
+        self._conn.commit()
+
+    def put(self, namespace, key, value):
+        """값을 저장하고, 만료된 항목과 최대 항목 수를 넘는 오래된 항목을 정리합니다."""
+        now = self._clock()
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (namespace, key, value, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, value, now, now)
+            )
+            self._conn.execute(f"DELETE FROM {self.table} WHERE created_at < ?", (now - self.ttl,))
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE rowid NOT IN (SELECT rowid FROM {self.table} ORDER BY last_used DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def clear(self):
+        """저장된 모든 항목을 삭제합니다."""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+    def size(self):
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def process_singleton(factory):
+    """
+    factory()로 만든 객체를 프로세스 전역에서 하나만 유지하는 접근 함수를 반환합니다. (최초 호출 시 생성)
+    """
+    instance = []
+    lock = threading.Lock()
+
+    def get():
+        with lock:
+            if not instance:
+                instance.append(factory())
+            return instance[0]
+    return get
@@ -0,0 +1,142 @@
+import os
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+
+# 토큰화 방식이 바뀌면(품사 제외 목록, 어간 추출 옵션 등) 이 값을 올려 기존 캐시를 무효화합니다.
+TOKENIZER_VERSION = "okt-stem-v1"
+
+
+def normalize_text(text):
+    """
+    캐시 키 생성을 위해 텍스트를 정규화합니다.
+    앞뒤 공백을 제거하고 연속된 공백/줄바꿈을 하나의 공백으로 합칩니다.
+    (Okt는 공백을 토큰 경계로만 사용하므로 토큰화 결과에는 영향이 없습니다.)
+    문자열이 아니거나 결측값이면 빈 문자열을 반환합니다.
+    """
+    if not isinstance(text, str):
+        return ""
+    return " ".join(text.split())
+
+
+def _encode_tokens(tokens):
+    # 디스크 계층에는 형태소를 공백으로 연결한 문자열로 저장 (Okt 형태소에는 공백이 없음)
+    return tokens if isinstance(tokens, str) else " ".join(tokens)
+
+
+def _decode_tokens(value):
+    return tuple(value.split(" ")) if value else ()
+
+
+def text_hash(normalized_text, namespace=TOKENIZER_VERSION):
+    """정규화된 텍스트의 해시 키를 반환합니다."""
+    return hashlib.blake2b(f"{namespace}\x1f{normalized_text}".encode('utf-8'), digest_size=16).hexdigest()
+
+
+class TokenCache:
+    """
+    형태소 분석 결과(형태소 토큰 튜플)를 저장하는 2단계(메모리 LRU + 선택적 디스크) 캐시입니다.
+
+    커뮤니티 댓글은 같은 문장("ㅋㅋㅋ", "ㄹㅇ", 밈, 복붙 글)이 반복되고, 같은 게시물이
+    여러 검색에서 다시 필터링되므로 Okt 분석 결과를 재사용하면 토큰화 비용을 크게 줄일 수 있습니다.
+    메모리 계층은 max_entries 개수로 크기가 제한되며, disk_path를 지정하면 SQLite 파일에도 저장되어
+    프로세스를 재시작해도 유지됩니다. 모든 메서드는 스레드 안전합니다.
+    """
+    def __init__(self, max_entries=100000, disk_path=None):
+        self.max_entries = max(1, int(max_entries))
+        self.disk_path = disk_path
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if disk_path:
+            os.makedirs(os.path.dirname(os.path.abspath(disk_path)), exist_ok=True)
+            self._conn = sqlite3.connect(disk_path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS tokens (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._conn.commit()
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys):
+        """
+        여러 키를 한 번에 조회하여 {키: 토큰화 결과} 딕셔너리를 반환합니다. (없는 키는 제외)
+        디스크 계층에서 찾은 항목은 메모리 계층으로 올립니다.
+        """
+        found = {}
+        with self._lock:
+            missing = []
+            for key in keys:
+                value = self._memory.get(key)
+                if value is None:
+                    missing.append(key)
+                else:
+                    self._memory.move_to_end(key)
+                    found[key] = value
+            self.hits += len(found)
+
+            if missing and self._conn is not None:
+                # SQLite 변수 개수 제한을 피하기 위해 나누어 조회
+                for start in range(0, len(missing), 500):
+                    batch = missing[start:start + 500]
+                    placeholders = ",".join("?" * len(batch))
+                    rows = self._conn.execute(
+                        f"SELECT key, value FROM tokens WHERE key IN ({placeholders})", batch
+                    ).fetchall()
+                    for key, value in rows:
+                        value = _decode_tokens(value)
+                        found[key] = value
+                        self._remember(key, value)
+                        self.disk_hits += 1
+
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items):
+        """(키, 토큰화 결과) 쌍들을 메모리와 디스크 계층에 저장합니다."""
+        items = list(items)
+        if not items:
+            return
+        with self._lock:
+            for key, value in items:
+                self._remember(key, value)
+            if self._conn is not None:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO tokens (key, value) VALUES (?, ?)",
+                    [(key, _encode_tokens(value)) for key, value in items]
+                )
+                self._conn.commit()
+
+    def stats(self):
+        """캐시 적중 통계를 반환합니다."""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'memory_hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                'memory_entries': len(self._memory),
+                'max_entries': self.max_entries,
+                'disk_path': self.disk_path,
+            }
+
+    def clear(self):
+        """메모리 계층과 통계를 초기화합니다. (디스크 계층은 유지)"""
+        with self._lock:
+            self._memory.clear()
+            self.hits = self.disk_hits = self.misses = 0
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,111 @@
+import atexit
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# 워커 프로세스 내부에서 사용할 토큰화 함수 (initializer에서 설정)
+_worker_tokenize_serial = None
+
+
+def _init_worker():
+    """
+    워커 프로세스 초기화 함수입니다.
+    preprocessor 모듈을 새로 임포트하여 워커마다 독립된 Okt(JVM) 인스턴스를 생성합니다.
+    """
+    global _worker_tokenize_serial
+    try:
+        from .preprocessor import tokenize_serial_tokens
+    except ImportError:
+        # 스크립트로 직접 실행하는 경우 (python src/preprocessor.py)
+        from preprocessor import tokenize_serial_tokens
+    _worker_tokenize_serial = tokenize_serial_tokens
+
+
+def _tokenize_chunk(texts):
+    """워커 프로세스에서 텍스트 청크 하나를 토큰화합니다. (텍스트별 형태소 토큰 튜플)"""
+    return _worker_tokenize_serial(texts)
+
+
+class TokenizerPool:
+    """
+    Okt 형태소 분석을 여러 프로세스로 병렬 수행하는 토큰화 워커 풀입니다.
+
+    각 워커 프로세스는 자체 Okt/JVM을 가지므로 GIL이나 공유 인스턴스 경합 없이
+    코어 수에 비례하여 처리량이 늘어납니다. 텍스트는 청크 단위로 워커에 전달되며
+    결과는 입력 순서를 그대로 유지합니다. 여러 스레드에서 동시에 map()을 호출해도 안전합니다.
+    """
+    def __init__(self, workers, chunk_size=256):
+        self.workers = max(1, int(workers))
+        self.chunk_size = max(1, int(chunk_size))
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # JVM은 fork 이후 자식 프로세스에서 사용할 수 없으므로 반드시 spawn 방식으로 생성
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker
+                )
+                print(f"[정보] 토큰화 워커 풀 시작 (워커 {self.workers}개)")
+            return self._executor
+
+    def _reset(self, broken_executor):
+        # 워커가 비정상 종료된 경우 풀을 폐기하여 다음 호출 시 새로 생성
+        with self._lock:
+            if self._executor is broken_executor:
+                self._executor = None
+        broken_executor.shutdown(wait=False, cancel_futures=True)
+
+    def map(self, texts):
+        """
+        텍스트 리스트를 병렬로 토큰화하여 입력과 같은 순서의 결과 리스트를 반환합니다.
+        """
+        if not texts:
+            return []
+
+        texts = list(texts)
+        chunks = [texts[i:i + self.chunk_size] for i in range(0, len(texts), self.chunk_size)]
+        executor = self._get_executor()
+        try:
+            results = []
+            for chunk_result in executor.map(_tokenize_chunk, chunks):
+                results.extend(chunk_result)
+            return results
+        except BrokenProcessPool:
+            self._reset(executor)
+            raise
+
+    def shutdown(self):
+        """워커 프로세스를 모두 종료합니다."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+# 프로세스 전역 워커 풀 (워커 수별로 하나씩 유지)
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_tokenizer_pool(workers, chunk_size=256):
+    """워커 수에 해당하는 프로세스 전역 토큰화 풀을 반환합니다. (최초 호출 시 생성)"""
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = TokenizerPool(workers, chunk_size=chunk_size)
+            _pools[workers] = pool
+        return pool
+
+
+@atexit.register
+def _shutdown_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown()
@@ -0,0 +1,233 @@
+import os
+import json
+import time
+import hashlib
+import platform
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .preprocessor import (
+    HateModelSession, tokenize_texts, tokenize_serial_tokens, vectorize_tokens, _predict_matrix,
+    HATE_THRESHOLD, MODEL_PATH, VECTORIZER_PATH, SCORING_ENGINE
+)
+from .glm_scorer import NativeGLMScorer
+from .model_registry import register_model, load_model, resolve_variant, RawTextFeatures, FEATURE_INPUTS, REGISTRY_DIR
+from .token_cache import normalize_text
+
+# 재현성을 위한 기본 난수 시드 (데이터 분할, 분류기)
+DEFAULT_SEED = 42
+# 성능 비교 보고서 저장 폴더
+REPORT_DIR = os.path.join(REGISTRY_DIR, 'reports')
+
+# 특성 종류별 기본 설정
+FEATURE_DEFAULTS = {
+    # 기존 벡터라이저와 같은 설정 (Okt 형태소 1~2-gram)
+    'okt-tfidf': {'ngram_range': (1, 2), 'min_df': 2, 'max_features': 50000},
+    # 어절 경계 안의 문자 1~3-gram (한글 음절 단위, JVM 불필요)
+    'char-tfidf': {'analyzer': 'char_wb', 'ngram_range': (1, 3), 'min_df': 2, 'max_features': 200000, 'sublinear_tf': True},
+    # 문자 n-gram을 고정 크기로 해싱 (어휘 사전 없음, 메모리 일정)
+    'hashing': {'analyzer': 'char_wb', 'ngram_range': (1, 3), 'n_features': 2 ** 18},
+}
+
+
+def load_labelled_data(path, text_column='text', label_column='label', positive_label='1'):
+    """
+    학습용 라벨 데이터(CSV/Parquet)를 로드합니다.
+    positive_label과 같은 라벨(문자열 비교)을 혐오(1), 나머지를 정상(0)으로 변환하며 텍스트가 비어 있는 행은 제외합니다.
+
+    Returns:
+        (list, np.ndarray, str): (텍스트 리스트, 0/1 라벨 배열, 데이터 파일 SHA-256 지문)
+    """
+    if path.lower().endswith('.parquet'):
+        df = pd.read_parquet(path, columns=[text_column, label_column])
+    else:
+        df = pd.read_csv(path, usecols=[text_column, label_column], encoding='utf-8-sig')
+    df = df[df[text_column].map(lambda text: isinstance(text, str) and text.strip() != '')]
+    labels = (df[label_column].astype(str).str.strip() == str(positive_label)).to_numpy(dtype=np.int64)
+
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            hasher.update(block)
+    return df[text_column].tolist(), labels, hasher.hexdigest()
+
+
+def build_vectorizer(variant, **overrides):
+    """특성 종류에 맞는 (학습 전) 벡터라이저를 생성합니다."""
+    from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer, TfidfTransformer
+    from sklearn.pipeline import Pipeline
+
+    params = {**FEATURE_DEFAULTS[variant], **overrides}
+    if variant == 'hashing':
+        return Pipeline([
+            ('hash', HashingVectorizer(alternate_sign=False, norm=None, **params)),
+            ('tfidf', TfidfTransformer(sublinear_tf=True)),
+        ])
+    return TfidfVectorizer(**params)
+
+
+def _features_input(variant, texts):
+    """특성 종류에 맞는 학습 입력 (okt-tfidf: 형태소 문자열, 그 외: 정규화된 원문)"""
+    if FEATURE_INPUTS[variant] == 'tokens':
+        return tokenize_texts(texts)
+    return [normalize_text(text) for text in texts]
+
+
+def train_variant(variant, train_texts, train_labels, C=4.0, seed=DEFAULT_SEED, **feature_overrides):
+    """
+    한 가지 특성 종류로 벡터라이저와 로지스틱 회귀(이항 GLM과 같은 형태)를 학습합니다.
+    학습된 계수는 NativeGLMScorer로 변환되므로 예측에 JVM이 필요하지 않습니다.
+
+    Returns:
+        (vectorizer, NativeGLMScorer)
+    """
+    from sklearn.linear_model import LogisticRegression
+
+    vectorizer = build_vectorizer(variant, **feature_overrides)
+    X_train = vectorizer.fit_transform(_features_input(variant, train_texts))
+    classifier = LogisticRegression(C=C, solver='liblinear', class_weight='balanced', max_iter=1000, random_state=seed)
+    classifier.fit(X_train, train_labels)
+    return vectorizer, NativeGLMScorer(classifier.coef_[0], classifier.intercept_[0])
+
+
+def _score_function(model, vectorizer):
+    """원문 텍스트 리스트 -> 혐오 확률 함수 (캐시 없이 토큰화/벡터화/예측 전체 수행)"""
+    if getattr(vectorizer, 'input_kind', 'tokens') == 'text':
+        return lambda texts: np.asarray(_predict_matrix(vectorizer.transform(texts), model), dtype=np.float64)
+    return lambda texts: np.asarray(_predict_matrix(vectorize_tokens(tokenize_serial_tokens(texts), vectorizer), model), dtype=np.float64)
+
+
+def evaluate(score_fn, texts, labels, threshold=HATE_THRESHOLD):
+    """
+    평가 데이터의 분류 성능(임계값 기준)과 처리량을 측정합니다.
+
+    Returns:
+        dict: accuracy, precision, recall, f1 (threshold 기준), f1_at_0.5, roc_auc, texts_per_sec
+    """
+    from sklearn.metrics import accuracy_score, precision_recall_fscore_support, f1_score, roc_auc_score
+
+    start = time.perf_counter()
+    probs = score_fn(texts)
+    elapsed = time.perf_counter() - start
+
+    predicted = (probs >= threshold).astype(np.int64)
+    precision, recall, f1, _ = precision_recall_fscore_support(labels, predicted, average='binary', zero_division=0)
+    return {
+        'threshold': threshold,
+        'accuracy': float(accuracy_score(labels, predicted)),
+        'precision': float(precision),
+        'recall': float(recall),
+        'f1': float(f1),
+        'f1_at_0.5': float(f1_score(labels, (probs >= 0.5).astype(np.int64), zero_division=0)),
+        'roc_auc': float(roc_auc_score(labels, probs)) if len(set(labels.tolist())) == 2 else None,
+        'texts_per_sec': len(texts) / elapsed if elapsed > 0 else None,
+    }
+
+
+def evaluate_baseline(test_texts, test_labels, threshold=HATE_THRESHOLD):
+    """현재 배포 모델(GLM_Classification_Model + tfidf_vectorizer.pkl)을 같은 평가 데이터로 측정합니다. (실패 시 None)"""
+    try:
+        session = HateModelSession(MODEL_PATH, VECTORIZER_PATH)
+        start = time.perf_counter()
+        model, vectorizer = session.get()
+        load_seconds = time.perf_counter() - start
+        metrics = evaluate(_score_function(model, vectorizer), test_texts, test_labels, threshold)
+        return {**metrics, 'load_seconds': load_seconds, 'engine': session.engine}
+    except Exception as e:
+        print(f"[경고] 현재 모델을 평가할 수 없어 비교에서 제외합니다: {e}")
+        return None
+
+
+def run_training(data_path, variants=('char-tfidf', 'hashing', 'okt-tfidf'), text_column='text', label_column='label',
+                 positive_label='1', test_size=0.2, C=4.0, seed=DEFAULT_SEED, promote=False, compare_baseline=True):
+    """
+    라벨 데이터로 모델 변형들을 학습/평가하여 레지스트리에 등록하고, 현재 모델과의 비교 보고서를 반환합니다.
+    같은 데이터/시드/설정이면 같은 분할과 같은 모델이 만들어집니다.
+    """
+    from sklearn.model_selection import train_test_split
+
+    texts, labels, data_sha256 = load_labelled_data(data_path, text_column, label_column, positive_label)
+    train_texts, test_texts, train_labels, test_labels = train_test_split(
+        texts, labels, test_size=test_size, random_state=seed, stratify=labels
+    )
+    print(f"[정보] 학습 데이터 {len(train_texts)}개 / 평가 데이터 {len(test_texts)}개 (혐오 비율 {labels.mean():.1%})")
+
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'data': {'path': os.path.abspath(data_path), 'sha256': data_sha256, 'rows': len(texts),
+                 'positive_rate': float(labels.mean()), 'test_size': test_size, 'seed': seed},
+        'baseline': None,
+        'variants': {},
+    }
+    if compare_baseline:
+        print(f"[진행] 현재 모델 평가 중... ({SCORING_ENGINE} 엔진)")
+        report['baseline'] = evaluate_baseline(test_texts, test_labels)
+
+    for variant in variants:
+        print(f"[진행] {variant} 학습 중...")
+        start = time.perf_counter()
+        vectorizer, scorer = train_variant(variant, train_texts, train_labels, C=C, seed=seed)
+        train_seconds = time.perf_counter() - start
+
+        features = RawTextFeatures(vectorizer) if FEATURE_INPUTS[variant] == 'text' else vectorizer
+        metrics = evaluate(_score_function(scorer, features), test_texts, test_labels)
+        meta = {
+            'data': report['data'],
+            'params': {'C': C, 'features': {k: list(v) if isinstance(v, tuple) else v for k, v in FEATURE_DEFAULTS[variant].items()}},
+            'metrics': {**metrics, 'train_seconds': train_seconds},
+            'environment': {'python': platform.python_version(), 'sklearn': __import__('sklearn').__version__},
+        }
+        version = register_model(variant, vectorizer, scorer, meta, promote=promote)
+
+        # 저장된 아티팩트를 다시 로드하여 로드 시간 측정 (배포 시 시작 비용)
+        start = time.perf_counter()
+        load_model(resolve_variant(version))
+        metrics['load_seconds'] = time.perf_counter() - start
+        report['variants'][version] = {'variant': variant, **metrics, 'train_seconds': train_seconds}
+
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    report_path = os.path.join(REPORT_DIR, f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    report['path'] = report_path
+    return report
+
+
+def print_report(report):
+    """현재 모델과 학습된 변형들의 성능/처리량을 표로 출력합니다."""
+    rows = []
+    if report['baseline']:
+        rows.append({'model': f"현재 모델 ({report['baseline']['engine']})", **report['baseline']})
+    for version, metrics in report['variants'].items():
+        rows.append({'model': version, **metrics})
+    table = pd.DataFrame(rows)
+    columns = ['model', 'accuracy', 'precision', 'recall', 'f1', 'f1_at_0.5', 'roc_auc', 'texts_per_sec', 'load_seconds']
+    print(f"\n[결과] 모델 비교 (평가 데이터 {round(report['data']['rows'] * report['data']['test_size'])}개, 임계값 {HATE_THRESHOLD})")
+    print(table[[col for col in columns if col in table.columns]].round(4).to_string(index=False))
+    print(f"      보고서: {report['path']}")
+
+
+# --- 실행 예시: python -m src.train_model labelled.csv [--variants char-tfidf hashing okt-tfidf] [--promote] ---
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="JVM 없이 예측 가능한 혐오 분류 모델 변형 학습 및 레지스트리 등록")
+    parser.add_argument("data", help="라벨 데이터 (CSV/Parquet)")
+    parser.add_argument("--variants", nargs='+', default=['char-tfidf', 'hashing', 'okt-tfidf'], choices=list(FEATURE_INPUTS))
+    parser.add_argument("--text-column", default='text')
+    parser.add_argument("--label-column", default='label')
+    parser.add_argument("--positive-label", default='1', help="혐오로 간주할 라벨 값 (예: 1, hate)")
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--C", type=float, default=4.0, help="로지스틱 회귀 규제 강도의 역수")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--promote", action='store_true', help="학습된 버전을 각 변형의 기본 버전으로 지정")
+    parser.add_argument("--no-baseline", action='store_true', help="현재 모델과의 비교 생략")
+    args = parser.parse_args()
+
+    training_report = run_training(
+        args.data, args.variants, args.text_column, args.label_column, args.positive_label,
+        args.test_size, args.C, args.seed, args.promote, not args.no_baseline
+    )
+    print_report(training_report)
@@ -0,0 +1,106 @@
+import os
+import time
+import threading
+
+# 앱 시작 시 백그라운드 워밍업 사용 여부 (1: 사용)
+WARMUP_ENABLED = os.getenv("WARMUP", "0").lower() in ("1", "true", "yes")
+
+# 워밍업 대상과 사이드바 표시 이름
+COMPONENT_LABELS = {
+    'tokenizer': "형태소 분석기 (Okt)",
+    'model': "혐오 분류 모델",
+    'browser': "크롤링 브라우저",
+}
+
+
+def _warm_tokenizer():
+    from .preprocessor import tokenize
+    # 첫 호출에서 JVM과 Okt 사전이 로드됨
+    tokenize("워밍업 문장입니다")
+
+
+def _warm_model():
+    from .preprocessor import get_model_session, CASCADE_ENABLED
+    session = get_model_session()
+    session.get()
+    if CASCADE_ENABLED:
+        session.get_cascade()
+
+
+def _warm_browser():
+    from .dc_scraper import prewarm
+    if not prewarm():
+        raise RuntimeError("WebDriver 초기화 실패")
+
+
+_WARMERS = {
+    'tokenizer': _warm_tokenizer,
+    'model': _warm_model,
+    'browser': _warm_browser,
+}
+
+
+class Warmup:
+    """
+    무거운 구성 요소(형태소 분석기 JVM, 혐오 분류 모델, 크롤링 브라우저)를 백그라운드 스레드에서 미리 준비합니다.
+
+    UI는 워밍업과 무관하게 바로 사용할 수 있으며, 준비가 끝나기 전에 검색이 들어오면
+    해당 구성 요소의 기존 지연 로드 경로가 같은 잠금을 통해 로드 완료를 기다리거나 직접 로드합니다.
+    구성 요소별 상태는 status()로 조회합니다. ('pending' | 'running' | 'ready' | 'failed')
+    """
+    def __init__(self, components=None):
+        self.components = list(components or _WARMERS.keys())
+        self._lock = threading.Lock()
+        self._status = {name: {'state': 'pending', 'elapsed': None, 'error': None} for name in self.components}
+        self._threads = []
+
+    def _run(self, name):
+        self._set(name, state='running')
+        start = time.perf_counter()
+        try:
+            _WARMERS[name]()
+            self._set(name, state='ready', elapsed=time.perf_counter() - start)
+            print(f"[정보] 워밍업 완료: {COMPONENT_LABELS[name]} ({time.perf_counter() - start:.1f}초)")
+        except Exception as e:
+            self._set(name, state='failed', elapsed=time.perf_counter() - start, error=str(e))
+            print(f"[경고] 워밍업 실패: {COMPONENT_LABELS[name]} ({e})")
+
+    def _set(self, name, **values):
+        with self._lock:
+            self._status[name].update(values)
+
+    def start(self):
+        """구성 요소마다 데몬 스레드를 하나씩 띄워 동시에 준비합니다."""
+        for name in self.components:
+            thread = threading.Thread(target=self._run, args=(name,), name=f"warmup-{name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def status(self):
+        """{구성 요소: {'label', 'state', 'elapsed', 'error'}} 형태의 상태 사본을 반환합니다."""
+        with self._lock:
+            return {name: {'label': COMPONENT_LABELS[name], **values} for name, values in self._status.items()}
+
+    @property
+    def done(self):
+        return all(item['state'] in ('ready', 'failed') for item in self.status().values())
+
+
+# 프로세스 전역 워밍업 (Streamlit은 상호작용마다 스크립트를 다시 실행하므로 한 번만 시작)
+_warmup = None
+_warmup_lock = threading.Lock()
+
+
+def start_warmup(components=None):
+    """프로세스 전역 워밍업을 시작하고 반환합니다. (이미 시작된 경우 기존 객체 반환)"""
+    global _warmup
+    with _warmup_lock:
+        if _warmup is None:
+            _warmup = Warmup(components).start()
+        return _warmup
+
+
+def get_warmup():
+    """시작된 워밍업 객체를 반환합니다. (시작하지 않았으면 None)"""
+    return _warmup